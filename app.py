@@ -1,18 +1,26 @@
 import streamlit as st
 import pandas as pd
-from model import calculate_xg, MonteCarloEngine
+from model import calculate_xg, ScorelineEngine
+from markets import DEFAULT_MARGIN, price_markets, market
 
 # --- APP CONFIGURATION ---
 st.set_page_config(page_title="AI Football Predictor", layout="centered")
 
 st.title("⚽ Monte Carlo Match Predictor")
-st.markdown("Enter team stats below to simulate the match 10,000 times.")
+st.markdown("Enter team stats below to price every scoreline of the match exactly.")
 
 # --- SIDEBAR: LEAGUE SETTINGS ---
 st.sidebar.header("League Averages")
 league_avg_home = st.sidebar.number_input("Avg Home Goals", value=1.58, step=0.01)
 league_avg_away = st.sidebar.number_input("Avg Away Goals", value=1.19, step=0.01)
 
+st.sidebar.header("Market Settings")
+margin = st.sidebar.number_input("Bookmaker Margin (%)", value=DEFAULT_MARGIN * 100, min_value=0.0, step=0.5) / 100
+markets_shown = st.sidebar.multiselect(
+    "Markets", ['Asian Handicap', 'Total Goals', 'Double Chance', 'Draw No Bet',
+                'Home Total', 'Away Total', 'Both Teams To Score', 'Correct Score'],
+    default=['Asian Handicap', 'Total Goals', 'Correct Score'])
+
 # --- MAIN INPUTS ---
 col1, col2 = st.columns(2)
 
@@ -31,15 +39,15 @@ with col2:
     a_conceded = st.number_input("Goals Conceded (Away)", value=24, min_value=0)
 
 # --- RUN SIMULATION ---
-if st.button("🚀 Run Monte Carlo Simulation"):
+if st.button("🚀 Run Simulation"):
     
     # 1. Calculate xG using the math from model.py
     h_xg, a_xg = calculate_xg(h_scored, h_conceded, h_played, 
                               a_scored, a_conceded, a_played, 
                               league_avg_home, league_avg_away)
     
-    # 2. Run the Engine
-    engine = MonteCarloEngine(h_xg, a_xg)
+    # 2. Run the Engine (exact scoreline matrix, same results dict as the Monte Carlo engine)
+    engine = ScorelineEngine(h_xg, a_xg)
     results = engine.run_simulation()
     
     # --- DISPLAY RESULTS ---
@@ -79,4 +87,16 @@ if st.button("🚀 Run Monte Carlo Simulation"):
             f"{1/results['BTTS']:.2f}"
         ]
     }
-    st.table(pd.DataFrame(odds_data))
\ No newline at end of file
+    st.table(pd.DataFrame(odds_data))
+
+    # Full market surface off the same scoreline grid
+    book = price_markets(h_xg, a_xg, margin=margin)
+    for name in markets_shown:
+        st.write(f"### 📈 {name}")
+        table = market(book, name)
+        table['probability'] = (table['probability'] * 100).map('{:.1f}%'.format)
+        table['push'] = (table['push'] * 100).map('{:.1f}%'.format)
+        st.dataframe(table.rename(columns={
+            'selection': 'Selection', 'line': 'Line', 'probability': 'Probability', 'push': 'Push',
+            'fair_odds': 'Fair Odds', 'odds': f'Odds ({margin:.1%} margin)'}).round(2),
+            hide_index=True)
@@ -1,22 +1,20 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
+from model import ScorelineEngine
+import data_loader
 
-# Load Models
-model_home = joblib.load('home_goals_model.pkl')
-model_away = joblib.load('away_goals_model.pkl')
-team_history = joblib.load('team_history.pkl') # <-- NEW FILE
+# Load Models (cached across reruns, reloaded only when the files change)
+model_home = data_loader.load_pickle('home_goals_model.pkl')
+model_away = data_loader.load_pickle('away_goals_model.pkl')
+team_history = data_loader.load_history() # <-- NEW FILE
 
 st.title("🤖 AI-Powered xG Predictor")
 
 # ... (Previous code remains the same)
 
-# Load data
-team_history = joblib.load('team_history.pkl')
-
-# Get list of teams and SORT them alphabetically
-teams = sorted(team_history.keys())
+# Get list of teams (the store keeps them sorted alphabetically)
+teams = team_history.teams
 
 st.title("🤖 AI Super-League Predictor")
 
@@ -34,9 +32,8 @@ if st.button("Predict Match") and home_team and away_team:
     # Helper function to get avg of last 3 games
     def get_form(team_name):
         if team_name in team_history:
-            last_scored = team_history[team_name]['scored'][-window:]
-            last_conceded = team_history[team_name]['conceded'][-window:]
-            return np.mean(last_scored), np.mean(last_conceded)
+            games, scored, conceded = team_history.form(team_name, 'all', window)
+            return scored / games, conceded / games
         return 1.5, 1.5 # Default if team is new
 
     h_att, h_def = get_form(home_team)
@@ -50,13 +47,12 @@ if st.button("Predict Match") and home_team and away_team:
     pred_home_xg = model_home.predict(input_data)[0]
     pred_away_xg = model_away.predict(input_data)[0]
     
-    # 3. MONTE CARLO SIMULATION
-    home_goals_sim = np.random.poisson(pred_home_xg, 10000)
-    away_goals_sim = np.random.poisson(pred_away_xg, 10000)
+    # 3. EXACT SCORELINE PROBABILITIES
+    probs = ScorelineEngine(pred_home_xg, pred_away_xg).run_simulation()
     
-    home_win_prob = np.sum(home_goals_sim > away_goals_sim) / 100
-    away_win_prob = np.sum(home_goals_sim < away_goals_sim) / 100
-    draw_prob = np.sum(home_goals_sim == away_goals_sim) / 100
+    home_win_prob = round(probs['Home Win'] * 100, 2)
+    away_win_prob = round(probs['Away Win'] * 100, 2)
+    draw_prob = round(probs['Draw'] * 100, 2)
     
     # 4. DISPLAY RESULTS
     st.subheader(f"Projected Score: {home_team} {pred_home_xg:.2f} - {pred_away_xg:.2f} {away_team}")
@@ -1,15 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import altair as alt
+from model import ScorelineEngine
+import data_loader
 
 st.set_page_config(page_title="Football Predictor Pro", page_icon="⚽", layout="wide")
 
 # --- LOAD DATA ---
 try:
-    team_history = joblib.load('team_history.pkl')
-    teams = sorted(team_history.keys())
+    team_history = data_loader.load_history()
+    teams = team_history.teams
 except FileNotFoundError:
     st.error("❌ Data missing. Run 'python train_ai.py' first.")
     st.stop()
@@ -40,12 +41,10 @@ with st.sidebar:
 # --- HELPER FUNCTION ---
 def get_stats(team_name, n_games, venue_type):
     if team_name in team_history:
-        data = team_history[team_name][venue_type]
-        scored = data['scored'][-n_games:]
-        conceded = data['conceded'][-n_games:]
-        dates = data['dates'][-n_games:]
-        last_date = dates[-1].strftime('%d-%b-%Y') if dates else "N/A"
-        return len(scored), sum(scored), sum(conceded), last_date
+        games, scored, conceded = team_history.form(team_name, venue_type, n_games)
+        last = team_history.last_date(team_name, venue_type)
+        last_date = last.strftime('%d-%b-%Y') if last else "N/A"
+        return games, scored, conceded, last_date
     return 0, 0, 0, "None"
 
 # --- MAIN INTERFACE ---
@@ -104,14 +103,13 @@ if h_games > 0 and a_games > 0:
     h_xg = h_att * a_def * league_avg_home
     a_xg = a_att * h_def * league_avg_away
     
-    # --- 2. MONTE CARLO ---
-    sims = 10000
-    h_sim = np.random.poisson(h_xg, sims)
-    a_sim = np.random.poisson(a_xg, sims)
+    # --- 2. SCORELINE MATRIX ---
+    # Exact probabilities instead of 10,000 noisy Poisson draws
+    probs = ScorelineEngine(h_xg, a_xg).run_simulation()
     
-    h_win = np.sum(h_sim > a_sim) / sims * 100
-    a_win = np.sum(h_sim < a_sim) / sims * 100
-    draw = np.sum(h_sim == a_sim) / sims * 100
+    h_win = probs['Home Win'] * 100
+    a_win = probs['Away Win'] * 100
+    draw = probs['Draw'] * 100
     
     # --- 3. DISPLAY ---
     st.subheader("📊 Live Prediction")
@@ -0,0 +1,185 @@
+import argparse
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+from model import price_fixtures, xg_from_form
+import dixon_coles
+from elo import K_FACTOR, HOME_ADVANTAGE, INITIAL_RATING, expected_home
+from ledger import STAKE, SIM_ODDS
+from pipeline.config import FORM_WINDOW, BET_THRESHOLD
+from season import season_of
+
+def replay_features(rows):
+    """Walks the matches in order and records each one's pre-match inputs.
+
+    rows: chronological (id, competition, utc_date, home, away, home_goals, away_goals).
+    Elo ratings and rolling home/away form are updated incrementally after
+    each match, so every row only sees what was known before kickoff. That is
+    one chronological pass, not the daily job's one-competition-at-a-time
+    order, so for teams in two competitions the Elo inputs differ somewhat
+    from the stored live ratings (see elo.load_matches).
+    """
+    n = len(rows)
+    elo_diff = np.zeros(n)
+    h_xg = np.zeros(n)
+    a_xg = np.zeros(n)
+    ratings = {}
+    # team -> deques of (scored, conceded) over the last FORM_WINDOW home / away games
+    home_form, away_form = {}, {}
+
+    for i, (_, _, _, home, away, hg, ag) in enumerate(rows):
+        r_h = ratings.get(home, INITIAL_RATING)
+        r_a = ratings.get(away, INITIAL_RATING)
+        elo_diff[i] = (r_h + HOME_ADVANTAGE) - r_a
+
+        hf = home_form.setdefault(home, deque(maxlen=FORM_WINDOW))
+        af = away_form.setdefault(away, deque(maxlen=FORM_WINDOW))
+        h_xg[i], a_xg[i] = xg_from_form(sum(s for s, _ in hf), sum(c for _, c in hf), len(hf),
+                                        sum(s for s, _ in af), sum(c for _, c in af), len(af))
+
+        # Settle: update the state with the result
+        s = 1.0 if hg > ag else 0.5 if hg == ag else 0.0
+        change = K_FACTOR * (s - expected_home(r_h, r_a, HOME_ADVANTAGE))
+        ratings[home] = r_h + change
+        ratings[away] = r_a - change
+        hf.append((hg, ag))
+        af.append((ag, hg))
+    return elo_diff, h_xg, a_xg
+
+def refit_blocks(dates, refit_days):
+    """(start, end) row ranges: each block is every match within refit_days of its first kickoff day"""
+    days = pd.to_datetime(pd.Series(dates), utc=True).dt.floor('D').values
+    start = 0
+    while start < len(days):
+        end = int(np.searchsorted(days, days[start] + np.timedelta64(refit_days, 'D')))
+        yield start, end
+        start = end
+
+def walk_forward_dixon_coles(rows, refit_days=7, min_train=100):
+    """Dixon-Coles (home xG, away xG), refit per league every refit_days on prior matches only.
+
+    Each refit warm-starts from the league's previous fit, like the daily job.
+    Fixtures without a fitted model (or with a team it hasn't seen) get NaN.
+    """
+    h_xg = np.full(len(rows), np.nan)
+    a_xg = np.full(len(rows), np.nan)
+    fits = {}
+    for start, end in refit_blocks([r[2] for r in rows], refit_days):
+        for comp in {r[1] for r in rows[start:end]}:
+            history = [r[2:] for r in rows[:start] if r[1] == comp]
+            if len(history) < min_train: continue
+            fits[comp] = dixon_coles.DixonColes.fit(history, as_of=rows[start][2], init=fits.get(comp))
+        for i in range(start, end):
+            fit = fits.get(rows[i][1])
+            if fit and rows[i][3] in fit and rows[i][4] in fit:
+                h_xg[i], a_xg[i] = fit.xg(rows[i][3], rows[i][4])
+    return h_xg, a_xg
+
+def walk_forward_logistic(rows, elo_diff, refit_days=7, min_train=100):
+    """The live logistic model's (away, draw, home) probabilities, updated every refit_days on prior matches only.
+
+    Same inputs and training as the daily job: the feature store's FEATURES
+    (every row's computed from the matches before it) and pipeline.training's
+    SGD model, fitted from scratch once min_train matches are in and then
+    updated with each block's new rows. Rows before the first fit get NaN.
+    """
+    from feature_store import FeatureStore
+    from pipeline import training
+    from records import Match
+
+    store = FeatureStore()
+    store.append([Match(*r) for r in rows], elo_diff)
+    X, y = store.training_set()
+    probs = np.full((len(rows), 3), np.nan)
+    model, trained = None, 0
+    for start, end in refit_blocks([r[2] for r in rows], refit_days):
+        if start < min_train: continue
+        model = training.fit(X[trained:start], y[trained:start], model)
+        trained = start
+        probs[start:end] = model.predict_proba(X[start:end])
+    return probs
+
+def run_backtest(rows, refit_days=7, min_train=100, xg='dixon-coles', chunk=5000):
+    """One row per match: what the pipeline would have predicted before it, and how it went
+
+    xg: 'dixon-coles' (fitted strengths, falling back to form like the daily job) or 'form'.
+    """
+    df = pd.DataFrame(rows, columns=['id', 'competition', 'utc_date', 'home', 'away', 'home_goals', 'away_goals'])
+    df['season'] = [season_of(d) for d in df['utc_date']]
+    # Same encoding as feature_store.results: 0 = away win, 1 = draw, 2 = home win
+    df['result'] = np.sign(df['home_goals'] - df['away_goals']) + 1
+
+    elo_diff, h_xg, a_xg = replay_features(rows)
+    if xg == 'dixon-coles':
+        dc_h, dc_a = walk_forward_dixon_coles(rows, refit_days, min_train)
+        fitted = ~np.isnan(dc_h)
+        h_xg[fitted], a_xg[fitted] = dc_h[fitted], dc_a[fitted]
+
+    # Poisson side, priced in chunks to bound the scoreline-matrix memory
+    poisson = np.concatenate([price_fixtures(h_xg[i:i + chunk], a_xg[i:i + chunk]) for i in range(0, len(df), chunk)]) \
+        if len(df) else price_fixtures([], [])
+    p_poisson = np.column_stack([poisson['away_win'], poisson['draw'], poisson['home_win']])
+
+    # Blend with the logistic model where one was available, like pipeline.pricing.price_slate
+    p_log = walk_forward_logistic(rows, elo_diff, refit_days, min_train)
+    probs = np.where(np.isnan(p_log), p_poisson, (p_poisson + p_log) / 2)
+    df['p_away'], df['p_draw'], df['p_home'] = probs[:, 0], probs[:, 1], probs[:, 2]
+
+    # Paper trading at the simulated odds
+    df['bet'] = np.where(df['p_home'] > BET_THRESHOLD, 2, np.where(df['p_away'] > BET_THRESHOLD, 0, -1))
+    df['profit'] = np.where(df['bet'] < 0, 0.0, np.where(df['bet'] == df['result'], STAKE * SIM_ODDS - STAKE, -STAKE))
+    return df
+
+def calibration_table(df, bins=10):
+    """Predicted vs observed frequency, pooling the home/draw/away probabilities"""
+    p = df[['p_away', 'p_draw', 'p_home']].values.ravel()
+    hit = (df['result'].values[:, None] == np.arange(3)).ravel()
+    idx = np.minimum((p * bins).astype(int), bins - 1)
+    table = pd.DataFrame({'bin': idx, 'predicted': p, 'observed': hit})
+    return table.groupby('bin').agg(n=('predicted', 'size'), predicted=('predicted', 'mean'), observed=('observed', 'mean'))
+
+def summarize(df, by=('competition', 'season')):
+    probs = df[['p_away', 'p_draw', 'p_home']].values
+    onehot = df['result'].values[:, None] == np.arange(3)
+    scored = df.assign(
+        correct=probs.argmax(axis=1) == df['result'].values,
+        brier=((probs - onehot) ** 2).sum(axis=1),
+        log_loss=-np.log(np.clip(probs[onehot], 1e-12, 1)),
+        bets=df['bet'] >= 0,
+        conf=probs.max(axis=1),
+    )
+    out = scored.groupby(list(by)).agg(
+        matches=('correct', 'size'), accuracy=('correct', 'mean'), confidence=('conf', 'mean'),
+        brier=('brier', 'mean'), log_loss=('log_loss', 'mean'), bets=('bets', 'sum'), profit=('profit', 'sum'))
+    # Overconfidence: how far the favourite's average probability is from its hit rate
+    out['calibration_gap'] = out['confidence'] - out['accuracy']
+    out['roi'] = out['profit'] / (out['bets'] * STAKE).where(out['bets'] > 0)
+    return out.drop(columns='confidence')
+
+if __name__ == "__main__":
+    import db
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the Poisson + logistic pipeline")
+    parser.add_argument('--refit-days', type=int, default=7, help="Update the models every N days")
+    parser.add_argument('--min-train', type=int, default=100, help="Matches needed before the first fit")
+    parser.add_argument('--xg', choices=('dixon-coles', 'form'), default='dixon-coles',
+                        help="Where the Poisson side's expected goals come from")
+    parser.add_argument('--csv', help="Also write the per-match predictions here")
+    args = parser.parse_args()
+
+    conn = db.connect(readonly=True)
+    rows = db.matches(conn)
+    start = time.perf_counter()
+    preds = run_backtest(rows, args.refit_days, args.min_train, args.xg)
+    elapsed = time.perf_counter() - start
+
+    pd.set_option('display.width', 160)
+    print(f"⚽ Backtested {len(preds)} matches in {elapsed:.2f} s\n")
+    print(summarize(preds).round(3).to_string())
+    print("\n📈 Overall")
+    print(summarize(preds.assign(all='all'), by=('all',)).round(3).to_string())
+    print("\n🎯 Calibration")
+    print(calibration_table(preds).round(3).to_string())
+    if args.csv:
+        preds.to_csv(args.csv, index=False)
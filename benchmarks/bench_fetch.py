@@ -0,0 +1,66 @@
+# Sequential smart_fetch-style loop vs the concurrent FootballClient
+# Run from the repo root:  python -m benchmarks.bench_fetch
+import tempfile
+import time
+import requests
+from fetcher import FootballClient
+from http_cache import ResponseCache
+from benchmarks.stub_server import StubAPI
+
+COMPETITIONS = ['PL', 'BL1', 'SA', 'PD', 'FL1', 'DED', 'PPL', 'CL']
+PATHS = [f"competitions/{c}/matches?status={s}" for s in ('FINISHED', 'SCHEDULED') for c in COMPETITIONS]
+
+def old_fetch_phase(base_url):
+    # What train_ai.py used to do: a fresh connection per call and a 1 s pause between competitions
+    for path in PATHS:
+        res = requests.get(f"{base_url}/{path}")
+        assert res.status_code == 200
+        time.sleep(1)
+
+def main():
+    # Generous quota so the comparison measures the client, not the rate limit
+    with StubAPI(latency=0.1, quota=1000).start() as server:
+        start = time.perf_counter()
+        old_fetch_phase(server.base_url)
+        old_time = time.perf_counter() - start
+
+        client = FootballClient(base_url=server.base_url, rate_per_minute=1000)
+        start = time.perf_counter()
+        results = client.get_many(PATHS)
+        new_time = time.perf_counter() - start
+        assert all(r is not None for r in results)
+        server.shutdown()
+
+    print(f"⚽ {len(PATHS)} requests, 100 ms server latency")
+    print(f"Sequential loop:   {old_time:6.2f} s")
+    print(f"FootballClient:    {new_time:6.2f} s  ({old_time / new_time:.0f}x faster)")
+
+    # Flaky, quota-limited server: 20% 5xx and only 12 requests per 2 s window
+    with StubAPI(latency=0.05, quota=12, window=2, error_rate=0.2, seed=1).start() as server:
+        client = FootballClient(base_url=server.base_url, rate_per_minute=360,
+                                max_retries=6, backoff_base=0.05)
+        start = time.perf_counter()
+        results = client.get_many(PATHS)
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+
+    ok = sum(r is not None for r in results)
+    print(f"Flaky server:      {elapsed:6.2f} s, {ok}/{len(PATHS)} fetched, "
+          f"{server.statuses.count(500)} x 5xx and {server.statuses.count(429)} x 429 retried")
+
+    # Season-sized lists through the response cache: a first run, a stale run that
+    # revalidates (304s, no bodies) and a run inside the TTL (no requests at all)
+    with StubAPI(latency=0.1, quota=1000, matches=380).start() as server, tempfile.TemporaryDirectory() as tmp:
+        for label, ttl in (('Cold cache', 0), ('Revalidated', 0), ('Within TTL', 3600)):
+            client = FootballClient(base_url=server.base_url, rate_per_minute=1000,
+                                    cache=ResponseCache(tmp, ttl=lambda url: ttl))
+            sent, requests_before = server.bytes_sent, len(server.statuses)
+            start = time.perf_counter()
+            assert all(r is not None for r in client.get_many(PATHS))
+            elapsed = time.perf_counter() - start
+            print(f"{label + ':':<18} {elapsed:6.2f} s, {len(server.statuses) - requests_before:2d} requests, "
+                  f"{(server.bytes_sent - sent) / 1024:7.1f} KB downloaded")
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
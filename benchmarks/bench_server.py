@@ -0,0 +1,87 @@
+# Prediction server under concurrent load: micro-batched vs one request per batch
+# Run from the repo root:  python -m benchmarks.bench_server [--clients 32] [--requests 200]
+import argparse
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import joblib
+import numpy as np
+from benchmarks import synthetic
+from pipeline.config import MODEL_FILE
+from server import Predictor, PredictionServer
+
+def client_loop(port, fixtures, n, latencies, seed):
+    # One keep-alive connection per client, like a dashboard process would hold
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    for _ in range(n):
+        comp, home, away = rng.choice(fixtures)
+        start = time.perf_counter()
+        conn.request('GET', f"/predict?competition={comp}&home={home}&away={away}".replace(' ', '%20'))
+        res = conn.getresponse()
+        body = res.read()
+        latencies.append(time.perf_counter() - start)
+        assert res.status == 200, body
+    conn.close()
+
+def load(predictor, fixtures, clients, requests):
+    server = PredictionServer(predictor, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    latencies = []
+    threads = [threading.Thread(target=client_loop, args=(server.server_address[1], fixtures, requests, latencies, i))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    lat = np.array(latencies) * 1000
+    stats = predictor.stats()
+    print(f"  {len(lat) / elapsed:8.0f} req/s   p50 {np.percentile(lat, 50):6.2f} ms   "
+          f"p99 {np.percentile(lat, 99):6.2f} ms   {stats['batches']} batches, "
+          f"{stats['mean_batch_requests']} requests each")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per client")
+    args = parser.parse_args()
+
+    data = synthetic.generate(4, 2)
+    state = synthetic.replay(data['matches'])
+    fixtures = [(row[1], row[3], row[4]) for row in data['matches'][-500:]]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic.write_artifacts(data, state, tmp)
+        os.chdir(tmp) # The server reads the artifacts from the working directory, like the job writes them
+        try:
+            print(f"🔮 {args.clients} clients x {args.requests} requests, GET /predict")
+            print("One request per batch:")
+            load(Predictor(max_batch=1, cache=False).start(), fixtures, args.clients, args.requests)
+            print("Micro-batched:")
+            load(Predictor(cache=False).start(), fixtures, args.clients, args.requests)
+            print("Micro-batched, prediction cache warm:")
+            predictor = Predictor().start()
+            predictor.predict([(f"{c}|{h}|{a}", (c, h, a)) for c, h, a in fixtures])
+            load(predictor, fixtures, args.clients, args.requests)
+
+            # Hot reload: publish a new model and check the next batch picks it up
+            version = predictor.version
+            model = joblib.load(MODEL_FILE)
+            model.coef_ = model.coef_ * 1.1
+            joblib.dump(model, MODEL_FILE + '.tmp')
+            os.replace(MODEL_FILE + '.tmp', MODEL_FILE)
+            time.sleep(predictor.reload_check)
+            result = predictor.predict([('hot-reload', fixtures[0])])[0]
+            assert result['model_version'] != version
+            print(f"Hot reload: {version} -> {result['model_version']} ({predictor.reloads - 1} reload)")
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# dashboard.py runs top to bottom when imported (it's a Streamlit script), so
+# the benchmarks pull just the functions they time out of the source instead:
+# the numbers always measure the real code, not a copy of it.
+import ast
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_functions(path, names, **namespace):
+    """Compiles the named top-level functions and constants of a script into namespace.
+
+    path is relative to the repo root; namespace supplies the globals they use
+    (state dicts, modules, ...).
+    Returns the namespace, so functions see later changes made to it.
+    """
+    path = os.path.join(ROOT, path)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    wanted = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in names:
+            wanted.append(node)
+        elif isinstance(node, ast.Assign) and any(getattr(t, 'id', None) in names for t in node.targets):
+            wanted.append(node)
+    found = {getattr(n, 'name', None) or n.targets[0].id for n in wanted}
+    missing = set(names) - found
+    if missing:
+        raise LookupError(f"{path} has no top-level {', '.join(sorted(missing))}")
+    exec(compile(ast.Module(body=wanted, type_ignores=[]), path, 'exec'), namespace)
+    return namespace
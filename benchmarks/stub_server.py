@@ -0,0 +1,75 @@
+# Local stand-in for api.football-data.org
+# Serves match lists (empty unless asked for) with the provider's quota headers and can be told
+# to fail: a share of requests get a 500, and the per-minute quota returns 429s.
+# Every body carries an ETag, and a matching If-None-Match gets an empty 304.
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubAPI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.1, quota=10, window=60, error_rate=0.0, seed=0, matches=0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.latency = latency
+        # matches=380 serves a season-sized list per request, 0 keeps the bodies tiny
+        self.matches = [{'id': i, 'utcDate': '2026-08-15T14:00:00Z', 'score': {'fullTime': {'home': 1, 'away': 0}}}
+                        for i in range(matches)]
+        self.bytes_sent = 0
+        self.quota = quota
+        self.window = window
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.used = 0
+        self.statuses = []
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v4"
+
+    def take(self):
+        # Returns (status, remaining, seconds until the window resets)
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            reset = max(1, int(self.window - (now - self.window_start)))
+            if self.used >= self.quota:
+                status = 429
+            else:
+                self.used += 1
+                status = 500 if self.random.random() < self.error_rate else 200
+            self.statuses.append(status)
+            return status, self.quota - self.used, reset
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        status, remaining, reset = self.server.take()
+        body = json.dumps({'matches': self.server.matches} if status == 200 else {'message': 'stub error'}).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status in (200, 304):
+            self.send_header('ETag', etag)
+        self.send_header('X-Requests-Available-Minute', str(remaining))
+        self.send_header('X-RequestCounter-Reset', str(reset))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
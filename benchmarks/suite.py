@@ -0,0 +1,226 @@
+# Times the pipeline's hot paths on synthetic leagues and checks them against a JSON baseline
+# Run from the repo root:  python -m benchmarks.suite [--leagues 8 --seasons 5] [--save]
+import argparse
+import json
+import os
+import pickle
+import platform
+import shutil
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import data_loader
+import db
+import dixon_coles
+import feature_store
+from feature_store import FEATURE_DIR
+from history_store import HISTORY_DIR, TeamHistoryStore
+from ledger import BetLedger
+from records import Match
+from markets import price_markets
+from model import MonteCarloEngine, ScorelineEngine, calculate_xg, price_fixtures
+from pipeline import ratings, stages, training
+from pipeline.pricing import cached_price_slate, model_version
+from prediction_cache import CACHE_FILE, PredictionCache
+import season
+from pipeline.state import Run, empty_state
+from benchmarks import synthetic
+from benchmarks.scripts import load_functions
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# A benchmark counts as a regression when its median is this much slower than the baseline
+TOLERANCE = 1.3
+N_FIXTURES = 500 # Fixtures per call for the per-fixture engines
+SEASON_SIMS = 10_000
+
+def measure(fn, repeat, setup=None):
+    """(median ms, min ms) over repeat runs; setup() runs untimed before each and its result is passed in"""
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times)), float(np.min(times))
+
+def build_cases(data, state, rng):
+    """name -> (items per run, fn, setup). Runs with the synthetic artifacts' directory as the cwd."""
+    matches = data['matches']
+    sample = [matches[i] for i in rng.choice(len(matches), N_FIXTURES)]
+    store = TeamHistoryStore.load()
+    strengths = dixon_coles.fit_leagues([m[1:] for m in matches])
+    xgs = np.array([strengths[m[1]].xg(m[3], m[4]) for m in sample])
+    cases = {}
+
+    # --- ENGINES ---
+    cases['monte_carlo'] = (N_FIXTURES, lambda: [MonteCarloEngine(h, a).run_simulation() for h, a in xgs], None)
+    cases['scoreline_engine'] = (N_FIXTURES, lambda: [ScorelineEngine(h, a).run_simulation() for h, a in xgs], None)
+    cases['price_fixtures'] = (N_FIXTURES, lambda: price_fixtures(xgs[:, 0], xgs[:, 1]), None)
+    cases['market_surface'] = (N_FIXTURES, lambda: price_markets(xgs[:, 0], xgs[:, 1]), None)
+
+    stats = [(store.form(m[3], 'home'), store.form(m[4], 'away')) for m in sample]
+    cases['calculate_xg'] = (N_FIXTURES, lambda: [
+        calculate_xg(hs, hc, hg, as_, ac, ag, 1.5, 1.2) for (hg, hs, hc), (ag, as_, ac) in stats], None)
+
+    # --- PIPELINE ---
+    run = Run(state)
+    run.history_store, run.strengths = store, strengths
+    cases['get_poisson_probs'] = (N_FIXTURES, lambda: [stages.get_poisson_probs(run, m[1], m[3], m[4]) for m in sample], None)
+    cases['update_elo'] = (len(matches), lambda s: [ratings.update_elo(s, m[3], m[4], m[5], m[6], m[2]) for m in matches], empty_state)
+    cases['elo_rating_at'] = (N_FIXTURES, lambda: state['elo_history'].ratings_at([m[3] for m in sample], [m[2] for m in sample]), None)
+
+    def pending_ledger():
+        # A pending bet on every tenth match, settled as the results come in
+        return BetLedger({m[0]: {'match': f"{m[3]} vs {m[4]}", 'pick': 'Home', 'status': 'Pending'} for m in matches[::10]})
+    cases['bet_resolver'] = (len(matches), lambda ledger: [ledger.settle(m[0], m[3], m[4], m[5], m[6]) for m in matches], pending_ledger)
+
+    last_round = matches[-1][2]
+    earlier = [m[1:] for m in matches if m[2] < last_round]
+    previous = dixon_coles.fit_leagues(earlier)
+    # Every league gets a new round here, so warm vs cold is just the warm start's
+    # saving (about a quarter of the iterations); the job also skips unchanged leagues
+    cases['dixon_coles_fit_cold'] = (len(matches), lambda: dixon_coles.fit_leagues([m[1:] for m in matches]), None)
+    cases['dixon_coles_fit_warm'] = (len(matches), lambda: dixon_coles.fit_leagues([m[1:] for m in matches], previous), None)
+
+    # --- FEATURE STORE --- the whole history in one pass, and a day's round appended to the rest
+    features = state['features']
+    history = features.matches.array
+    cases['feature_compute'] = (len(matches), lambda: feature_store.compute(history), None)
+    last = [Match(*m) for m in matches if m[2] == last_round]
+    def earlier_store():
+        n = len(history) - len(last)
+        return feature_store.FeatureStore(features.teams.names, history[:n], features.features.array[:n])
+    cases['feature_append_round'] = (len(last), lambda s: s.append(last, history['elo_diff'][-len(last):]), earlier_store)
+    X, y = features.training_set()
+    model = training.fit(X[:-len(last)], y[:-len(last)])
+    cases['logistic_fit_full'] = (len(y), lambda: training.fit(X, y), None)
+    cases['logistic_update_round'] = (len(last), lambda m: training.fit(X[-len(last):], y[-len(last):], m),
+                                      lambda: pickle.loads(pickle.dumps(model)))
+
+    # --- SEASON SIMULATOR --- the first league, halfway through its last season
+    comp = matches[0][1]
+    last_season = [m for m in matches if m[1] == comp and season.season_of(m[2]) == season.season_of(last_round)]
+    league = season.competition_inputs(comp, [m[2:] for m in last_season[:len(last_season) // 2]], [],
+                                       lambda home, away: strengths[comp].xg(home, away))
+    cases['season_simulation'] = (SEASON_SIMS, lambda: season.simulate_competition(league, SEASON_SIMS, 0), None)
+
+    # --- ARTIFACTS ---
+    logistic = joblib.load('logistic_model.pkl')
+    cases['state_pickle_save'] = (1, lambda: joblib.dump(state, 'bench_state.pkl'), None)
+    cases['state_pickle_load'] = (1, lambda: joblib.load('pipeline_state.pkl'), None)
+    cases['model_pickle_save'] = (1, lambda: joblib.dump(logistic, 'bench_model.pkl'), None)
+    cases['model_pickle_load'] = (1, lambda: joblib.load('logistic_model.pkl'), None)
+    cases['history_store_save'] = (1, lambda: store.save('bench_history'), None)
+    cases['history_store_load'] = (1, lambda: TeamHistoryStore.load(), None)
+
+    def empty_db():
+        if os.path.exists('bench.db'): os.remove('bench.db')
+        return db.connect('bench.db')
+    def write_db(conn):
+        with conn:
+            db.upsert_matches(conn, matches)
+            db.replace_fixtures(conn, data['fixtures'])
+            db.upsert_elo(conn, state['elo_ratings'])
+            db.save_bets(conn, [dict(b) for b in data['bets']])
+        conn.close()
+    cases['db_write'] = (len(matches), write_db, empty_db)
+    def read_db():
+        conn = db.connect(readonly=True)
+        db.matches(conn)
+        conn.close()
+    cases['db_read_matches'] = (len(matches), read_db, None)
+
+    # --- DASHBOARD ---
+    dash = load_functions('dashboard.py', ('score_slate', 'MODEL_FILE', 'SLATE_COLUMNS'),
+                          pd=pd, db=db, os=os, data_loader=data_loader, dixon_coles=dixon_coles,
+                          PredictionCache=PredictionCache, cached_price_slate=cached_price_slate,
+                          model_version=model_version, FEATURE_DIR=FEATURE_DIR)
+    def rerun():
+        depends_on = (dash['MODEL_FILE'], dixon_coles.MODEL_FILE, HISTORY_DIR, FEATURE_DIR) # As the dashboard has it
+        return data_loader.query(dash['score_slate'], depends_on=tuple(p for p in depends_on if os.path.exists(p)))
+    def cold_start():
+        data_loader._cache.clear()
+        if os.path.exists(CACHE_FILE): os.remove(CACHE_FILE)
+    # cold: new process, nothing priced yet; warm: new process, prices left by an earlier run
+    cases['dashboard_slate_cold'] = (len(data['fixtures']), lambda _: rerun(), cold_start)
+    cases['dashboard_slate_warm'] = (len(data['fixtures']), lambda _: rerun(), data_loader._cache.clear)
+    cases['dashboard_slate_rerun'] = (len(data['fixtures']), rerun, None)
+    return cases
+
+def compare(results, baseline, tolerance):
+    """Prints the table and returns the names that regressed against the baseline"""
+    regressions = []
+    print(f"{'Benchmark':<24} {'Items':>8} {'Median ms':>10} {'µs/item':>9} {'Baseline':>9} {'Ratio':>6}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        ratio = r['median_ms'] / base['median_ms'] if base and base['median_ms'] else None
+        flag = ""
+        if ratio is not None and ratio > tolerance:
+            regressions.append(name)
+            flag = " ❌"
+        base_str = f"{base['median_ms']:9.2f}" if base else f"{'-':>9}"
+        ratio_str = f"{ratio:6.2f}" if ratio is not None else f"{'-':>6}"
+        print(f"{name:<24} {r['items']:>8} {r['median_ms']:10.2f} {r['median_ms'] * 1000 / r['items']:9.2f} {base_str} {ratio_str}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the prediction pipeline's hot paths")
+    parser.add_argument('--leagues', type=int, default=8)
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--teams', type=int, default=20, help="Teams per league")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', help="Run just these benchmarks")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--save', action='store_true', help="Record this run as the new baseline")
+    args = parser.parse_args()
+    scale = {'leagues': args.leagues, 'seasons': args.seasons, 'teams': args.teams}
+
+    start = time.perf_counter()
+    data = synthetic.generate(args.leagues, args.seasons, args.teams)
+    state = synthetic.replay(data['matches'])
+    workdir = tempfile.mkdtemp(prefix='football-bench-')
+    synthetic.write_artifacts(data, state, workdir)
+    print(f"⚽ {len(data['matches'])} matches, {len(data['fixtures'])} fixtures, {len(data['bets'])} bets "
+          f"({args.leagues} leagues x {args.seasons} seasons) generated in {time.perf_counter() - start:.1f} s\n")
+
+    cwd = os.getcwd()
+    os.chdir(workdir) # The artifact paths the pipeline and dashboard use are relative
+    try:
+        cases = build_cases(data, state, np.random.default_rng(0))
+        results = {}
+        for name, (items, fn, setup) in cases.items():
+            if args.only and name not in args.only: continue
+            median, best = measure(fn, args.repeat, setup)
+            results[name] = {'items': items, 'median_ms': round(median, 3), 'min_ms': round(best, 3)}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved.get('scale') == scale:
+            baseline = saved['results']
+        else:
+            print(f"ℹ️ Baseline was recorded at {saved.get('scale')}, not comparing.\n")
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        if args.only:
+            # Re-recording a few benchmarks keeps the rest of the baseline
+            results = dict(baseline, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'scale': scale, 'python': platform.python_version(), 'machine': platform.machine(),
+                       'recorded': time.strftime('%Y-%m-%d'), 'results': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.tolerance}x the baseline: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
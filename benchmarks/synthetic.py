@@ -0,0 +1,120 @@
+# Synthetic leagues for the benchmarks: realistic scorelines, fixtures and bet logs
+# at any scale, from 1 season of 1 league up to 50 seasons x 50 leagues.
+import os
+from datetime import date, timedelta
+import joblib
+import numpy as np
+import db
+from pipeline import ratings, training
+from pipeline.state import empty_state
+from feature_store import FEATURE_DIR
+from history_store import TeamHistoryStore
+from records import Match
+from ledger import STAKE, SIM_ODDS
+
+COMPETITIONS = ['PL', 'BL1', 'SA', 'PD', 'FL1', 'DED', 'PPL', 'CL']
+
+# Goal model behind the scorelines: log(xG) = BASE (+ HOME) + attack - defence,
+# with strengths drifting a little from season to season
+BASE = 0.2
+HOME = 0.25
+ATTACK_SD, DEFENCE_SD, DRIFT_SD = 0.3, 0.25, 0.08
+
+def competition_codes(n_leagues):
+    return COMPETITIONS[:n_leagues] + [f"L{i:02d}" for i in range(len(COMPETITIONS), n_leagues)]
+
+def round_robin(n_teams):
+    """Double round robin (circle method): (2 * (n - 1), n / 2, 2) array of (home, away)"""
+    teams = np.arange(n_teams)
+    rounds = []
+    for _ in range(n_teams - 1):
+        pairs = np.stack([teams[:n_teams // 2], teams[::-1][:n_teams // 2]], axis=1)
+        rounds.append(pairs)
+        teams = np.concatenate([[teams[0]], np.roll(teams[1:], 1)])
+    first_half = np.array(rounds)
+    return np.concatenate([first_half, first_half[:, :, ::-1]])
+
+def season_start(year):
+    # First Saturday of August
+    d = date(year, 8, 1)
+    return d + timedelta(days=(5 - d.weekday()) % 7)
+
+def generate(n_leagues=1, n_seasons=1, teams_per_league=20, bet_rate=0.1, seed=0, last_season=2025):
+    """{'matches', 'fixtures', 'bets'} in the shapes the pipeline stores them.
+
+    matches: (id, competition, utc_date, home, away, home_goals, away_goals), oldest first
+    fixtures: the next round of every league, (id, league, utc_date, home, away, competition)
+    bets: settled paper-trading bets on bet_rate of the matches, plus pending ones on the fixtures
+    """
+    rng = np.random.default_rng(seed)
+    schedule = round_robin(teams_per_league)
+    match_id = 0
+    matches, fixtures, bets = [], [], []
+    for comp in competition_codes(n_leagues):
+        teams = [f"{comp} Team {i:02d}" for i in range(teams_per_league)]
+        attack = rng.normal(0, ATTACK_SD, teams_per_league)
+        defence = rng.normal(0, DEFENCE_SD, teams_per_league)
+        for year in range(last_season - n_seasons + 1, last_season + 1):
+            attack += rng.normal(0, DRIFT_SD, teams_per_league)
+            defence += rng.normal(0, DRIFT_SD, teams_per_league)
+            h, a = schedule[:, :, 0], schedule[:, :, 1]
+            home_goals = rng.poisson(np.exp(BASE + HOME + attack[h] - defence[a]))
+            away_goals = rng.poisson(np.exp(BASE + attack[a] - defence[h]))
+            start = season_start(year)
+            for r in range(len(schedule)):
+                kickoff = f"{start + timedelta(weeks=r)}T15:00:00Z"
+                for k in range(len(schedule[r])):
+                    match_id += 1
+                    matches.append((match_id, comp, kickoff, teams[h[r, k]], teams[a[r, k]],
+                                    int(home_goals[r, k]), int(away_goals[r, k])))
+        # Next season's opening round is the upcoming slate
+        kickoff = f"{season_start(last_season + 1)}T15:00:00Z"
+        for home, away in schedule[0]:
+            match_id += 1
+            fixtures.append((match_id, comp, kickoff, teams[home], teams[away], comp))
+
+    for m in (matches[i] for i in np.flatnonzero(rng.random(len(matches)) < bet_rate)):
+        pick = 'Home' if rng.random() < 0.7 else 'Away'
+        actual = 'Home' if m[5] > m[6] else 'Away' if m[6] > m[5] else 'Draw'
+        won = pick == actual
+        bets.append({'fixture_id': m[0], 'date': m[2][:10], 'match': f"{m[3]} vs {m[4]}", 'pick': pick,
+                     'confidence': float(rng.uniform(0.7, 0.9)), 'status': 'Settled',
+                     'result': 'Won' if won else 'Lost', 'profit': STAKE * SIM_ODDS - STAKE if won else -STAKE})
+    for f in fixtures[::2]:
+        bets.append({'fixture_id': f[0], 'date': f[2][:10], 'match': f"{f[3]} vs {f[4]}", 'pick': 'Home',
+                     'confidence': 0.75, 'status': 'Pending', 'result': '-', 'profit': 0})
+    return {'matches': matches, 'fixtures': fixtures, 'bets': bets}
+
+def replay(matches):
+    """Builds the pipeline state from scratch with its own ingest / rate code, like a full rebuild"""
+    state = empty_state()
+    rows, diffs = [], []
+    for match_id, comp, utc_date, home, away, hg, ag in matches:
+        home, away = ratings.init_team(state, home), ratings.init_team(state, away)
+        ratings.add_result(state, home, away, hg, ag, utc_date[:10])
+        diffs.append(ratings.elo_diff(state, home, away))
+        ratings.update_elo(state, home, away, hg, ag, utc_date)
+        rows.append(Match(match_id, comp, utc_date, home, away, hg, ag))
+        state['watermarks'][comp] = {'utcDate': utc_date, 'id': match_id}
+    state['features'].append(rows, diffs)
+    return state
+
+def write_artifacts(data, state, path):
+    """Everything the daily job writes, into path: state pickle, model, team_history/, features/, football.db"""
+    os.makedirs(path, exist_ok=True)
+    joblib.dump(state, os.path.join(path, 'pipeline_state.pkl'))
+    TeamHistoryStore.from_dict(state['team_history']).save(os.path.join(path, 'team_history'))
+
+    state['features'].save(os.path.join(path, FEATURE_DIR))
+    joblib.dump(training.fit(*state['features'].training_set()), os.path.join(path, 'logistic_model.pkl'))
+
+    conn = db.connect(os.path.join(path, db.DB_FILE))
+    with conn:
+        db.upsert_matches(conn, data['matches'])
+        db.replace_fixtures(conn, data['fixtures'])
+        db.upsert_elo(conn, state['elo_ratings'])
+        # The starting 1500 and the points the bounded history kept, numbered in order
+        history = state['elo_history']
+        db.replace_elo_history(conn, [row for team in history.teams for row in history.rows(team)])
+        db.save_bets(conn, [dict(b) for b in data['bets']])
+    conn.close()
@@ -1,10 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
+import os
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import altair as alt
+import db
+import data_loader
+import dixon_coles
+from feature_store import FEATURE_DIR
+from history_store import HISTORY_DIR
+from prediction_cache import PredictionCache
+from pipeline.pricing import cached_price_slate, model_version
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="AI Multi-Sport Predictor", page_icon="🏆", layout="wide")
@@ -28,27 +35,43 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- LOAD DATA ---
-try:
-    history = joblib.load('team_history.pkl')
-    upcoming = joblib.load('upcoming_matches.pkl')
-    elo_ratings = joblib.load('elo_ratings.pkl')
-    elo_history = joblib.load('elo_history.pkl') 
-    model = joblib.load('logistic_model.pkl')
-    standings = joblib.load('standings.pkl')
-    logos = joblib.load('logos.pkl') 
-    bet_log = joblib.load('bet_log.pkl') # NEW
-    nba_data = joblib.load('nba_data.pkl') 
-    nfl_data = joblib.load('nfl_data.pkl')
-    
-    # Fix League Names
-    for m in upcoming:
-        if m['league'] == "Primera Division": m['league'] = "LALIGA"
-    if 'Primera Division' in logos['leagues']: logos['leagues']['LALIGA'] = logos['leagues'].pop('Primera Division')
-
-except:
+# Each page queries only what it shows, so one bad artifact can't take down the other.
+# data_loader caches everything process-wide and reloads only when the daily job rewrites a file.
+if not os.path.exists(db.DB_FILE):
     st.error("⚠️ Data missing. Run 'python train_ai.py' first.")
     st.stop()
 
+MODEL_FILE = 'logistic_model.pkl'
+SLATE_COLUMNS = ['id', 'home', 'away', 'date', 'league', 'home_elo', 'away_elo', 'competition']
+
+def score_slate(conn):
+    """The whole upcoming slate, scored once: kickoff dates parsed and the same 1X2 prices the
+    paper trader bets on, read from the shared prediction cache (misses priced in one pass).
+    Cached until the database, either model, the history or the features change."""
+    slate = pd.DataFrame(db.fixtures_with_elo(conn), columns=SLATE_COLUMNS)
+    # Fix League Names
+    slate['league'] = slate['league'].replace("Primera Division", "LALIGA")
+
+    kickoff = pd.to_datetime(slate['date'], format="%Y-%m-%dT%H:%M:%SZ", utc=True, errors='coerce')
+    slate['local_date'] = kickoff.dt.tz_convert("Europe/Berlin").dt.date
+    history = data_loader.load_history()
+    slate['has_history'] = slate['home'].isin(history.teams)
+
+    slate['p_home'] = slate['p_draw'] = slate['p_away'] = 0.0
+    if len(slate):
+        elo_ratings = dict(zip(slate['home'], slate['home_elo']))
+        elo_ratings.update(zip(slate['away'], slate['away_elo']))
+        strengths = data_loader.load_pickle(dixon_coles.MODEL_FILE) if os.path.exists(dixon_coles.MODEL_FILE) else {}
+        cache = PredictionCache()
+        try:
+            prices = cached_price_slate(cache, slate['id'], list(zip(slate['competition'], slate['home'], slate['away'])),
+                                        elo_ratings, history, strengths, data_loader.load_pickle(MODEL_FILE), model_version(),
+                                        data_loader.load_features() if os.path.isdir(FEATURE_DIR) else None, slate['date'])
+        finally:
+            cache.close()
+        slate['p_home'], slate['p_draw'], slate['p_away'] = prices['home_win'] * 100, prices['draw'] * 100, prices['away_win'] * 100
+    return slate
+
 # --- SIDEBAR NAVIGATION ---
 with st.sidebar:
     st.title("🏆 AI Sports")
@@ -65,22 +88,31 @@ if page == "🔮 Predictions":
         sport_mode = st.radio("Sport", ["⚽ Football"])
         st.markdown("""<div style='color:#666; font-size:14px; margin-top:5px'>🏀 NBA (Coming Soon)<br>🏈 NFL (Coming Soon)</div>""", unsafe_allow_html=True)
 
+    try:
+        history = data_loader.load_history()
+        # Scored table shared by the Top Picks widget and the match list (read-only)
+        # Only what exists: features/ appears with the first training run that builds it
+        slate = data_loader.query(score_slate, depends_on=tuple(p for p in (MODEL_FILE, dixon_coles.MODEL_FILE, HISTORY_DIR, FEATURE_DIR) if os.path.exists(p)))
+    except Exception:
+        st.error("⚠️ Prediction data missing. Run 'python train_ai.py' first.")
+        st.stop()
+
     # --- FUNCTIONS ---
     def get_confidence_tier(prob_win):
         if prob_win >= 70: return "<span class='tier-diamond'>💎 DIAMOND TIER</span>"
         elif prob_win >= 55: return "<span class='tier-gold'>🥇 GOLD TIER</span>"
         else: return "<span class='tier-silver'>🥈 SILVER TIER</span>"
 
-    def get_comparison_insights(home, away):
+    def get_comparison_insights(home, away, h_elo, a_elo):
         """Generates 'Glass Box' Comparison Insights"""
         if home not in history or away not in history: return []
         insights = []
         
         # Data
-        h_scored = np.mean(history[home]['all']['scored'][-5:])
-        a_conceded = np.mean(history[away]['all']['conceded'][-5:])
-        h_elo = elo_ratings.get(home, 1500)
-        a_elo = elo_ratings.get(away, 1500)
+        h_games, h_goals, _ = history.form(home, 'all', 5)
+        a_games, _, a_goals_against = history.form(away, 'all', 5)
+        h_scored = h_goals / h_games
+        a_conceded = a_goals_against / a_games
         
         # 1. Attack vs Defense Mismatch
         if h_scored > 2.0 and a_conceded > 1.5:
@@ -94,38 +126,23 @@ if page == "🔮 Predictions":
             insights.append(f"⚖️ <b>Tight Match:</b> Teams are rated almost equally. Draw probability is elevated.")
             
         # 3. Form Check
-        h_wins = 0
-        for s, c in zip(reversed(history[home]['all']['scored'][-5:]), reversed(history[home]['all']['conceded'][-5:])):
-            if s > c: h_wins += 1
-            else: break
+        h_wins = history.win_streak(home)
         if h_wins >= 3:
              insights.append(f"🔥 <b>Momentum:</b> {home} is on a {h_wins}-game winning streak.")
 
         return insights
 
     # --- MAIN LOGIC ---
-    upcoming.sort(key=lambda x: x['date']) 
     now_cet = datetime.now(ZoneInfo("Europe/Berlin"))
     today_date = now_cet.date()
+    slate = slate[slate['has_history']]
 
     # --- 1. TOP PICKS WIDGET ---
+    today = slate[slate['local_date'] == today_date]
     daily_picks = []
-    for match in upcoming:
-        if match['home'] not in history: continue
-        try:
-            m_date = datetime.strptime(match['date'], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=ZoneInfo("UTC")).astimezone(ZoneInfo("Europe/Berlin")).date()
-            if m_date != today_date: continue
-        except: continue
-        
-        # Probabilities
-        h_elo, a_elo = elo_ratings.get(match['home'], 1500), elo_ratings.get(match['away'], 1500)
-        log_prob = model.predict_proba([[(h_elo+100)-a_elo]])[0]
-        # Simplified for speed in widget
-        conf_h = log_prob[2] * 100
-        conf_a = log_prob[0] * 100
-        
-        if conf_h > 65: daily_picks.append({'match': f"{match['home']} vs {match['away']}", 'pick': f"Home ({match['home']})", 'conf': conf_h, 'league': match['league']})
-        elif conf_a > 65: daily_picks.append({'match': f"{match['home']} vs {match['away']}", 'pick': f"Away ({match['away']})", 'conf': conf_a, 'league': match['league']})
+    for match in today.itertuples():
+        if match.p_home > 65: daily_picks.append({'match': f"{match.home} vs {match.away}", 'pick': f"Home ({match.home})", 'conf': match.p_home, 'league': match.league})
+        elif match.p_away > 65: daily_picks.append({'match': f"{match.home} vs {match.away}", 'pick': f"Away ({match.away})", 'conf': match.p_away, 'league': match.league})
 
     daily_picks.sort(key=lambda x: x['conf'], reverse=True)
     
@@ -142,30 +159,27 @@ if page == "🔮 Predictions":
         st.markdown("</div>", unsafe_allow_html=True)
 
     # --- 2. MATCH LIST ---
-    leagues = sorted(list(set([m['league'] for m in upcoming])))
+    leagues = sorted(slate['league'].unique())
     sel_league = st.multiselect("Filter League", leagues, default=[l for l in leagues if "Premier League" in l or "Bundesliga" in l])
     search = st.text_input("🔍 Search Team")
     st.divider()
 
-    for match in upcoming:
-        if match['league'] not in sel_league: continue
-        if search and (search.lower() not in match['home'].lower() and search.lower() not in match['away'].lower()): continue
-        
+    shown = slate[slate['league'].isin(sel_league)]
+    if search:
+        shown = shown[shown['home'].str.contains(search, case=False, regex=False) | shown['away'].str.contains(search, case=False, regex=False)]
+
+    for match in shown.to_dict('records'):
         home, away = match['home'], match['away']
-        if home not in history: continue
+        h_elo, a_elo = match['home_elo'], match['away_elo']
 
-        # Calc Probs (Using Logic from train_ai.py style)
-        h_elo, a_elo = elo_ratings.get(home, 1500), elo_ratings.get(away, 1500)
-        
         # Note: In full app we'd call the Poisson function here too, approximating for display
-        log_probs = model.predict_proba([[ (h_elo + 100) - a_elo ]])[0]
-        final_home = log_probs[2] * 100
-        final_draw = log_probs[1] * 100
-        final_away = log_probs[0] * 100
+        final_home = match['p_home']
+        final_draw = match['p_draw']
+        final_away = match['p_away']
         
         # Colors & badges
         tier_badge = get_confidence_tier(max(final_home, final_away))
-        insights = get_comparison_insights(home, away)
+        insights = get_comparison_insights(home, away, h_elo, a_elo)
         
         # Render
         with st.container():
@@ -191,6 +205,7 @@ elif page == "📈 Profit Tracker":
     st.title("📈 AI Performance Tracker")
     st.caption("Automated tracking of all 'Diamond Tier' (>70% Confidence) bets.")
     
+    bet_log = data_loader.query(db.all_bets)
     if not bet_log:
         st.info("No bets have been settled yet. Check back tomorrow!")
     else:
@@ -225,4 +240,8 @@ elif page == "📈 Profit Tracker":
         
         # Table
         st.subheader("📜 Bet History")
-        st.dataframe(df_bets[['date', 'match', 'pick', 'result', 'profit', 'status']].sort_values(by='date', ascending=False), use_container_width=True)
\ No newline at end of file
+        st.dataframe(df_bets[['date', 'match', 'pick', 'result', 'profit', 'status']].sort_values(by='date', ascending=False), use_container_width=True)
+
+# --- DATA LOAD METRICS ---
+with st.sidebar:
+    st.caption(f"⏱️ {data_loader.summary()}")
\ No newline at end of file
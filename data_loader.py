@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+import time
+from collections import defaultdict
+import joblib
+import db
+from feature_store import FEATURE_DIR, FeatureStore
+from history_store import HISTORY_DIR, TeamHistoryStore
+
+# Streamlit re-executes the app script on every interaction, but imported
+# modules stay loaded, so this cache lives for the whole server process and
+# is shared by every session. Callers must treat returned objects as read-only.
+_cache = {} # key -> (file signature, content hash, value)
+_locks = defaultdict(threading.Lock)
+_locks_guard = threading.Lock()
+_manifest_cache = {} # 'manifest' -> (mtime, {path: artifact entry})
+_metrics = defaultdict(lambda: {'loads': 0, 'hits': 0, 'load_ms': 0.0, 'last_load': None})
+
+def _files(path):
+    if isinstance(path, tuple):
+        return [f for p in path for f in _files(p)]
+    if os.path.isdir(path):
+        # Skip half-written files the daily job is about to rename into place
+        return sorted(os.path.join(path, f) for f in os.listdir(path) if not f.endswith('.tmp'))
+    return [path]
+
+def signature(path):
+    # Cheap change check: mtime + size of the file (or of every file in a directory)
+    return tuple((f, os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in _files(path))
+
+def _published(path):
+    """Content hash from the daily job's manifest.json, or None if it doesn't vouch for every file
+
+    Saves reading (and hashing) the artifacts themselves. A file newer than the
+    manifest was written after it, so its entry may be stale: hash that one for real.
+    """
+    from publish import MANIFEST_FILE, read_manifest
+    try:
+        stat = os.stat(MANIFEST_FILE)
+    except OSError:
+        return None
+    entry = _manifest_cache.get('manifest')
+    if entry is None or entry[0] != stat.st_mtime_ns:
+        entry = _manifest_cache['manifest'] = (stat.st_mtime_ns, {os.path.normpath(p): a for p, a in
+                                                                   read_manifest(MANIFEST_FILE)['artifacts'].items()})
+    hashes = []
+    for f in _files(path):
+        artifact = entry[1].get(os.path.normpath(f))
+        st = os.stat(f)
+        if artifact is None or artifact['size'] != st.st_size or st.st_mtime_ns > entry[0]:
+            return None
+        hashes.append(artifact['sha256'])
+    return 'manifest:' + hashlib.sha256(''.join(hashes).encode()).hexdigest()
+
+def content_hash(path):
+    h = hashlib.sha256()
+    for f in _files(path):
+        with open(f, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks[key]
+
+def cached(key, path, loader):
+    """Returns loader()'s result, re-running it only when the file at path has changed
+
+    path can also be a directory, or a tuple of paths the result depends on.
+    """
+    sig = signature(path) # Raises FileNotFoundError if the artifact is missing
+    entry = _cache.get(key)
+    if entry and entry[0] == sig:
+        _metrics[key]['hits'] += 1
+        return entry[2]
+
+    # One loader per key at a time, concurrent sessions wait for its result
+    with _lock_for(key):
+        entry = _cache.get(key)
+        if entry and entry[0] == sig:
+            _metrics[key]['hits'] += 1
+            return entry[2]
+        digest = _published(path) or content_hash(path)
+        if entry and entry[1] == digest:
+            # Touched but not changed (e.g. a git checkout): keep the loaded copy
+            _cache[key] = (sig, digest, entry[2])
+            _metrics[key]['hits'] += 1
+            return entry[2]
+
+        start = time.perf_counter()
+        value = loader()
+        m = _metrics[key]
+        m['loads'] += 1
+        m['load_ms'] = (time.perf_counter() - start) * 1000
+        m['last_load'] = time.time()
+        _cache[key] = (sig, digest, value)
+        return value
+
+# --- ARTIFACTS ---
+def load_pickle(path):
+    return cached(('pickle', path), path, lambda: joblib.load(path))
+
+def load_history(path=HISTORY_DIR):
+    return cached(('history', path), path, lambda: TeamHistoryStore.load(path))
+
+def load_features(path=FEATURE_DIR):
+    # The feature store's match table, for the logistic model's fixture inputs
+    return cached(('features', path), path, lambda: FeatureStore.load(path))
+
+def query(fn, *args, path=db.DB_FILE, depends_on=()):
+    """Cached fn(conn, *args) against football.db, re-run when the job writes the database
+
+    depends_on lists other artifacts fn reads (e.g. the model), which also invalidate it.
+    """
+    def run():
+        conn = db.connect(path, readonly=True)
+        try: return fn(conn, *args)
+        finally: conn.close()
+    # Keyed by name, not identity: functions defined in an app script are recreated on every rerun
+    key = ('query', fn.__module__, fn.__qualname__, args, path, depends_on)
+    return cached(key, (path,) + tuple(depends_on), run)
+
+def stats():
+    """Per-artifact load counts, cache hits and last load time (ms)"""
+    return {key: dict(m) for key, m in _metrics.items()}
+
+def summary():
+    s = stats().values()
+    return (f"{len(_cache)} datasets cached · {sum(m['hits'] for m in s)} hits · "
+            f"{sum(m['loads'] for m in s)} loads ({sum(m['load_ms'] for m in s):.0f} ms last)")
@@ -0,0 +1,225 @@
+import hashlib
+import sqlite3
+
+DB_FILE = 'football.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,          -- football-data.org match id
+    competition TEXT NOT NULL,
+    utc_date TEXT NOT NULL,
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    home_goals INTEGER NOT NULL,
+    away_goals INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (utc_date);
+CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home, utc_date);
+CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away, utc_date);
+
+CREATE TABLE IF NOT EXISTS fixtures (
+    id INTEGER PRIMARY KEY,
+    league TEXT NOT NULL,
+    utc_date TEXT NOT NULL,
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    competition TEXT                 -- competition code (PL, CL, ...), NULL in databases from before it was kept
+);
+CREATE INDEX IF NOT EXISTS idx_fixtures_date ON fixtures (utc_date);
+
+CREATE TABLE IF NOT EXISTS elo_ratings (
+    team TEXT PRIMARY KEY,
+    rating REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS elo_history (
+    team TEXT NOT NULL,
+    seq INTEGER NOT NULL,            -- order of the team's points (0 = its starting 1500)
+    utc_date TEXT,                   -- NULL for points recorded before dates were kept
+    rating REAL NOT NULL,
+    PRIMARY KEY (team, seq)
+);
+
+CREATE TABLE IF NOT EXISTS bets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fixture_id INTEGER UNIQUE,       -- NULL for bets placed before fixture ids were kept
+    date TEXT NOT NULL,
+    match TEXT NOT NULL,
+    pick TEXT NOT NULL,
+    confidence REAL,
+    status TEXT NOT NULL,
+    result TEXT NOT NULL,
+    profit REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bets_pending ON bets (status) WHERE status = 'Pending';
+
+CREATE TABLE IF NOT EXISTS logos (
+    kind TEXT NOT NULL,              -- 'team' or 'league'
+    name TEXT NOT NULL,
+    url TEXT,
+    PRIMARY KEY (kind, name)
+);
+
+CREATE TABLE IF NOT EXISTS standings (
+    competition TEXT NOT NULL,
+    team TEXT NOT NULL,
+    position INTEGER,
+    points INTEGER,
+    PRIMARY KEY (competition, team)
+);
+
+CREATE TABLE IF NOT EXISTS season_projections (
+    competition TEXT NOT NULL,
+    team TEXT NOT NULL,
+    outcome TEXT NOT NULL,           -- 'title', 'top_4', 'relegation', 'winner', 'pos_1', 'expected_points', ...
+    value REAL NOT NULL,             -- probability (or points) from the season simulator
+    PRIMARY KEY (competition, team, outcome)
+);
+"""
+
+def connect(path=DB_FILE, readonly=False):
+    if readonly:
+        # Raises sqlite3.OperationalError if the job hasn't created the database yet
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def _columns(conn, table):
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+def _migrate(conn):
+    # Columns added since the first schema (CREATE TABLE IF NOT EXISTS leaves old tables alone)
+    if 'competition' not in _columns(conn, 'fixtures'):
+        conn.execute("ALTER TABLE fixtures ADD COLUMN competition TEXT")
+
+def content_hash(conn):
+    """Hash of every table's rows, in key order: unlike the file's bytes, the same for the same data"""
+    h = hashlib.sha256()
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+    for table in tables:
+        n = len(_columns(conn, table))
+        order = ', '.join(str(i + 1) for i in range(n))
+        h.update(table.encode())
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY {order}"):
+            h.update(repr(tuple(row)).encode())
+    return h.hexdigest()
+
+# --- WRITES (ingestion job, call inside `with conn:` for one transaction) ---
+def upsert_matches(conn, rows):
+    # rows: (id, competition, utc_date, home, away, home_goals, away_goals)
+    conn.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+def replace_fixtures(conn, rows):
+    # The fixtures table is the current upcoming window, not an archive
+    conn.execute("DELETE FROM fixtures")
+    # rows: (id, league, utc_date, home, away, competition)
+    conn.executemany("INSERT OR REPLACE INTO fixtures (id, league, utc_date, home, away, competition) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+def upsert_elo(conn, ratings):
+    conn.executemany("INSERT OR REPLACE INTO elo_ratings VALUES (?, ?)", ratings.items())
+
+def replace_elo_history(conn, rows):
+    # rows: (team, seq, utc_date, rating); each team's series is replaced whole, so the
+    # table holds what the bounded RatingHistory keeps instead of growing every season
+    conn.executemany("DELETE FROM elo_history WHERE team = ?", {(r[0],) for r in rows})
+    conn.executemany("INSERT INTO elo_history VALUES (?, ?, ?, ?)", rows)
+
+def reset_ratings(conn):
+    # Before writing a full rebuild's ratings over the old ones
+    conn.execute("DELETE FROM elo_ratings")
+    conn.execute("DELETE FROM elo_history")
+
+def upsert_logos(conn, logos):
+    conn.executemany("INSERT OR REPLACE INTO logos VALUES ('team', ?, ?)", logos['teams'].items())
+    conn.executemany("INSERT OR REPLACE INTO logos VALUES ('league', ?, ?)", logos['leagues'].items())
+
+def replace_standings(conn, rows):
+    # rows: (competition, team, position, points); each competition's table is replaced whole
+    conn.executemany("DELETE FROM standings WHERE competition = ?", {(r[0],) for r in rows})
+    conn.executemany("INSERT INTO standings VALUES (?, ?, ?, ?)", rows)
+
+def replace_projections(conn, rows):
+    # rows: (competition, team, outcome, value), as replace_standings
+    conn.executemany("DELETE FROM season_projections WHERE competition = ?", {(r[0],) for r in rows})
+    conn.executemany("INSERT INTO season_projections VALUES (?, ?, ?, ?)", rows)
+
+BET_COLUMNS = ('fixture_id', 'date', 'match', 'pick', 'confidence', 'status', 'result', 'profit')
+
+def save_bets(conn, bets):
+    # New bets get a row id, known ones are updated in place. A bet that was saved
+    # without its copy learning the id (persist re-run from a checkpoint) is found
+    # by its fixture id, so saving the same bets twice is a no-op.
+    insert = f"INSERT INTO bets ({', '.join(BET_COLUMNS)}) VALUES ({', '.join('?' * len(BET_COLUMNS))})"
+    upsert = insert + f" ON CONFLICT(fixture_id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in BET_COLUMNS)}"
+    for bet in bets:
+        values = [bet.get(c) for c in BET_COLUMNS]
+        if bet.get('id') is not None:
+            conn.execute(f"UPDATE bets SET {', '.join(c + ' = ?' for c in BET_COLUMNS)} WHERE id = ?", values + [bet['id']])
+        elif bet.get('fixture_id') is not None:
+            conn.execute(upsert, values)
+            bet['id'] = conn.execute("SELECT id FROM bets WHERE fixture_id = ?", (bet['fixture_id'],)).fetchone()[0]
+        else:
+            bet['id'] = conn.execute(insert, values).lastrowid
+
+# --- READS (dashboards) ---
+def matches(conn):
+    # Every stored match, oldest first: (id, competition, utc_date, home, away, home_goals, away_goals)
+    return [tuple(r) for r in conn.execute(
+        "SELECT id, competition, utc_date, home, away, home_goals, away_goals FROM matches ORDER BY utc_date, id")]
+
+def fixtures_with_elo(conn, date_from=None, date_to=None):
+    """Upcoming fixtures (optionally within [date_from, date_to)) with both teams' current Elo"""
+    # A database the job hasn't migrated yet (the dashboards open it read-only) has no competition codes
+    competition = 'f.competition' if 'competition' in _columns(conn, 'fixtures') else 'NULL'
+    query = f"""
+        SELECT f.id, f.home, f.away, f.utc_date AS date, f.league,
+               COALESCE(h.rating, 1500) AS home_elo, COALESCE(a.rating, 1500) AS away_elo,
+               {competition} AS competition
+        FROM fixtures f
+        LEFT JOIN elo_ratings h ON h.team = f.home
+        LEFT JOIN elo_ratings a ON a.team = f.away
+        WHERE f.utc_date >= COALESCE(?, '') AND f.utc_date < COALESCE(?, '9999')
+        ORDER BY f.utc_date
+    """
+    return [dict(r) for r in conn.execute(query, (date_from, date_to))]
+
+def elo_ratings(conn):
+    return {r['team']: r['rating'] for r in conn.execute("SELECT team, rating FROM elo_ratings")}
+
+def elo_history(conn, team):
+    return [dict(r) for r in conn.execute("SELECT utc_date, rating FROM elo_history WHERE team = ? ORDER BY seq", (team,))]
+
+def all_elo_history(conn):
+    # (team, seq, utc_date, rating) for every team, in seq order
+    return [tuple(r) for r in conn.execute("SELECT team, seq, utc_date, rating FROM elo_history ORDER BY team, seq")]
+
+def logos(conn):
+    out = {'teams': {}, 'leagues': {}}
+    for r in conn.execute("SELECT kind, name, url FROM logos"):
+        out[r['kind'] + 's'][r['name']] = r['url']
+    return out
+
+def pending_bets(conn):
+    return [dict(r) for r in conn.execute("SELECT * FROM bets WHERE status = 'Pending'")]
+
+def settled_fixture_ids(conn):
+    return {r[0] for r in conn.execute("SELECT fixture_id FROM bets WHERE status != 'Pending' AND fixture_id IS NOT NULL")}
+
+def all_bets(conn):
+    return [dict(r) for r in conn.execute("SELECT * FROM bets ORDER BY date, id")]
+
+def standings(conn, competition):
+    return [dict(r) for r in conn.execute(
+        "SELECT team, position, points FROM standings WHERE competition = ? ORDER BY position", (competition,))]
+
+def season_projections(conn, competition):
+    """{team: {outcome: value}} from the last season simulation"""
+    out = {}
+    for r in conn.execute("SELECT team, outcome, value FROM season_projections WHERE competition = ?", (competition,)):
+        out.setdefault(r['team'], {})[r['outcome']] = r['value']
+    return out
@@ -0,0 +1,168 @@
+import numpy as np
+from scipy.optimize import minimize
+from model import DEFAULT_TOL, max_goals_for, score_matrix
+
+MODEL_FILE = 'dixon_coles.pkl'
+
+# Time decay: a match's weight halves every ~365 days (exp(-XI * age in days))
+XI = 0.0019
+# Tiny L2 pull towards the league average, so a team with a handful of
+# matches (or no goals yet) can't run its strength off to infinity
+RIDGE = 1e-3
+
+def _days(utc_dates):
+    return np.array([str(d)[:10] for d in utc_dates], dtype='datetime64[D]')
+
+def _tau(hg, ag, lam, mu, rho):
+    # Dixon-Coles low-score correction: 0-0 / 1-1 get rho-adjusted against 1-0 / 0-1
+    m00 = (hg == 0) & (ag == 0)
+    m01 = (hg == 0) & (ag == 1)
+    m10 = (hg == 1) & (ag == 0)
+    m11 = (hg == 1) & (ag == 1)
+    tau = 1 - m00 * lam * mu * rho + m01 * lam * rho + m10 * mu * rho - m11 * rho
+    return tau, m00, m01, m10, m11
+
+def neg_log_likelihood(params, home_idx, away_idx, hg, ag, weights, n_teams, ridge=RIDGE):
+    """Weighted Dixon-Coles negative log-likelihood (per unit weight) and its gradient.
+
+    params = [attack (n_teams), defence (n_teams), base, home advantage, rho], with
+    log(home xG) = base + home + attack[home] + defence[away] and
+    log(away xG) = base + attack[away] + defence[home]. Every match is handled
+    in one vectorized pass and the per-team gradients are summed with bincount.
+    """
+    att, dfn = params[:n_teams], params[n_teams:2 * n_teams]
+    base, home, rho = params[-3:]
+    log_lam = base + home + att[home_idx] + dfn[away_idx]
+    log_mu = base + att[away_idx] + dfn[home_idx]
+    lam, mu = np.exp(log_lam), np.exp(log_mu)
+
+    tau, m00, m01, m10, m11 = _tau(hg, ag, lam, mu, rho)
+    tau = np.maximum(tau, 1e-10)
+    total = weights.sum()
+    # Poisson log-pmf without the constant log(goals!) terms
+    ll = weights * (np.log(tau) + hg * log_lam - lam + ag * log_mu - mu)
+
+    # d ll / d log(xG), including the correction's dependence on the rates
+    g_lam = weights * (hg - lam + lam * (m01 * rho - m00 * mu * rho) / tau)
+    g_mu = weights * (ag - mu + mu * (m10 * rho - m00 * lam * rho) / tau)
+    g_rho = np.sum(weights * (m01 * lam + m10 * mu - m00 * lam * mu - m11) / tau)
+
+    grad = np.empty_like(params)
+    grad[:n_teams] = np.bincount(home_idx, g_lam, n_teams) + np.bincount(away_idx, g_mu, n_teams)
+    grad[n_teams:2 * n_teams] = np.bincount(away_idx, g_lam, n_teams) + np.bincount(home_idx, g_mu, n_teams)
+    grad[-3] = g_lam.sum() + g_mu.sum()
+    grad[-2] = g_lam.sum()
+    grad[-1] = g_rho
+
+    # Strengths are only identified up to a constant: pin attack and defence
+    # at an average of 0, so base is the league's scoring rate
+    strengths = params[:2 * n_teams]
+    value = -ll.sum() / total + ridge * (strengths @ strengths) + att.sum() ** 2 + dfn.sum() ** 2
+    grad = -grad / total
+    grad[:2 * n_teams] += 2 * ridge * strengths
+    grad[:n_teams] += 2 * att.sum()
+    grad[n_teams:2 * n_teams] += 2 * dfn.sum()
+    return value, grad
+
+class DixonColes:
+    """Attack / defence / home-advantage Poisson model with the Dixon-Coles
+    low-score correction, fitted by weighted maximum likelihood on one league.
+
+    xg() gives the two expected goals for a fixture, so it drops straight into
+    MonteCarloEngine / ScorelineEngine / price_fixtures; score_matrix() adds the
+    low-score correction on top for exact pricing.
+    """
+    def __init__(self, teams, attack, defence, base, home, rho, n_iter=0, as_of=None):
+        self.teams = list(teams)
+        self.team_ids = {t: i for i, t in enumerate(self.teams)}
+        self.attack = np.asarray(attack, dtype=float)
+        self.defence = np.asarray(defence, dtype=float)
+        self.base = float(base)
+        self.home = float(home)
+        self.rho = float(rho)
+        self.n_iter = n_iter # Optimizer iterations of the last fit
+        self.as_of = as_of
+
+    @classmethod
+    def fit(cls, rows, as_of=None, xi=XI, init=None, ridge=RIDGE, max_iter=500):
+        """Fits the model on (utc_date, home, away, home_goals, away_goals) rows.
+
+        Matches are weighted by exp(-xi * days before as_of) (default: the
+        latest match). init is a previous DixonColes fit to warm-start from:
+        known teams keep their strengths, new ones start at the league average.
+        That saves about a quarter of the iterations, not most of them: a new
+        round of results still moves every team a little, and L-BFGS starts
+        without curvature either way (about 30-45 iterations against 45-60
+        cold on a 20-team league). Moving as_of alone costs nothing, since the
+        weights only scale together: a warm refit on the same matches stops
+        after one iteration.
+        """
+        dates, homes, aways, hg, ag = zip(*rows)
+        teams = sorted(set(homes) | set(aways))
+        ids = {t: i for i, t in enumerate(teams)}
+        home_idx = np.array([ids[t] for t in homes])
+        away_idx = np.array([ids[t] for t in aways])
+        hg, ag = np.array(hg, dtype=float), np.array(ag, dtype=float)
+
+        days = _days(dates)
+        as_of = np.datetime64(str(as_of)[:10], 'D') if as_of is not None else days.max()
+        weights = np.exp(-xi * np.maximum((as_of - days).astype(float), 0))
+
+        n = len(teams)
+        x0 = np.zeros(2 * n + 3)
+        x0[-3], x0[-2] = 0.2, 0.25 # ~1.2 goals a side, ~log(1.4 / 1.1) home edge
+        if init is not None:
+            for t, i in ids.items():
+                j = init.team_ids.get(t)
+                if j is not None:
+                    x0[i], x0[n + i] = init.attack[j], init.defence[j]
+            x0[-3], x0[-2], x0[-1] = init.base, init.home, init.rho
+
+        bounds = [(None, None)] * (2 * n + 2) + [(-0.3, 0.3)]
+        res = minimize(neg_log_likelihood, x0, jac=True, method='L-BFGS-B', bounds=bounds,
+                       args=(home_idx, away_idx, hg, ag, weights, n, ridge),
+                       options={'maxiter': max_iter})
+        return cls(teams, res.x[:n], res.x[n:2 * n], *res.x[-3:], res.nit, str(as_of))
+
+    def __contains__(self, team):
+        return team in self.team_ids
+
+    def xg(self, home, away):
+        """(home xG, away xG) for one fixture, or arrays for lists of teams.
+
+        A team the model hasn't seen gets average (zero) strengths.
+        """
+        if isinstance(home, str):
+            return tuple(float(x[0]) for x in self.xg([home], [away]))
+        h = np.array([self.team_ids.get(t, -1) for t in home])
+        a = np.array([self.team_ids.get(t, -1) for t in away])
+        att = np.append(self.attack, 0.0) # Index -1 = unknown team
+        dfn = np.append(self.defence, 0.0)
+        return np.exp(self.base + self.home + att[h] + dfn[a]), np.exp(self.base + att[a] + dfn[h])
+
+    def score_matrix(self, home, away, tol=DEFAULT_TOL):
+        """Joint scoreline probabilities with the low-score correction applied"""
+        lam, mu = self.xg(home, away)
+        matrix = score_matrix(lam, mu, max_goals_for(lam, mu, tol))
+        matrix[0, 0] *= 1 - lam * mu * self.rho
+        matrix[0, 1] *= 1 + lam * self.rho
+        matrix[1, 0] *= 1 + mu * self.rho
+        matrix[1, 1] *= 1 - self.rho
+        return matrix
+
+def fit_leagues(rows, previous=None, as_of=None, changed=None, **kwargs):
+    """One model per competition from (competition, utc_date, home, away, home_goals, away_goals) rows.
+
+    previous: {competition: DixonColes} from the last run, used as warm starts.
+    changed: if given, only these competitions are refitted, the others keep their
+    previous fit (so a league without new results keeps its parameters, and the
+    prices cached for its fixtures stay valid). That skip, not the warm start,
+    is where most of the daily saving comes from.
+    """
+    by_comp = {}
+    for comp, *match in rows:
+        by_comp.setdefault(comp, []).append(match)
+    previous = previous or {}
+    return {comp: previous[comp] if changed is not None and comp not in changed and comp in previous
+            else DixonColes.fit(matches, as_of, init=previous.get(comp), **kwargs)
+            for comp, matches in by_comp.items()}
@@ -0,0 +1,113 @@
+import argparse
+import itertools
+import numpy as np
+
+# Live rating system used by the daily job (pipeline/ratings.py)
+K_FACTOR = 30
+HOME_ADVANTAGE = 100
+INITIAL_RATING = 1500
+
+def expected_home(r_home, r_away, hfa=HOME_ADVANTAGE):
+    # Home side's expected score (win = 1, draw = 0.5)
+    return 1 / (1 + 10 ** ((r_away - (r_home + hfa)) / 400))
+
+def encode_matches(rows):
+    """Integer-encodes chronological (home, away, home_goals, away_goals) rows.
+
+    Returns (teams, home_idx, away_idx, home_goals, away_goals).
+    """
+    if not rows:
+        empty = np.array([], dtype=np.int32)
+        return [], empty, empty, empty, empty
+    home, away, hg, ag = zip(*rows)
+    teams, idx = np.unique(np.array(home + away, dtype=str), return_inverse=True)
+    idx = idx.astype(np.int32)
+    return list(teams), idx[:len(home)], idx[len(home):], np.array(hg, dtype=np.int32), np.array(ag, dtype=np.int32)
+
+SWEEP_DTYPE = np.dtype([('k', 'f8'), ('hfa', 'f8'), ('mov', 'f8'), ('brier', 'f8'), ('log_loss', 'f8')])
+
+def sweep(home_idx, away_idx, home_goals, away_goals, n_teams,
+          k=(K_FACTOR,), hfa=(HOME_ADVANTAGE,), mov=(0.0,), burn_in=0):
+    """Replays the match history once for every (k, hfa, mov) combination at the same time.
+
+    Ratings are a (settings x teams) matrix, so each match is a handful of
+    vector operations over all settings. Before each update the pre-match
+    expectation is scored against the result (1 / 0.5 / 0) with Brier and
+    log-loss, skipping the first burn_in matches while ratings settle.
+    mov is the margin-of-victory exponent: K is scaled by (1 + goal diff) ** mov,
+    so mov = 0 is the plain Elo in pipeline/ratings.py.
+
+    Returns (results, ratings): a SWEEP_DTYPE row per setting and the final ratings.
+    """
+    grid = np.array(list(itertools.product(k, hfa, mov)), dtype=float)
+    K, H, V = grid[:, 0], grid[:, 1], grid[:, 2]
+    ratings = np.full((len(grid), n_teams), float(INITIAL_RATING))
+    brier = np.zeros(len(grid))
+    log_loss = np.zeros(len(grid))
+
+    scores = np.where(home_goals > away_goals, 1.0, np.where(home_goals == away_goals, 0.5, 0.0))
+    margins = np.abs(home_goals - away_goals)
+
+    for m in range(len(scores)):
+        h, a, s = home_idx[m], away_idx[m], scores[m]
+        r_h = ratings[:, h].copy()
+        r_a = ratings[:, a].copy()
+        e = expected_home(r_h, r_a, H)
+        if m >= burn_in:
+            brier += (e - s) ** 2
+            e_safe = np.clip(e, 1e-12, 1 - 1e-12)
+            log_loss -= s * np.log(e_safe) + (1 - s) * np.log(1 - e_safe)
+        change = K * (1 + margins[m]) ** V * (s - e)
+        ratings[:, h] = r_h + change
+        ratings[:, a] = r_a - change
+
+    n = max(len(scores) - burn_in, 1)
+    results = np.zeros(len(grid), dtype=SWEEP_DTYPE)
+    results['k'], results['hfa'], results['mov'] = K, H, V
+    results['brier'] = brier / n
+    results['log_loss'] = log_loss / n
+    return results, ratings
+
+def load_matches(conn, live_order=False):
+    """Every stored match from football.db: oldest first, or in the daily job's order.
+
+    The job rates one competition at a time (COMPETITIONS order, each oldest
+    first), so a team that also plays the Champions League gets its updates in
+    a different order than one chronological pass gives. live_order=True is a
+    full rebuild's order: with the live settings it lands on the ratings a
+    --full-rebuild run stores. Daily runs interleave competitions per run,
+    which no stored order reproduces, so those ratings only come close.
+    """
+    from pipeline.config import COMPETITIONS
+    rows = [tuple(r) for r in conn.execute(
+        "SELECT competition, home, away, home_goals, away_goals FROM matches ORDER BY utc_date, id")]
+    if live_order:
+        rank = {comp: i for i, comp in enumerate(COMPETITIONS)}
+        rows.sort(key=lambda r: rank.get(r[0], len(rank))) # Stable: still oldest first within a competition
+    return [r[1:] for r in rows]
+
+if __name__ == "__main__":
+    import time
+    import db
+
+    parser = argparse.ArgumentParser(description="Tune the Elo rating system on the stored match history")
+    parser.add_argument('--k', type=float, nargs='+', default=[10, 15, 20, 25, 30, 40, 50])
+    parser.add_argument('--hfa', type=float, nargs='+', default=[0, 25, 50, 75, 100, 125, 150])
+    parser.add_argument('--mov', type=float, nargs='+', default=[0, 0.5, 1])
+    parser.add_argument('--burn-in', type=int, default=200, help="Matches to replay before scoring")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--live-order', action='store_true',
+                        help="Replay one competition at a time like the daily job, not oldest first")
+    args = parser.parse_args()
+
+    conn = db.connect(readonly=True)
+    teams, home_idx, away_idx, hg, ag = encode_matches(load_matches(conn, args.live_order))
+    start = time.perf_counter()
+    results, _ = sweep(home_idx, away_idx, hg, ag, len(teams), args.k, args.hfa, args.mov, args.burn_in)
+    elapsed = time.perf_counter() - start
+
+    print(f"⚽ {len(hg)} matches x {len(results)} settings in {elapsed:.2f} s")
+    print(f"{'K':>6} {'HFA':>6} {'MoV':>5} {'Brier':>8} {'LogLoss':>8}")
+    for r in np.sort(results, order='log_loss')[:args.top]:
+        live = " <- live" if (r['k'], r['hfa'], r['mov']) == (K_FACTOR, HOME_ADVANTAGE, 0) else ""
+        print(f"{r['k']:6.0f} {r['hfa']:6.0f} {r['mov']:5.2f} {r['brier']:8.4f} {r['log_loss']:8.4f}{live}")
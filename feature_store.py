@@ -0,0 +1,288 @@
+import io
+import json
+import os
+import numpy as np
+from history_store import _to_days, cached_days
+from records import Interner, RecordBuffer
+
+# Pre-match features for every finished match, computed in whole-table NumPy
+# passes (no per-match loop) and appended as the results come in. The same
+# computation prices upcoming fixtures, so the model is served exactly the
+# inputs it was trained on.
+FEATURE_DIR = 'features'
+FORM_WINDOWS = (5, 10, 20) # Matches in each rolling form window
+H2H_WINDOW = 6 # Earlier meetings of the two teams that count
+REST_CAP = 21 # Days; a team's first match, an unknown date or a longer break count as this
+UPCOMING_DAY = np.iinfo(np.uint16).max # An undated fixture is due after every stored match
+
+FEATURES = (('elo_diff',)
+            + tuple(f'{side}_gd_{n}' for n in FORM_WINDOWS for side in ('home', 'away'))
+            + ('home_rest', 'away_rest', 'h2h_games', 'h2h_gd'))
+# Fixed divisors that bring every feature to roughly unit size, so the
+# incrementally trained model needs no fitted (and drifting) scaler
+SCALES = {'elo_diff': 400, 'home_rest': REST_CAP, 'away_rest': REST_CAP, 'h2h_games': H2H_WINDOW}
+FEATURE_DTYPE = np.dtype([(f, 'f4') for f in FEATURES])
+# home / away are the store's team ids; elo_diff is the pre-match (home + HOME_ADVANTAGE) - away
+MATCH_DTYPE = np.dtype([('id', 'i8'), ('day', 'u2'), ('home', 'i4'), ('away', 'i4'),
+                        ('home_goals', 'i1'), ('away_goals', 'i1'), ('elo_diff', 'f4')])
+CLASSES = np.array([0, 1, 2]) # Away win, draw, home win
+
+def _time_rank(rows):
+    # Each row's place in time, (day, id) order: ids are unique, and a stable
+    # sort on the uint16 day is a radix sort, well ahead of a two-key lexsort
+    by_id = np.argsort(rows['id'])
+    order = by_id[np.argsort(rows['day'][by_id], kind='stable')]
+    t = np.empty(len(rows), np.int64)
+    t[order] = np.arange(len(rows))
+    return t
+
+def _order(key, t):
+    # Rows sorted by key, then time: t is a rank, unique within a key, so one
+    # int64 argsort does what a (much slower) two-key lexsort would
+    return np.argsort(key * (int(t.max()) + 1) + t)
+
+def _group(key, t):
+    # (order sorting the rows by key then time t, each sorted row's group start)
+    order = _order(key, t)
+    k = key[order]
+    first = np.concatenate([[True], k[1:] != k[:-1]])
+    return order, np.maximum.accumulate(np.where(first, np.arange(len(k)), 0))
+
+def _rolling(group, values, played, windows):
+    """{window: (games, total of values)} over the last `window` played rows of the same group before each row.
+
+    group comes from _group. Rows that aren't played (fixtures) count for
+    nothing but still get their own numbers.
+    """
+    order, group_start = group
+    cum_games = np.concatenate([[0], np.cumsum(played[order], dtype=np.int64)])
+    cum_total = np.concatenate([[0], np.cumsum(np.where(played, values, 0)[order], dtype=np.int64)])
+    out = {}
+    for window in windows:
+        # cum_games is non-decreasing, so the window's first row is a binary search away
+        start = np.maximum(np.searchsorted(cum_games, cum_games[:-1] - window, side='left'), group_start)
+        games, total = np.empty(len(order), np.int64), np.empty(len(order), np.int64)
+        games[order] = cum_games[:-1] - cum_games[start]
+        total[order] = cum_total[:-1] - cum_total[start]
+        out[window] = games, total
+    return out
+
+def _tail_rank(key, t):
+    # How many rows of the same key come after each row (0 = the key's latest row)
+    n = len(key)
+    order = _order(key, t)
+    k = key[order]
+    last = np.flatnonzero(np.append(k[1:] != k[:-1], True))
+    group_end = np.repeat(last, np.diff(last, prepend=-1))
+    rank = np.empty(n, np.int64)
+    rank[order] = group_end - np.arange(n)
+    return rank
+
+def _rest_days(team, t, day, played):
+    # Days since the team's previous played (and dated) match
+    n = len(team)
+    order = _order(team, t)
+    k = team[order].astype(np.int64)
+    known = np.where(played & (day > 0), day, 0)[order].astype(np.int64)
+    # Team id in the high bits: the running max never crosses into the next team's rows
+    last = np.maximum.accumulate(k << 17 | known)
+    prev = np.concatenate([[-1], last[:-1]])
+    prev_day = np.where((prev >> 17) == k, prev & 0x1FFFF, 0)
+    d = day[order].astype(np.int64)
+    rest = np.empty(n, np.int64)
+    rest[order] = np.where((prev_day > 0) & (d > 0), np.minimum(d - prev_day, REST_CAP), REST_CAP)
+    return rest
+
+def compute(rows, played=None):
+    """FEATURE_DTYPE rows for MATCH_DTYPE rows, from the rows dated before each one.
+
+    rows can be in any order (time is (day, id)); played marks the ones whose
+    goals are real, the rest (upcoming fixtures) only get features.
+    """
+    n = len(rows)
+    out = np.zeros(n, FEATURE_DTYPE)
+    if not n: return out
+    played = np.ones(n, bool) if played is None else np.asarray(played, bool)
+    t = _time_rank(rows)
+    home, away = rows['home'].astype(np.int64), rows['away'].astype(np.int64)
+    gd = rows['home_goals'].astype(np.int64) - rows['away_goals']
+    out['elo_diff'] = rows['elo_diff']
+
+    # Form: goal difference per game over the home side's last n home games and the away side's last n away games
+    team, venue = np.concatenate([home, away]), np.repeat([0, 1], n)
+    t2, played2 = np.concatenate([t, t]), np.concatenate([played, played])
+    form = _rolling(_group(team * 2 + venue, t2), np.concatenate([gd, -gd]), played2, FORM_WINDOWS)
+    for w, (games, total) in form.items():
+        per_game = total / np.maximum(games, 1)
+        out[f'home_gd_{w}'], out[f'away_gd_{w}'] = per_game[:n], per_game[n:]
+
+    rest = _rest_days(team, t2, np.concatenate([rows['day'], rows['day']]), played2)
+    out['home_rest'], out['away_rest'] = rest[:n], rest[n:]
+
+    # Head to head, kept from the lower id's side and flipped to the home side's
+    lo, hi = np.minimum(home, away), np.maximum(home, away)
+    sign = np.where(home == lo, 1, -1)
+    games, total = _rolling(_group(lo * (hi.max() + 1) + hi, t), gd * sign, played, (H2H_WINDOW,))[H2H_WINDOW]
+    out['h2h_games'] = games
+    out['h2h_gd'] = sign * total / np.maximum(games, 1)
+    return out
+
+def matrix(features):
+    """Model inputs: (n, len(FEATURES)) floats in FEATURES order, scaled by SCALES"""
+    return np.column_stack([features[f] / SCALES.get(f, 1) for f in FEATURES]).astype(float)
+
+def results(rows):
+    # 2 = home win, 1 = draw, 0 = away win
+    return np.sign(rows['home_goals'].astype(np.int64) - rows['away_goals']) + 1
+
+class FeatureStore:
+    """Append-only table of finished matches and their pre-match features.
+
+    append() takes one run's new matches and computes their features from the
+    stored matches of the same teams only, so a day's update costs the same
+    however long the history gets. Training reads features[start:], i.e. just
+    the rows the model hasn't seen.
+    """
+    def __init__(self, teams=(), matches=None, features=None):
+        self.teams = Interner(teams)
+        self.matches = RecordBuffer(MATCH_DTYPE, capacity=4096, rows=matches) # Appended in run order
+        self.features = RecordBuffer(FEATURE_DTYPE, capacity=4096, rows=features)
+        self._index = None # (rows indexed, row numbers by team, each team's slice bounds)
+        self._memo = (0, {}) # (rows, {(home, away, day, elo_diff): fixture features}); see fixture_features
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in ('_index', '_memo')}
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self._index, self._memo = None, (0, {})
+
+    def _team_rows(self, old, teams):
+        # Row numbers of the stored matches of these teams, via a by-team index
+        # built once per table size (the apps' resident copy never changes)
+        if self._index is None or self._index[0] != len(old):
+            team = np.concatenate([old['home'], old['away']])
+            order = np.argsort(team, kind='stable')
+            bounds = np.searchsorted(team[order], np.arange(len(self.teams) + 1))
+            self._index = (len(old), order % max(len(old), 1), bounds)
+        _, by_team, bounds = self._index
+        slices = [by_team[bounds[t]:bounds[t + 1]] for t in teams if t + 1 < len(bounds)]
+        mask = np.zeros(len(old), bool) # A mask rather than np.unique: same sorted rows, no sort
+        if slices: mask[np.concatenate(slices)] = True
+        return np.flatnonzero(mask)
+
+    def _rows(self, home, away, days, elo_diff, ids=None, goals=None):
+        rows = np.zeros(len(home), MATCH_DTYPE)
+        rows['home'] = [self.teams.id(t) for t in home]
+        rows['away'] = [self.teams.id(t) for t in away]
+        rows['day'] = days
+        rows['elo_diff'] = elo_diff
+        if ids is not None: rows['id'] = ids
+        if goals is not None: rows['home_goals'], rows['away_goals'] = goals
+        return rows
+
+    def _context(self, rows):
+        """The stored matches the features of rows can depend on, and no more.
+
+        For each team: its last max(FORM_WINDOWS) home and away games and its
+        last game; for each pairing: its last H2H_WINDOW meetings. So the cost
+        of a day's rows doesn't grow with the history.
+        """
+        old = self.matches.array
+        old = old[self._team_rows(old, np.union1d(rows['home'], rows['away']))]
+        if not len(old): return old
+        n = len(old)
+        t = _time_rank(old)
+        home, away = old['home'].astype(np.int64), old['away'].astype(np.int64)
+        window = max(FORM_WINDOWS)
+        keep = (_tail_rank(home, t) < window) | (_tail_rank(away, t) < window)
+        last_game = _tail_rank(np.concatenate([home, away]), np.concatenate([t, t])) == 0
+        keep |= last_game[:n] | last_game[n:]
+        lo, hi = np.minimum(home, away), np.maximum(home, away)
+        size = int(max(hi.max(), rows['home'].max(), rows['away'].max())) + 1
+        pair = lo * size + hi
+        wanted = np.minimum(rows['home'], rows['away']).astype(np.int64) * size + np.maximum(rows['home'], rows['away'])
+        keep |= np.isin(pair, wanted) & (_tail_rank(pair, t) < H2H_WINDOW)
+        return old[keep]
+
+    def append(self, matches, elo_diffs):
+        """Adds records.Match rows with their pre-match Elo differences; returns the new features"""
+        if not matches: return np.zeros(0, FEATURE_DTYPE)
+        ids, _, dates, home, away, hg, ag = zip(*matches)
+        rows = self._rows(home, away, [cached_days(d) for d in dates], elo_diffs, ids, (hg, ag))
+        context = self._context(rows)
+        features = compute(np.concatenate([context, rows]))[len(context):]
+        self.matches.extend(rows)
+        self.features.extend(features)
+        return features
+
+    MEMO_SIZE = 4096
+
+    def fixture_features(self, fixtures, elo_diffs, dates):
+        """FEATURE_DTYPE rows for upcoming (home, away) fixtures on dates ('YYYY-MM-DD', or None for after every stored match)
+
+        Remembered until the table changes: the server and the dashboard price
+        the same fixtures over and over, and a small batch costs more in NumPy
+        call overhead than in arithmetic.
+        """
+        size, memo = self._memo
+        if size != len(self.matches) or len(memo) > self.MEMO_SIZE:
+            memo = {}
+            self._memo = (len(self.matches), memo)
+        keys = [(h, a, _to_days(d) or UPCOMING_DAY, float(e)) for (h, a), e, d in zip(fixtures, elo_diffs, dates)]
+        missing = [i for i, k in enumerate(keys) if k not in memo]
+        if missing:
+            features = self._fixture_features([fixtures[i] for i in missing], [keys[i][3] for i in missing],
+                                              [keys[i][2] for i in missing])
+            memo.update(zip([keys[i] for i in missing], features))
+        out = np.zeros(len(keys), FEATURE_DTYPE)
+        for i, k in enumerate(keys):
+            out[i] = memo[k]
+        return out
+
+    def _fixture_features(self, fixtures, elo_diffs, days):
+        if not len(fixtures): return np.zeros(0, FEATURE_DTYPE)
+        # Names the store hasn't seen get ids past the table's (the store itself is left alone)
+        ids, unseen = self.teams.ids, {}
+        team_id = lambda name: ids[name] if name in ids else unseen.setdefault(name, len(ids) + len(unseen))
+        rows = np.zeros(len(fixtures), MATCH_DTYPE)
+        rows['home'] = [team_id(h) for h, _ in fixtures]
+        rows['away'] = [team_id(a) for _, a in fixtures]
+        rows['day'] = days
+        rows['id'] = np.iinfo(np.int64).max - np.arange(len(fixtures))[::-1] # After any real match that day
+        rows['elo_diff'] = elo_diffs
+        context = self._context(rows)
+        played = np.arange(len(context) + len(rows)) < len(context)
+        return compute(np.concatenate([context, rows]), played)[len(context):]
+
+    def training_set(self, start=0):
+        """(X, y) for the rows from start on"""
+        return matrix(self.features.array[start:]), results(self.matches.array[start:])
+
+    # --- FILES --- what the apps need to price fixtures (the full table and features stay in the pipeline state)
+    def recent(self):
+        # The rows any fixture's features can depend on (for every pairing that has met):
+        # bounded by the number of teams and pairings, not by the length of the history
+        return self._context(self.matches.array)
+
+    def files(self):
+        buf = io.BytesIO()
+        np.save(buf, self.recent())
+        return {'teams.json': json.dumps(self.teams.names).encode(), 'recent.npy': buf.getvalue()}
+
+    def save(self, path=FEATURE_DIR, publisher=None):
+        from publish import write_atomic
+        for name, data in self.files().items():
+            target = os.path.join(path, name)
+            if publisher is not None: publisher.write(target, data)
+            else: write_atomic(target, data)
+
+    @classmethod
+    def load(cls, path=FEATURE_DIR):
+        """The apps' copy: just the recent() rows, which price fixtures the same as the whole table"""
+        with open(os.path.join(path, 'teams.json')) as f:
+            teams = json.load(f)
+        return cls(teams, np.load(os.path.join(path, 'recent.npy')))
@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+import metrics as job_metrics
+
+BASE_URL = "https://api.football-data.org/v4"
+
+# football-data.org reports the remaining quota on every response
+AVAILABLE_HEADER = 'X-Requests-Available-Minute'
+RESET_HEADER = 'X-RequestCounter-Reset'
+
+class TokenBucket:
+    """Client-side request budget, corrected by the provider's quota headers"""
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        # Blocks until a request may be sent, returns the seconds spent waiting
+        start = time.monotonic()
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return time.monotonic() - start
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def sync(self, available, reset_seconds=None):
+        # The server is the source of truth: never assume more than it says is left
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, available)
+            if available <= 0 and reset_seconds:
+                # Empty until the provider's window resets
+                self.tokens = min(self.tokens, 1 - reset_seconds * self.rate)
+
+def _header_number(headers, name):
+    try: return float(headers[name])
+    except (KeyError, TypeError, ValueError): return None
+
+class FootballClient:
+    def __init__(self, api_key=None, base_url=BASE_URL, rate_per_minute=10,
+                 max_workers=8, max_retries=3, backoff_base=1.0, backoff_cap=60.0, timeout=30,
+                 metrics=None, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.metrics = metrics or job_metrics.DISABLED
+        self.cache = cache # http_cache.ResponseCache, or None to always go to the API
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_per_minute)
+
+        # One keep-alive session shared by every worker thread
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if api_key:
+            self.session.headers['X-Auth-Token'] = api_key
+
+    def _backoff(self, attempt):
+        # Full jitter: spread retries out so workers don't hammer the API in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _sleep(self, seconds):
+        time.sleep(seconds)
+        return seconds
+
+    def get(self, path, params=None):
+        """GET base_url + path, returns the decoded JSON or None once retries run out"""
+        stats = {'status': None, 'latency': 0.0, 'size': 0, 'retries': 0, 'sleep': 0.0}
+        try:
+            return self._get(path, params, stats)
+        finally:
+            self.metrics.record_http(path, **stats)
+
+    def _get(self, path, params, stats):
+        url = path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+        entry, headers = None, None
+        if self.cache is not None:
+            url, params = self.cache.url(url, params), None
+            entry = self.cache.lookup(url)
+            if self.cache.mode == 'replay' or (entry and self.cache.fresh(entry)):
+                # Answered from disk: no quota used, nothing sent
+                if entry is None:
+                    stats['status'] = 'miss'
+                    return None
+                stats['status'] = 'cached'
+                self.metrics.count('http_cache_hits')
+                return entry['body']
+            headers = self.cache.validators(entry)
+
+        for attempt in range(self.max_retries):
+            stats['retries'] = attempt
+            retry = attempt + 1 < self.max_retries # Backing off only pays if another attempt follows
+            stats['sleep'] += self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                res = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                stats['latency'] += time.perf_counter() - start
+                stats['status'] = 'error'
+                if retry: stats['sleep'] += self._sleep(self._backoff(attempt))
+                continue
+            stats['latency'] += time.perf_counter() - start
+            stats['status'] = res.status_code
+            stats['size'] = len(res.content)
+
+            available = _header_number(res.headers, AVAILABLE_HEADER)
+            reset = _header_number(res.headers, RESET_HEADER)
+            if available is not None:
+                self.bucket.sync(available, reset)
+
+            if res.status_code == 200:
+                body = res.json()
+                if self.cache is not None:
+                    self.cache.store(url, res.headers, body)
+                return body
+            if res.status_code == 304 and entry:
+                # Unchanged since we stored it: the cached body, without downloading it again
+                self.cache.touch(entry)
+                self.metrics.count('http_not_modified')
+                return entry['body']
+            if res.status_code == 429:
+                # Out of quota: wait for the window the server tells us about (every
+                # caller has to); our own guess only holds back a retry of this one
+                wait = _header_number(res.headers, 'Retry-After') or reset
+                if wait or retry: self.bucket.sync(0, wait or self._backoff(attempt))
+                continue
+            if res.status_code >= 500:
+                if retry: stats['sleep'] += self._sleep(self._backoff(attempt))
+                continue
+            return None # Other 4xx won't get better by retrying
+        return None
+
+    def get_many(self, paths):
+        """Fetches every path concurrently (within the quota), results in input order"""
+        if not paths: return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as pool:
+            return list(pool.map(self.get, paths))
+
+    def close(self):
+        self.session.close()
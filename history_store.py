@@ -0,0 +1,159 @@
+import io
+import json
+import os
+from datetime import date
+from functools import lru_cache
+import numpy as np
+
+HISTORY_DIR = 'team_history'
+VENUES = ('home', 'away', 'all')
+# Dates are stored as uint16 days since this epoch (0 = unknown date)
+EPOCH = np.datetime64('2000-01-01', 'D')
+
+def _to_days(d):
+    if not d: return 0
+    return int((np.datetime64(str(d)[:10], 'D') - EPOCH).astype(int))
+
+# For per-match bookkeeping: a round of matches shares a handful of dates
+cached_days = lru_cache(maxsize=4096)(_to_days)
+
+def derive_arrays(arrays):
+    # Prefix sums and win-streak run lengths, built once when the store is written
+    derived = {}
+    for venue in VENUES:
+        offsets = arrays[f'{venue}_offsets']
+        scored = arrays[f'{venue}_scored']
+        conceded = arrays[f'{venue}_conceded']
+        # cum[k] = goals in the first k rows, so any slice sums to cum[end] - cum[start]
+        # (a typed leading zero: a plain [0] would promote the whole array to int64)
+        derived[f'{venue}_cum_scored'] = np.concatenate([np.zeros(1, np.int32), np.cumsum(scored, dtype=np.int32)])
+        derived[f'{venue}_cum_conceded'] = np.concatenate([np.zeros(1, np.int32), np.cumsum(conceded, dtype=np.int32)])
+
+        # run[k] = consecutive wins ending at row k, restarting at each team's first match
+        idx = np.arange(len(scored))
+        team_start = np.repeat(offsets[:-1], np.diff(offsets))
+        last_non_win = np.maximum.accumulate(np.where(scored > conceded, -1, idx))
+        derived[f'{venue}_win_run'] = (idx - np.maximum(last_non_win, team_start - 1)).astype(np.int16)
+    return derived
+
+class TeamHistoryStore:
+    """Columnar team_history.
+
+    Each venue split (home/away/all) is three contiguous arrays (scored,
+    conceded, dates) with every team's matches stored back to back in
+    chronological order, plus an offsets array giving each team's slice.
+    Saved as plain .npy files so apps can memory-map them and only touch
+    the slices they read.
+
+    Alongside the raw columns it keeps cumulative goal sums and a win-streak
+    run-length array per venue, so form() and win_streak() are O(1) for any N.
+    """
+    def __init__(self, teams, arrays):
+        self.teams = list(teams)
+        self.team_ids = {t: i for i, t in enumerate(self.teams)}
+        self.arrays = arrays
+
+    @classmethod
+    def from_dict(cls, team_history):
+        # team_history: {team: {venue: RecordBuffer of (scored, conceded, day)}} (see records.py)
+        from records import HISTORY_DTYPE, history_buffer # Old states still hold the split lists
+        teams = sorted(team_history)
+        arrays = {}
+        for venue in VENUES:
+            splits = [history_buffer(team_history[t][venue]).array for t in teams]
+            lengths = np.array([len(s) for s in splits], dtype=np.int64)
+            rows = np.concatenate(splits) if splits else np.zeros(0, HISTORY_DTYPE)
+            arrays[f'{venue}_offsets'] = np.concatenate([[0], np.cumsum(lengths)])
+            arrays[f'{venue}_scored'] = np.ascontiguousarray(rows['scored'])
+            arrays[f'{venue}_conceded'] = np.ascontiguousarray(rows['conceded'])
+            arrays[f'{venue}_dates'] = np.ascontiguousarray(rows['day'])
+        arrays.update(derive_arrays(arrays))
+        return cls(teams, arrays)
+
+    def files(self):
+        """{file name: bytes} of the saved store (the same store always gives the same bytes)"""
+        out = {'teams.json': json.dumps(self.teams).encode()}
+        for name, arr in self.arrays.items():
+            buf = io.BytesIO()
+            np.save(buf, arr)
+            out[f'{name}.npy'] = buf.getvalue()
+        return out
+
+    def save(self, path=HISTORY_DIR, publisher=None):
+        # Write each file next to its target and rename it into place: apps may
+        # have the old files memory-mapped, and truncating those in place would crash them.
+        # With a publish.Publisher, files whose content hasn't changed aren't rewritten.
+        from publish import write_atomic
+        for name, data in self.files().items():
+            target = os.path.join(path, name)
+            if publisher is not None: publisher.write(target, data)
+            else: write_atomic(target, data)
+
+    @classmethod
+    def load(cls, path=HISTORY_DIR, mmap=True):
+        with open(os.path.join(path, 'teams.json')) as f:
+            teams = json.load(f)
+        arrays = {}
+        for venue in VENUES:
+            for col in ('offsets', 'scored', 'conceded', 'dates'):
+                name = f'{venue}_{col}'
+                arrays[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+        try:
+            for venue in VENUES:
+                for col in ('cum_scored', 'cum_conceded', 'win_run'):
+                    name = f'{venue}_{col}'
+                    arrays[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+        except FileNotFoundError:
+            # Store written before the derived arrays existed
+            arrays.update(derive_arrays(arrays))
+        return cls(teams, arrays)
+
+    def __contains__(self, team):
+        return team in self.team_ids
+
+    def _slice(self, team, venue, n=None):
+        i = self.team_ids[team]
+        offsets = self.arrays[f'{venue}_offsets']
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        if n is not None:
+            start = max(start, end - n)
+        return start, end
+
+    def last_n(self, team, venue='all', n=None):
+        """(scored, conceded, dates) of the team's last n matches at this venue, oldest first"""
+        if team not in self.team_ids:
+            empty = np.array([], dtype=np.int8)
+            return empty, empty, np.array([], dtype='datetime64[D]')
+        start, end = self._slice(team, venue, n)
+        days = self.arrays[f'{venue}_dates'][start:end]
+        dates = np.where(days > 0, EPOCH + days.astype('timedelta64[D]'), np.datetime64('NaT'))
+        return (self.arrays[f'{venue}_scored'][start:end],
+                self.arrays[f'{venue}_conceded'][start:end],
+                dates)
+
+    def form(self, team, venue='all', n=None):
+        """(games, goals scored, goals conceded) over the team's last n matches at this venue, in O(1)"""
+        if team not in self.team_ids: return 0, 0, 0
+        start, end = self._slice(team, venue, n)
+        cum_scored = self.arrays[f'{venue}_cum_scored']
+        cum_conceded = self.arrays[f'{venue}_cum_conceded']
+        return end - start, int(cum_scored[end] - cum_scored[start]), int(cum_conceded[end] - cum_conceded[start])
+
+    def win_streak(self, team, venue='all'):
+        # Current run of consecutive wins at this venue
+        if not self.games(team, venue): return 0
+        _, end = self._slice(team, venue)
+        return int(self.arrays[f'{venue}_win_run'][end - 1])
+
+    def games(self, team, venue='all'):
+        if team not in self.team_ids: return 0
+        start, end = self._slice(team, venue)
+        return end - start
+
+    def last_date(self, team, venue='all'):
+        # Date of the team's most recent match at this venue, or None if unknown
+        if not self.games(team, venue): return None
+        _, end = self._slice(team, venue)
+        days = int(self.arrays[f'{venue}_dates'][end - 1])
+        if not days: return None
+        return date.fromisoformat(str(EPOCH + np.timedelta64(days, 'D')))
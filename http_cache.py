@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from requests import Request
+
+# Disk cache under the fetcher: one JSON file per request URL with the decoded
+# body and the validators (ETag / Last-Modified) the API sent with it.
+#   cache  - serve fresh entries, revalidate stale ones with a conditional request
+#   record - always fetch, store every response (a cassette for offline runs)
+#   replay - never touch the network, answer from the stored responses only
+#   off    - no cache
+CACHE_DIR = '.http_cache'
+MODES = ('cache', 'record', 'replay', 'off')
+META_FILE = 'cassette.json'
+
+# Seconds a stored response is served without asking the API at all, by the status it lists.
+# Finished results only change when a new match ends; scheduled slates move around more.
+TTL = {'FINISHED': 3600, 'SCHEDULED': 900}
+DEFAULT_TTL = 0 # Anything else is revalidated every time
+# Left out of the cache key: the job's date range moves every day, and keying on
+# it would give every daily run new URLs (no conditional requests across runs)
+RANGE_PARAMS = ('dateFrom', 'dateTo')
+
+def ttl_for(url):
+    for status, ttl in TTL.items():
+        if f'status={status}' in url:
+            return ttl
+    return DEFAULT_TTL
+
+class ResponseCache:
+    """Stored API responses by request URL without its date range (auth headers are never part of the key or the file)"""
+    def __init__(self, directory=CACHE_DIR, mode='cache', ttl=ttl_for, clock=time.time):
+        if mode not in MODES:
+            raise ValueError(f"Unknown HTTP cache mode {mode!r}, expected one of {MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.ttl = ttl
+        self.clock = clock
+        self.misses = set() # Replay: URLs the cassette doesn't have
+        if mode == 'replay' and not os.path.exists(os.path.join(directory, META_FILE)):
+            raise SystemExit(f"❌ No cassette in {directory}/, record one with --record {directory}")
+        os.makedirs(directory, exist_ok=True)
+        if mode == 'record':
+            self._write(META_FILE, {'recorded_at': datetime.now().isoformat(timespec='seconds')})
+
+    @staticmethod
+    def url(url, params=None):
+        # The URL requests would send, so 'path?a=1' and ('path', {'a': 1}) share an entry
+        return Request('GET', url, params=params).prepare().url
+
+    @staticmethod
+    def key(url):
+        # Yesterday's FINISHED results for PL and today's share an entry: the ETag
+        # says whether the API's answer changed, whatever range it was asked for
+        parts = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(parts.query) if k not in RANGE_PARAMS]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def _file(self, url):
+        return hashlib.sha256(self.key(url).encode()).hexdigest()[:32] + '.json'
+
+    def _write(self, name, data):
+        path = os.path.join(self.directory, name)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f, sort_keys=True, separators=(',', ':'))
+        os.replace(tmp, path) # Readers never see a half-written file
+
+    def lookup(self, url):
+        """The stored entry for url ({'url', 'body', 'etag', 'last_modified', 'fetched_at'}) or None"""
+        if self.mode == 'record':
+            return None # A recording always goes to the API
+        try:
+            with open(os.path.join(self.directory, self._file(url))) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        if entry is None and self.mode == 'replay' and url not in self.misses:
+            self.misses.add(url)
+            print(f"⚠️ Not in cassette: {url}")
+        return entry
+
+    def fresh(self, entry):
+        return self.mode == 'replay' or self.clock() - entry['fetched_at'] < self.ttl(entry['url'])
+
+    @staticmethod
+    def validators(entry):
+        # Conditional request headers: the API answers 304 with no body if nothing changed
+        headers = {}
+        if entry and entry.get('etag'): headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, headers, body):
+        entry = {'url': url, 'body': body, 'fetched_at': self.clock(),
+                 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+        self._write(self._file(url), entry)
+        return entry
+
+    def touch(self, entry):
+        # 304 Not Modified: the stored body is current again for another TTL
+        entry['fetched_at'] = self.clock()
+        self._write(self._file(entry['url']), entry)
+
+    def prune(self):
+        """Deletes the entries not fetched or revalidated within the longest TTL; returns how many.
+
+        Run after the job's requests: what it asked for was just stored or
+        touched, so only entries no request uses any more go.
+        """
+        if self.mode != 'cache': return 0 # A cassette keeps everything
+        cutoff = self.clock() - max(TTL.values())
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json') or name == META_FILE: continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    old = json.load(f)['fetched_at'] < cutoff
+            except (OSError, ValueError, KeyError):
+                old = True # Unreadable: would be refetched anyway
+            if old:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def recorded_at(self):
+        """When the cassette was recorded (replay runs use it as 'now', so the request URLs match)"""
+        with open(os.path.join(self.directory, META_FILE)) as f:
+            return datetime.fromisoformat(json.load(f)['recorded_at'])
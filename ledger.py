@@ -0,0 +1,91 @@
+import db
+
+# Pickles used before bets moved into the database, imported once
+LEGACY_PENDING_FILE = 'bet_log.pkl'
+LEGACY_ARCHIVE_FILE = 'bet_archive.pkl'
+
+STAKE = 10
+# We don't have real odds at prediction time, so we simulate 1.80 for Home/Away
+SIM_ODDS = 1.80
+
+def legacy_key(home, away):
+    # Old bets were keyed by "home vs away", which collides across seasons
+    return f"{home} vs {away}"
+
+class BetLedger:
+    """Paper-trading bets with O(1) placement checks and settlement per match.
+
+    Only the pending set is held in memory; settled bets live in the
+    database's bets table and are represented here by their fixture ids.
+    """
+    def __init__(self, pending=None, settled_ids=None):
+        self.pending = pending if pending is not None else {}
+        self.settled_ids = settled_ids if settled_ids is not None else set()
+        self.changed = [] # Bets placed or settled since load, written by save()
+
+    @classmethod
+    def load(cls, conn):
+        pending = {}
+        for bet in db.pending_bets(conn):
+            key = bet['fixture_id'] if bet['fixture_id'] is not None else bet['match']
+            pending[key] = bet
+        ledger = cls(pending, db.settled_fixture_ids(conn))
+        if not pending and not ledger.settled_ids:
+            ledger.import_pickles()
+        return ledger
+
+    def import_pickles(self, pending_path=LEGACY_PENDING_FILE, archive_path=LEGACY_ARCHIVE_FILE):
+        import joblib # Only needed for the one-off import
+        bets = []
+        for path in (pending_path, archive_path):
+            try: data = joblib.load(path)
+            except FileNotFoundError: continue
+            # Flat bet_log list, or the {fixture id: bet} pending dict
+            bets.extend(data.values() if isinstance(data, dict) else data)
+        for bet in bets:
+            bet = dict(bet, confidence=float(bet['confidence']))
+            if bet['status'] == 'Pending':
+                self.pending[bet.get('fixture_id', bet['match'])] = bet
+            elif bet.get('fixture_id') is not None:
+                self.settled_ids.add(bet['fixture_id'])
+            self.changed.append(bet)
+
+    def save(self, conn):
+        db.save_bets(conn, self.changed)
+        self.changed = []
+
+    def has_bet(self, fixture_id):
+        return fixture_id in self.pending or fixture_id in self.settled_ids
+
+    def place(self, fixture_id, bet):
+        # Returns False if this fixture already has a bet
+        if self.has_bet(fixture_id): return False
+        if bet['match'] in self.pending:
+            # Bet from the old "home vs away" format: re-key it by fixture id
+            old = self.pending[fixture_id] = self.pending.pop(bet['match'])
+            old['fixture_id'] = fixture_id
+            self.changed.append(old)
+            return False
+        new = self.pending[fixture_id] = dict(bet, fixture_id=fixture_id, status='Pending', result='-', profit=0)
+        self.changed.append(new)
+        return True
+
+    def settle(self, fixture_id, home, away, hg, ag):
+        """Settles the pending bet on this match (if any)"""
+        bet = self.pending.pop(fixture_id, None)
+        if bet is None:
+            bet = self.pending.pop(legacy_key(home, away), None)
+        if bet is None: return None
+
+        actual = 'Draw'
+        if hg > ag: actual = 'Home'
+        elif ag > hg: actual = 'Away'
+
+        bet['result'] = 'Won' if bet['pick'] == actual else 'Lost'
+        bet['status'] = 'Settled'
+        # Profit = (Stake * Odds) - Stake
+        bet['profit'] = (STAKE * SIM_ODDS) - STAKE if bet['result'] == 'Won' else -STAKE
+        bet['fixture_id'] = fixture_id
+        self.settled_ids.add(fixture_id)
+        self.changed.append(bet)
+        return bet
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from model import DEFAULT_TOL, score_matrices
+
+# Full market surface off one joint scoreline grid per fixture.
+# Every selection is settled on the grid as a win weight and a loss weight per
+# scoreline (quarter lines are two half stakes, whole lines push), so pricing N
+# fixtures is one (N, G*G) x (G*G, selections) product.
+
+TOTAL_LINES = tuple(np.arange(0.5, 6.75, 0.25)) # 0.5, 0.75, 1.0, ... 6.5 (Asian totals included)
+HANDICAP_LINES = tuple(np.arange(-3, 3.25, 0.25)) # Home side's handicap, -3 ... +3
+TEAM_TOTAL_LINES = (0.5, 1.5, 2.5, 3.5)
+CORRECT_SCORE_MAX = 5 # Exact scores up to 5-5, the rest go to "Other" buckets
+DEFAULT_MARGIN = 0.05 # Bookmaker overround added by margin_odds
+MIN_ODDS = 1.01
+
+def _settle(x, line):
+    """(win, loss) weights of a bet that wins when x + line > 0, per grid cell.
+
+    Quarter lines (.25 / .75) are split into two half stakes on the neighbouring
+    lines; x + line == 0 is a push.
+    """
+    halves = (line - 0.25, line + 0.25) if (line * 4) % 2 == 1 else (line, line)
+    win = sum(0.5 * (x + h > 0) for h in halves)
+    loss = sum(0.5 * (x + h < 0) for h in halves)
+    return win, loss
+
+def selections(size):
+    """The selections priced on a size x size grid: (table of market / selection / line,
+    win weights (S, size, size), loss weights (S, size, size))"""
+    i, j = np.meshgrid(np.arange(size), np.arange(size), indexing='ij')
+    diff, total = (i - j).astype(float), (i + j).astype(float)
+    rows, wins, losses = [], [], []
+
+    def add(market, selection, line, win, loss=None):
+        rows.append((market, selection, line))
+        wins.append(np.asarray(win, dtype=float))
+        losses.append(np.asarray(1 - win if loss is None else loss, dtype=float))
+
+    # Result markets
+    add('1X2', 'Home', np.nan, diff > 0)
+    add('1X2', 'Draw', np.nan, diff == 0)
+    add('1X2', 'Away', np.nan, diff < 0)
+    add('Double Chance', 'Home or Draw', np.nan, diff >= 0)
+    add('Double Chance', 'Home or Away', np.nan, diff != 0)
+    add('Double Chance', 'Draw or Away', np.nan, diff <= 0)
+    add('Draw No Bet', 'Home', np.nan, *_settle(diff, 0))
+    add('Draw No Bet', 'Away', np.nan, *_settle(-diff, 0))
+    for line in HANDICAP_LINES:
+        add('Asian Handicap', 'Home', line, *_settle(diff, line))
+        add('Asian Handicap', 'Away', -line, *_settle(-diff, -line))
+
+    # Goal markets
+    for line in TOTAL_LINES:
+        add('Total Goals', 'Over', line, *_settle(total, -line))
+        add('Total Goals', 'Under', line, *_settle(-total, line))
+    for side, goals in (('Home', i), ('Away', j)):
+        for line in TEAM_TOTAL_LINES:
+            add(f'{side} Total', 'Over', line, *_settle(goals, -line))
+            add(f'{side} Total', 'Under', line, *_settle(-goals, line))
+    add('Both Teams To Score', 'Yes', np.nan, (i > 0) & (j > 0))
+    add('Both Teams To Score', 'No', np.nan, (i == 0) | (j == 0))
+
+    # Correct score, with the scores beyond CORRECT_SCORE_MAX bucketed by result
+    exact = (i <= CORRECT_SCORE_MAX) & (j <= CORRECT_SCORE_MAX)
+    for h in range(CORRECT_SCORE_MAX + 1):
+        for a in range(CORRECT_SCORE_MAX + 1):
+            add('Correct Score', f'{h}-{a}', np.nan, (i == h) & (j == a))
+    add('Correct Score', 'Other Home Win', np.nan, ~exact & (diff > 0))
+    add('Correct Score', 'Other Draw', np.nan, ~exact & (diff == 0))
+    add('Correct Score', 'Other Away Win', np.nan, ~exact & (diff < 0))
+
+    table = pd.DataFrame(rows, columns=['market', 'selection', 'line'])
+    return table, np.array(wins), np.array(losses)
+
+_selections = {} # grid size -> selections(size), built once per process
+
+def price_markets(home_xg, away_xg, rho=None, margin=DEFAULT_MARGIN, tol=DEFAULT_TOL):
+    """Every market for N fixtures in one pass: a long table with a row per fixture and selection.
+
+    Columns: fixture (0..N-1), market, selection, line, probability (win, half-wins counted
+    half), push, fair_odds and odds (with margin added). rho (optional, per fixture) is
+    the Dixon-Coles low-score correction.
+    """
+    home_xg = np.atleast_1d(np.asarray(home_xg, dtype=float))
+    away_xg = np.atleast_1d(np.asarray(away_xg, dtype=float))
+    matrices = score_matrices(home_xg, away_xg, tol, rho, min_goals=CORRECT_SCORE_MAX + 1)
+    size = matrices.shape[1]
+    if size not in _selections:
+        _selections[size] = selections(size)
+    table, wins, losses = _selections[size]
+
+    flat = matrices.reshape(len(matrices), -1)
+    win = flat @ wins.reshape(len(wins), -1).T # (N, S)
+    loss = flat @ losses.reshape(len(losses), -1).T
+    push = flat @ (1 - wins - losses).reshape(len(wins), -1).T
+    fair = fair_odds(win, loss)
+
+    out = pd.DataFrame({
+        'fixture': np.repeat(np.arange(len(home_xg)), len(table)),
+        'market': np.tile(table['market'].to_numpy(), len(home_xg)),
+        'selection': np.tile(table['selection'].to_numpy(), len(home_xg)),
+        'line': np.tile(table['line'].to_numpy(), len(home_xg)),
+        'probability': win.ravel(),
+        'push': push.ravel(),
+        'fair_odds': fair.ravel(),
+    })
+    out['odds'] = margin_odds(out['fair_odds'].to_numpy(), margin)
+    return out
+
+def fair_odds(win, loss):
+    """Zero-expectation decimal odds: win * (odds - 1) == loss (pushes return the stake)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(win > 0, 1 + loss / win, np.inf)
+
+def margin_odds(fair, margin=DEFAULT_MARGIN):
+    # Proportional overround: every implied probability scaled by (1 + margin)
+    return np.maximum(np.asarray(fair) / (1 + margin), MIN_ODDS)
+
+def market(book, name, fixture=0):
+    """One market of one fixture from a price_markets table, e.g. market(book, 'Asian Handicap')"""
+    rows = book[(book['fixture'] == fixture) & (book['market'] == name)]
+    return rows.drop(columns=['fixture', 'market']).reset_index(drop=True)
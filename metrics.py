@@ -0,0 +1,155 @@
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+try:
+    import resource # Not on Windows
+except ImportError:
+    resource = None
+
+def peak_rss_mb():
+    # Peak resident memory of this process so far (ru_maxrss is KB on Linux, bytes on macOS)
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+class _NoSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NO_SPAN = _NoSpan()
+
+class Metrics:
+    """Timing spans, HTTP call records and counters for one run of the daily job.
+
+    Stages are sequential: stage('train') closes the previous stage and opens
+    the next one. When disabled every call returns straight away, so the
+    instrumentation can stay in the hot paths.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.stages = []
+        self.spans = []
+        self.http = []
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+        self._stage = None
+
+    def _now(self):
+        return time.perf_counter() - self.started
+
+    def stage(self, name):
+        if not self.enabled: return
+        self._end_stage()
+        self._stage = {'name': name, 'start_s': round(self._now(), 4)}
+
+    def _end_stage(self):
+        if self._stage is None: return
+        self._stage['duration_ms'] = round((self._now() - self._stage['start_s']) * 1000, 2)
+        self._stage['peak_rss_mb'] = peak_rss_mb()
+        self.stages.append(self._stage)
+        self._stage = None
+
+    def span(self, name, **attrs):
+        """Context manager timing a block inside the current stage"""
+        if not self.enabled: return _NO_SPAN
+        return _Span(self, name, attrs)
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        with self.lock:
+            self.counters[name] += n
+
+    def record_http(self, path, status, latency, size, retries, sleep):
+        # One record per logical GET: latency summed over attempts, sleep = rate limit + backoff waits
+        if not self.enabled: return
+        with self.lock:
+            self.http.append({'path': path, 'status': status, 'latency_ms': round(latency * 1000, 2),
+                              'bytes': size, 'retries': retries, 'sleep_s': round(sleep, 3),
+                              'end_s': round(self._now(), 4)})
+            self.counters['http_requests'] += 1
+            self.counters['http_retries'] += retries
+
+    def finish(self):
+        if not self.enabled: return None
+        self._end_stage()
+        return {
+            'started_at': self.started_at,
+            'duration_s': round(self._now(), 3),
+            'argv': sys.argv,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages,
+            'spans': self.spans,
+            'http': self.http,
+            'counters': dict(self.counters),
+        }
+
+    def write(self, path):
+        report = self.finish()
+        if report is None: return
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def write_prometheus(self, path, prefix='football_job'):
+        """Text exposition format, for a node_exporter textfile collector or a Pushgateway"""
+        report = self.finish()
+        if report is None: return
+        lines = []
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_str}}} {value}" if label_str else f"{prefix}_{name} {value}")
+
+        metric('duration_seconds', 'gauge', "Wall time of the whole run", [({}, report['duration_s'])])
+        metric('stage_duration_seconds', 'gauge', "Wall time per stage",
+               [({'stage': s['name']}, round(s['duration_ms'] / 1000, 5)) for s in report['stages']])
+        if report['peak_rss_mb'] is not None:
+            metric('peak_rss_bytes', 'gauge', "Peak resident memory", [({}, int(report['peak_rss_mb'] * 1024 * 1024))])
+
+        by_status = defaultdict(lambda: [0, 0.0, 0, 0.0])
+        for h in report['http']:
+            s = by_status[str(h['status'])]
+            s[0] += 1; s[1] += h['latency_ms'] / 1000; s[2] += h['bytes']; s[3] += h['sleep_s']
+        metric('http_requests_total', 'counter', "API calls by final status",
+               [({'status': k}, v[0]) for k, v in by_status.items()])
+        metric('http_latency_seconds_total', 'counter', "Time spent in API calls",
+               [({'status': k}, round(v[1], 4)) for k, v in by_status.items()])
+        metric('http_response_bytes_total', 'counter', "Response body bytes",
+               [({'status': k}, v[2]) for k, v in by_status.items()])
+        metric('http_sleep_seconds_total', 'counter', "Time spent waiting on the rate limit and backoff",
+               [({}, round(sum(v[3] for v in by_status.values()), 3))])
+        metric('http_retries_total', 'counter', "Retried API attempts", [({}, report['counters'].get('http_retries', 0))])
+        for name, value in sorted(report['counters'].items()):
+            if name in ('http_requests', 'http_retries'): continue # Already out above, from the call records
+            metric(f'{name}_total', 'counter', name.replace('_', ' ').capitalize(), [({}, value)])
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+class _Span:
+    def __init__(self, metrics, name, attrs):
+        self.metrics = metrics
+        self.record = dict(attrs, name=name)
+
+    def __enter__(self):
+        self.start = self.metrics._now()
+        return self
+
+    def __exit__(self, *exc):
+        m = self.metrics
+        self.record['start_s'] = round(self.start, 4)
+        self.record['duration_ms'] = round((m._now() - self.start) * 1000, 2)
+        if m._stage: self.record['stage'] = m._stage['name']
+        with m.lock:
+            m.spans.append(self.record)
+        return False
+
+# Shared stand-in for callers that aren't collecting metrics
+DISABLED = Metrics(enabled=False)
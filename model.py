@@ -1,16 +1,72 @@
 import numpy as np
 from scipy.stats import poisson
 
+# Probability mass we allow to fall outside the truncated scoreline grid (per team)
+DEFAULT_TOL = 1e-9
+
+def max_goals_for(home_xg, away_xg, tol=DEFAULT_TOL):
+    # Smallest N with P(goals > N) <= tol for the higher-scoring side,
+    # so the N x N grid misses at most 2 * tol of the joint distribution
+    return int(poisson.isf(tol, max(home_xg, away_xg)))
+
+def score_matrix(home_xg, away_xg, max_goals=None, tol=DEFAULT_TOL):
+    """Joint P(home goals = i, away goals = j) for i, j in 0..max_goals"""
+    if max_goals is None:
+        max_goals = max_goals_for(home_xg, away_xg, tol)
+    goals = np.arange(max_goals + 1)
+    return np.outer(poisson.pmf(goals, home_xg), poisson.pmf(goals, away_xg))
+
+def score_matrices(home_xg, away_xg, tol=DEFAULT_TOL, rho=None, min_goals=0):
+    """Joint scoreline grids for N fixtures at once: (N, G, G), one shared G sized for the highest xG.
+
+    rho (optional, per fixture) applies the Dixon-Coles low-score correction.
+    """
+    goals = np.arange(max(max_goals_for(home_xg.max(), away_xg.max(), tol), min_goals) + 1)
+    h_pmf = poisson.pmf(goals[None, :], home_xg[:, None])
+    a_pmf = poisson.pmf(goals[None, :], away_xg[:, None])
+    matrices = h_pmf[:, :, None] * a_pmf[:, None, :]
+    if rho is not None:
+        rho = np.broadcast_to(np.asarray(rho, dtype=float), home_xg.shape)
+        matrices[:, 0, 0] *= 1 - home_xg * away_xg * rho
+        matrices[:, 0, 1] *= 1 + home_xg * rho
+        matrices[:, 1, 0] *= 1 + away_xg * rho
+        matrices[:, 1, 1] *= 1 - rho
+    return matrices
+
+def markets_from_matrix(matrix):
+    goals = np.arange(matrix.shape[0])
+    total_goals = goals[:, None] + goals[None, :]
+    return {
+        "Home Win": float(np.tril(matrix, -1).sum()),
+        "Draw": float(np.trace(matrix)),
+        "Away Win": float(np.triu(matrix, 1).sum()),
+        "Over 2.5": float(1 - matrix[total_goals <= 2].sum()),
+        "BTTS": float(matrix[1:, 1:].sum())
+    }
+
+class ScorelineEngine:
+    """Exact drop-in for MonteCarloEngine: reads the markets off the scoreline matrix"""
+    def __init__(self, home_xg, away_xg, tol=DEFAULT_TOL):
+        self.home_xg = home_xg
+        self.away_xg = away_xg
+        self.tol = tol
+
+    def run_simulation(self, num_simulations=None):
+        # num_simulations is only accepted so MonteCarloEngine callers keep working
+        return markets_from_matrix(score_matrix(self.home_xg, self.away_xg, tol=self.tol))
+
 class MonteCarloEngine:
-    def __init__(self, home_xg, away_xg):
+    def __init__(self, home_xg, away_xg, rng=None):
         self.home_xg = home_xg
         self.away_xg = away_xg
+        # Pass np.random.default_rng(seed) for reproducible runs
+        self.rng = rng if rng is not None else np.random.default_rng()
 
     def run_simulation(self, num_simulations=10000):
         # SIMULATION LOOP
         # We simulate 10,000 matches instantly using Poisson distribution
-        home_goals = np.random.poisson(self.home_xg, num_simulations)
-        away_goals = np.random.poisson(self.away_xg, num_simulations)
+        home_goals = self.rng.poisson(self.home_xg, num_simulations)
+        away_goals = self.rng.poisson(self.away_xg, num_simulations)
 
         # CALCULATE RESULTS
         home_wins = np.sum(home_goals > away_goals)
@@ -30,6 +86,15 @@ class MonteCarloEngine:
             "BTTS": btts / num_simulations
         }
 
+def xg_from_form(h_scored, h_conceded, h_games, a_scored, a_conceded, a_games):
+    # Paper-trading xG: the home side's home form against the away side's away form.
+    # Goal totals over the recent window; a side with no games there gets typical rates.
+    h_att = h_scored / h_games if h_games else 1.5
+    h_def = h_conceded / h_games if h_games else 1.2
+    a_att = a_scored / a_games if a_games else 1.2
+    a_def = a_conceded / a_games if a_games else 1.5
+    return (h_att + a_def) / 2, (a_att + h_def) / 2
+
 def calculate_xg(home_scored, home_conceded, home_games, 
                  away_scored, away_conceded, away_games, 
                  league_avg_home, league_avg_away):
@@ -45,4 +110,57 @@ def calculate_xg(home_scored, home_conceded, home_games,
     home_expected_goals = home_att_rating * away_def_rating * league_avg_home
     away_expected_goals = away_att_rating * home_def_rating * league_avg_away
 
-    return home_expected_goals, away_expected_goals
\ No newline at end of file
+    return home_expected_goals, away_expected_goals
+
+# --- BATCH PRICING ---
+# One row per fixture, same markets as the engines above
+MARKETS_DTYPE = np.dtype([
+    ('home_xg', 'f8'), ('away_xg', 'f8'),
+    ('home_win', 'f8'), ('draw', 'f8'), ('away_win', 'f8'),
+    ('over_2_5', 'f8'), ('btts', 'f8')
+])
+
+def price_fixtures(home_xg, away_xg, num_simulations=None, rng=None, tol=DEFAULT_TOL):
+    """Prices N fixtures in a single NumPy pass.
+
+    Exact (scoreline matrices) by default; pass num_simulations to sample
+    instead, using rng (a np.random.Generator) for reproducible draws.
+    """
+    home_xg = np.atleast_1d(np.asarray(home_xg, dtype=float))
+    away_xg = np.atleast_1d(np.asarray(away_xg, dtype=float))
+    out = np.zeros(len(home_xg), dtype=MARKETS_DTYPE)
+    out['home_xg'] = home_xg
+    out['away_xg'] = away_xg
+    if len(out) == 0:
+        return out
+
+    if num_simulations:
+        rng = rng if rng is not None else np.random.default_rng()
+        h = rng.poisson(home_xg[:, None], (len(out), num_simulations))
+        a = rng.poisson(away_xg[:, None], (len(out), num_simulations))
+        out['home_win'] = np.mean(h > a, axis=1)
+        out['draw'] = np.mean(h == a, axis=1)
+        out['away_win'] = np.mean(h < a, axis=1)
+        out['over_2_5'] = np.mean(h + a > 2.5, axis=1)
+        out['btts'] = np.mean((h > 0) & (a > 0), axis=1)
+        return out
+
+    matrices = score_matrices(home_xg, away_xg, tol)
+    goals = np.arange(matrices.shape[1])
+    i, j = goals[:, None], goals[None, :]
+    out['home_win'] = np.einsum('nij,ij->n', matrices, i > j)
+    out['draw'] = np.einsum('nij,ij->n', matrices, i == j)
+    out['away_win'] = np.einsum('nij,ij->n', matrices, i < j)
+    out['over_2_5'] = 1 - np.einsum('nij,ij->n', matrices, i + j <= 2)
+    out['btts'] = (1 - np.exp(-home_xg)) * (1 - np.exp(-away_xg)) # P(0 goals) = exp(-xG)
+    return out
+
+def price_from_stats(home_scored, home_conceded, home_games,
+                     away_scored, away_conceded, away_games,
+                     league_avg_home, league_avg_away, **kwargs):
+    # calculate_xg is plain arithmetic, so it works element-wise on arrays
+    h_xg, a_xg = calculate_xg(*(np.asarray(x, dtype=float) for x in (
+        home_scored, home_conceded, home_games,
+        away_scored, away_conceded, away_games,
+        league_avg_home, league_avg_away)))
+    return price_fixtures(h_xg, a_xg, **kwargs)
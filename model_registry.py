@@ -0,0 +1,71 @@
+import json
+import os
+import joblib
+from publish import dumps, sha256, write_atomic
+
+# Versioned models: models/logistic_v0001.pkl, logistic_v0002.pkl, ... plus
+# models/registry.json with what each version was trained on. A version is
+# only added when the model actually changed; the newest KEEP_VERSIONS files
+# stay on disk, older entries keep their metadata.
+REGISTRY_DIR = 'models'
+INDEX_FILE = 'registry.json'
+KEEP_VERSIONS = 14
+
+class ModelRegistry:
+    """The registry in directory, written through a publish.Publisher when one is given"""
+    def __init__(self, directory=REGISTRY_DIR, publisher=None, name='logistic'):
+        self.directory = directory
+        self.publisher = publisher
+        self.name = name
+        try:
+            with open(self.path(INDEX_FILE)) as f:
+                self.versions = json.load(f)['versions']
+        except (OSError, ValueError):
+            self.versions = []
+
+    def path(self, file):
+        return os.path.join(self.directory, file)
+
+    def latest(self):
+        return self.versions[-1] if self.versions else None
+
+    def get(self, version):
+        for entry in self.versions:
+            if entry['version'] == version: return entry
+        raise KeyError(f"No {self.name} model version {version} in {self.directory}/")
+
+    def load(self, version=None):
+        """The model at version (default: the latest)"""
+        entry = self.get(version) if version is not None else self.latest()
+        if entry is None or not entry['file']:
+            raise FileNotFoundError(f"No stored {self.name} model version {version} in {self.directory}/")
+        return joblib.load(self.path(entry['file']))
+
+    def register(self, model, **meta):
+        """Stores model as a new version (unless it is the latest one unchanged) and returns its entry.
+
+        meta: whatever describes the fit (rows, features, trained date, ...), kept in registry.json.
+        """
+        data = dumps(model)
+        digest = sha256(data)
+        latest = self.latest()
+        if latest and latest['sha256'] == digest:
+            return latest
+        version = latest['version'] + 1 if latest else 1
+        entry = dict(meta, version=version, file=f'{self.name}_v{version:04d}.pkl', sha256=digest)
+        self._write(entry['file'], data)
+        self.versions.append(entry)
+        for old in self.versions[:-KEEP_VERSIONS]:
+            if old['file']:
+                self._remove(old['file'])
+                old['file'] = None
+        self._write(INDEX_FILE, (json.dumps({'versions': self.versions}, indent=1, sort_keys=True) + '\n').encode())
+        return entry
+
+    def _write(self, file, data):
+        if self.publisher is not None: self.publisher.write(self.path(file), data)
+        else: write_atomic(self.path(file), data)
+
+    def _remove(self, file):
+        if self.publisher is not None: self.publisher.remove(self.path(file))
+        elif os.path.exists(self.path(file)): os.remove(self.path(file))
@@ -0,0 +1,10 @@
+"""The daily football job as importable stages.
+
+    python -m pipeline run              # everything, what train_ai.py does
+    python -m pipeline train            # one stage, from the last checkpoint
+    python -m pipeline run --from train # the rest of the run from that stage
+    python -m pipeline run --replay DIR # offline, from API responses saved with --record DIR
+
+Stage functions live in pipeline.stages and only import pandas, scipy and
+sklearn inside the stages that need them; numpy comes in with the state.
+"""
@@ -0,0 +1,74 @@
+import argparse
+from pipeline.config import CHECKPOINT_DIR
+from pipeline.stages import STAGES
+from pipeline.state import Run
+from metrics import Metrics
+
+ORDER = list(STAGES)
+
+def run_stages(run, names, checkpoint_dir=None):
+    """Runs the named stages in order, checkpointing after each one if checkpoint_dir is set"""
+    for name in names:
+        run.metrics.stage(name)
+        STAGES[name](run)
+        if checkpoint_dir:
+            with run.metrics.span('checkpoint', stage=name):
+                run.checkpoint(name, checkpoint_dir)
+    return run
+
+def start_run(first_stage, full_rebuild, metrics, checkpoint_dir):
+    # Fetch starts from the saved pipeline state, every later stage from the checkpoint before it
+    if first_stage == ORDER[0]:
+        metrics.stage('load_state')
+        return Run.start(full_rebuild, metrics)
+    return Run.resume(ORDER[ORDER.index(first_stage) - 1], metrics, checkpoint_dir)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pipeline',
+                                     description="Daily football data update, training and paper trading")
+    parser.add_argument('command', choices=['run'] + ORDER,
+                        help="'run' for the whole job, or a single stage re-run from the checkpoint before it")
+    parser.add_argument('--from', dest='from_stage', choices=ORDER, default=ORDER[0],
+                        help="With 'run': start at this stage, from the checkpoint before it")
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help="Ignore the saved state and replay every FINISHED match from scratch")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help=f"With 'run': save the run after every stage to {CHECKPOINT_DIR}/ (single stages always do)")
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR)
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='DIR',
+                          help="Fetch everything from the API and save the responses here as a cassette")
+    cassette.add_argument('--replay', metavar='DIR',
+                          help="Run offline from a recorded cassette, on the day it was recorded")
+    cassette.add_argument('--no-http-cache', action='store_true', help="Always download, never store responses")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Write stage timings, API call stats, counters and peak memory here (JSON)")
+    parser.add_argument('--prometheus', metavar='PATH', help="Also write them in Prometheus text format")
+    args = parser.parse_args(argv)
+
+    # Stage timings / HTTP stats; every call is a no-op unless an output was asked for
+    metrics = Metrics(enabled=bool(args.metrics or args.prometheus))
+
+    if args.command == 'run':
+        names = ORDER[ORDER.index(args.from_stage):]
+        checkpoint_dir = args.checkpoint_dir if args.checkpoint or args.from_stage != ORDER[0] else None
+        print("🚀 STARTING AI ENGINE & PROFIT TRACKER...")
+    else:
+        names = [args.command]
+        checkpoint_dir = args.checkpoint_dir
+
+    if names[0] != ORDER[0] and args.full_rebuild:
+        parser.error("--full-rebuild only applies when starting from fetch")
+    if names[0] != ORDER[0] and (args.record or args.replay):
+        parser.error("--record / --replay only apply when starting from fetch")
+    run = start_run(names[0], args.full_rebuild, metrics, checkpoint_dir)
+    if args.record: run.http_cache = ('record', args.record)
+    if args.replay: run.http_cache = ('replay', args.replay)
+    if args.no_http_cache: run.http_cache = ('off', None)
+    run_stages(run, names, checkpoint_dir)
+
+    if args.metrics:
+        metrics.write(args.metrics)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+    return run
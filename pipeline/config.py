@@ -0,0 +1,34 @@
+import os
+
+# --- CONFIGURATION ---
+FOOTBALL_KEY = os.environ.get("FOOTBALL_KEY")
+NBA_KEY = os.environ.get("NBA_KEY")
+NFL_KEY = os.environ.get("NFL_KEY")
+
+COMPETITIONS = ['PL', 'BL1', 'SA', 'PD', 'FL1', 'DED', 'PPL', 'CL']
+
+# Requests per minute allowed by our football-data.org plan (free tier = 10)
+FOOTBALL_RATE_LIMIT = int(os.environ.get("FOOTBALL_RATE_LIMIT", 10))
+
+# Paper trading: matches of form behind the Poisson xG, and the confidence needed to bet
+FORM_WINDOW = 10
+BET_THRESHOLD = 0.70
+
+# Disk cache of API responses under the fetcher (see http_cache.py):
+# 'cache' (TTLs + conditional requests), 'off', or 'record' / 'replay' a cassette in HTTP_CACHE_DIR
+HTTP_CACHE = os.environ.get("HTTP_CACHE", "cache")
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", ".http_cache")
+
+# How far ahead the scheduled fixtures go
+FIXTURE_DAYS = 7
+
+# Simulated seasons behind the title / top-4 / relegation / knockout probabilities
+SEASON_SIMS = int(os.environ.get("SEASON_SIMS", 100_000))
+# Fixed, so a run without new results projects the same table (and leaves football.db alone)
+SEASON_SEED = 0
+
+# Everything the Elo/history replay needs to pick up where the last run stopped
+STATE_FILE = 'pipeline_state.pkl'
+MODEL_FILE = 'logistic_model.pkl'
+# The run as it stood after each stage, so any stage can be re-run without refetching
+CHECKPOINT_DIR = '.pipeline'
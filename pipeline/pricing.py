@@ -0,0 +1,107 @@
+import hashlib
+import os
+from datetime import date
+import numpy as np
+from elo import HOME_ADVANTAGE, INITIAL_RATING
+from feature_store import FeatureStore, matrix
+from model import MARKETS_DTYPE, price_fixtures, xg_from_form
+from pipeline.config import FORM_WINDOW, MODEL_FILE
+
+# Fixture pricing shared by the daily job's paper trading, the prediction server
+# and the dashboard
+
+PRICING_VERSION = 2 # Bump when price_slate's maths changes, so cached prices aren't reused
+
+def form_xg(history_store, home, away):
+    h_games, h_s, h_c = history_store.form(home, 'home', FORM_WINDOW)
+    a_games, a_s, a_c = history_store.form(away, 'away', FORM_WINDOW)
+    return xg_from_form(h_s, h_c, h_games, a_s, a_c, a_games)
+
+def match_xg(strengths, history_store, comp, home, away):
+    # Fitted Dixon-Coles strengths when the league has them, recent form otherwise
+    strength = (strengths or {}).get(comp)
+    if strength and home in strength and away in strength:
+        return strength.xg(home, away)
+    return form_xg(history_store, home, away)
+
+def logistic_proba(model, features):
+    # predict_proba without sklearn's per-call input validation, which costs more
+    # than the maths for a handful of fixtures (the server prices a few per batch)
+    # A model from before the feature store was trained on elo_diff alone
+    X = features['elo_diff'].astype(float)[:, None] if model.coef_.shape[1] == 1 else matrix(features)
+    if len(model.classes_) < 3:
+        return model.predict_proba(X)
+    z = X @ model.coef_.T + model.intercept_
+    if hasattr(model, 'solver') and getattr(model, 'multi_class', None) != 'ovr' and model.solver != 'liblinear':
+        z = np.exp(z - z.max(axis=1, keepdims=True)) # Multinomial LogisticRegression: softmax
+    else:
+        z = 1 / (1 + np.exp(-z)) # One-vs-rest (the SGD model): normalized sigmoids, like sklearn's predict_proba
+    return z / z.sum(axis=1, keepdims=True)
+
+def fixture_features(feature_store, fixtures, elo_ratings, dates=None):
+    """The logistic model's FEATURE_DTYPE inputs for (comp, home, away) fixtures, dated dates (default today)"""
+    elo_diff = [(elo_ratings.get(home, INITIAL_RATING) + HOME_ADVANTAGE) - elo_ratings.get(away, INITIAL_RATING)
+                for _, home, away in fixtures]
+    if dates is None: dates = [date.today().isoformat()] * len(fixtures)
+    return (feature_store or FeatureStore()).fixture_features([f[1:] for f in fixtures], elo_diff, [str(d)[:10] for d in dates])
+
+def price_slate(fixtures, elo_ratings, history_store, strengths, model, feature_store=None, dates=None, features=None):
+    """Prices (comp, home, away) fixtures in one pass: MARKETS_DTYPE rows.
+
+    home_win / draw / away_win blend the Poisson prices with the logistic
+    model half and half; over_2_5 and btts are the Poisson ones. features
+    are the fixtures' precomputed fixture_features, if the caller has them.
+    """
+    out = np.zeros(len(fixtures), dtype=MARKETS_DTYPE)
+    if not fixtures: return out
+    xgs = np.array([match_xg(strengths, history_store, comp, home, away) for comp, home, away in fixtures])
+    out[:] = price_fixtures(xgs[:, 0], xgs[:, 1])
+
+    if features is None:
+        features = fixture_features(feature_store, fixtures, elo_ratings, dates)
+    log_probs = logistic_proba(model, features)
+    out['home_win'] = (out['home_win'] + log_probs[:, 2]) / 2
+    out['draw'] = (out['draw'] + log_probs[:, 1]) / 2
+    out['away_win'] = (out['away_win'] + log_probs[:, 0]) / 2
+    return out
+
+# --- PREDICTION CACHE ---
+def model_version(paths=None):
+    """Content hash of the model artifacts (logistic model + Dixon-Coles strengths) and the pricing code"""
+    import data_loader
+    import dixon_coles
+    paths = tuple(p for p in (paths or (MODEL_FILE, dixon_coles.MODEL_FILE)) if os.path.exists(p))
+    h = hashlib.sha256(f"{PRICING_VERSION}:{MARKETS_DTYPE.descr}".encode())
+    h.update(data_loader.content_hash(paths).encode())
+    return h.hexdigest()[:16]
+
+def state_hash(features, history_store, home, away):
+    # Everything price_slate reads about the fixture besides the model: its logistic
+    # inputs (Elo, form, rest, head to head) and the Poisson form (as plain ints /
+    # floats, so an in-memory store and a loaded one hash the same)
+    state = (tuple(map(float, features.tolist())),
+             tuple(map(int, history_store.form(home, 'home', FORM_WINDOW))),
+             tuple(map(int, history_store.form(away, 'away', FORM_WINDOW))))
+    return hashlib.sha1(repr(state).encode()).hexdigest()[:16]
+
+def cached_price_slate(cache, keys, fixtures, elo_ratings, history_store, strengths, model, version,
+                       feature_store=None, dates=None):
+    """price_slate through the prediction cache: only fixtures that are new, or whose teams
+    or model changed since they were last priced, are computed (keys: one fixture id each)"""
+    if cache is None:
+        return price_slate(fixtures, elo_ratings, history_store, strengths, model, feature_store, dates)
+    features = fixture_features(feature_store, fixtures, elo_ratings, dates)
+    lookup = [(str(key), version, state_hash(row, history_store, home, away))
+              for key, (_, home, away), row in zip(keys, fixtures, features)]
+    found = cache.get_many(lookup)
+    out = np.zeros(len(fixtures), dtype=MARKETS_DTYPE)
+    missing = []
+    for i, key in enumerate(lookup):
+        if key in found: out[i] = found[key]
+        else: missing.append(i)
+    if missing:
+        priced = price_slate([fixtures[i] for i in missing], elo_ratings, history_store, strengths, model,
+                             features=features[missing])
+        out[missing] = priced
+        cache.put_many([(lookup[i], fixtures[i][1], fixtures[i][2], row) for i, row in zip(missing, priced)])
+    return out
@@ -0,0 +1,44 @@
+from elo import K_FACTOR, HOME_ADVANTAGE, INITIAL_RATING, expected_home
+from history_store import cached_days
+from records import HISTORY_DTYPE, RecordBuffer
+
+# Elo and team_history bookkeeping on the pipeline state dicts
+
+def get_elo(state, team):
+    return state['elo_ratings'].get(team, INITIAL_RATING)
+
+def elo_diff(state, home, away):
+    return (get_elo(state, home) + HOME_ADVANTAGE) - get_elo(state, away)
+
+def update_elo(state, home, away, h_goals, a_goals, match_date=None):
+    elo_ratings, elo_history = state['elo_ratings'], state['elo_history']
+    R_home = get_elo(state, home)
+    R_away = get_elo(state, away)
+    # Parameters tuned with `python elo.py` (vectorized sweep over the stored history)
+    E_home = expected_home(R_home, R_away, HOME_ADVANTAGE)
+    if h_goals > a_goals: S_home = 1
+    elif h_goals == a_goals: S_home = 0.5
+    else: S_home = 0
+    change = K_FACTOR * (S_home - E_home)
+    elo_ratings[home] = R_home + change
+    elo_ratings[away] = R_away - change
+    day = cached_days(match_date)
+    elo_history.record(home, day, elo_ratings[home])
+    elo_history.record(away, day, elo_ratings[away])
+
+def init_team(state, team_name):
+    # Names come from the state's interning table, so every row shares one string per team
+    team_name = state['names'].intern(team_name)
+    team_history = state['team_history']
+    if team_name not in team_history:
+        team_history[team_name] = {v: RecordBuffer(HISTORY_DTYPE) for v in ('home', 'away', 'all')}
+        state['elo_ratings'][team_name] = INITIAL_RATING
+    return team_name
+
+def add_result(state, home, away, hg, ag, match_date):
+    # Stats Update
+    team_history = state['team_history']
+    day = cached_days(match_date)
+    for team, venue, scored, conceded in ((home, 'home', hg, ag), (home, 'all', hg, ag),
+                                          (away, 'away', ag, hg), (away, 'all', ag, hg)):
+        team_history[team][venue].append((scored, conceded, day))
@@ -0,0 +1,372 @@
+import os
+from datetime import datetime, timedelta
+import db
+from pipeline.config import (FOOTBALL_KEY, COMPETITIONS, FOOTBALL_RATE_LIMIT,
+                             BET_THRESHOLD, FIXTURE_DAYS, SEASON_SIMS, SEASON_SEED, STATE_FILE, MODEL_FILE)
+
+# Each stage takes the Run and extends it. pandas / scipy / sklearn are imported
+# inside the stages that use them, so `settle` never loads them (numpy is always
+# loaded: the state's feature store and rating history are built on it).
+
+def _ledger(run):
+    if run.ledger is None:
+        from ledger import BetLedger
+        conn = db.connect()
+        try:
+            # Pending bets indexed by API match id, settled ones stay in the database
+            run.ledger = BetLedger.load(conn)
+        finally:
+            conn.close()
+    return run.ledger
+
+def _history_store(run):
+    # Columnar copy of team_history: what the form queries and the apps read
+    if run.history_store is None:
+        from history_store import TeamHistoryStore
+        run.history_store = TeamHistoryStore.from_dict(run.state['team_history'])
+    return run.history_store
+
+def _publisher(run):
+    # Change-only writes of the job's artifacts, plus manifest.json (see publish.py)
+    if run.publisher is None:
+        from publish import Publisher
+        run.publisher = Publisher(today=run.today or datetime.now().strftime('%Y-%m-%d'))
+    return run.publisher
+
+def _all_matches(run):
+    # Every stored match plus this run's new ones, oldest first, with interned names
+    from records import Match
+    intern = run.state['names'].intern
+    conn = db.connect()
+    try:
+        new_ids = {row[0] for row in run.match_rows}
+        all_matches = [Match(i, intern(comp), date, intern(home), intern(away), hg, ag)
+                       for i, comp, date, home, away, hg, ag in db.matches(conn) if i not in new_ids] + run.match_rows
+    finally:
+        conn.close()
+    all_matches.sort(key=lambda r: (r[2], r[0]))
+    return all_matches
+
+# ==========================================
+# ⚽ FETCH: FINISHED + SCHEDULED for every competition, concurrently
+# ==========================================
+def fetch(run):
+    from fetcher import FootballClient
+    from http_cache import ResponseCache
+    print("\n⚽ FOOTBALL: Updating Data...")
+    mode, cache_dir = run.http_cache
+    cache = ResponseCache(cache_dir, mode) if mode != 'off' else None
+    # A replayed run happens on the day it was recorded, so it asks for the same URLs
+    now = cache.recorded_at() if mode == 'replay' else datetime.now()
+    if mode in ('record', 'replay'):
+        print(f"📼 {mode.capitalize()}ing API responses: {cache_dir}/")
+    run.today = today_str = now.strftime('%Y-%m-%d')
+    future_str = (now + timedelta(days=FIXTURE_DAYS)).strftime('%Y-%m-%d')
+
+    finished_paths = []
+    for comp in COMPETITIONS:
+        path = f"competitions/{comp}/matches?status=FINISHED"
+        mark = run.state['watermarks'].get(comp)
+        if mark:
+            # The API wants both ends of the range; the watermark day itself is
+            # re-fetched and already processed matches are skipped in ingest
+            path += f"&dateFrom={mark['utcDate'][:10]}&dateTo={today_str}"
+        finished_paths.append(path)
+    scheduled_paths = [f"competitions/{comp}/matches?status=SCHEDULED&dateFrom={today_str}&dateTo={future_str}" for comp in COMPETITIONS]
+
+    client = FootballClient(FOOTBALL_KEY, rate_per_minute=FOOTBALL_RATE_LIMIT, metrics=run.metrics, cache=cache)
+    try:
+        responses = client.get_many(finished_paths + scheduled_paths)
+    finally:
+        client.close()
+    if cache is not None:
+        run.metrics.count('http_cache_pruned', cache.prune())
+    run.finished_data = responses[:len(COMPETITIONS)]
+    run.scheduled_data = responses[len(COMPETITIONS):]
+
+# ==========================================
+# 📥 INGEST: new results into team_history, the upcoming slate into fixtures
+# ==========================================
+def ingest(run):
+    from pipeline.ratings import init_team, add_result
+    from records import Match, Fixture
+    state = run.state
+    logos, watermarks, intern = state['logos'], state['watermarks'], state['names'].intern
+
+    # Only the matches newer than each competition's watermark
+    for comp, data in zip(COMPETITIONS, run.finished_data):
+        mark = watermarks.get(comp)
+        if not data: continue
+        matches = data.get('matches', [])
+        matches.sort(key=lambda x: (x['utcDate'], x['id']))
+
+        for m in matches:
+            if m['score']['fullTime']['home'] is None: continue
+            if mark and (m['utcDate'], m['id']) <= (mark['utcDate'], mark['id']): continue
+
+            home = init_team(state, m['homeTeam']['name'])
+            away = init_team(state, m['awayTeam']['name'])
+            hg = int(m['score']['fullTime']['home'])
+            ag = int(m['score']['fullTime']['away'])
+
+            # Init Data
+            logos['teams'][home] = m['homeTeam']['crest']
+            logos['teams'][away] = m['awayTeam']['crest']
+            logos['leagues'][intern(m['competition']['name'])] = m['competition']['emblem']
+
+            add_result(state, home, away, hg, ag, m['utcDate'][:10])
+            run.match_rows.append(Match(m['id'], comp, m['utcDate'], home, away, hg, ag))
+            mark = watermarks[comp] = {'utcDate': m['utcDate'], 'id': m['id']}
+
+    print(f"📥 Processed {len(run.match_rows)} new matches.")
+    run.metrics.count('matches_processed', len(run.match_rows))
+
+    for comp, data in zip(COMPETITIONS, run.scheduled_data):
+        if not data: continue
+        for m in data.get('matches', []):
+            home = intern(m['homeTeam']['name'])
+            away = intern(m['awayTeam']['name'])
+            league = intern(m['competition']['name'])
+
+            # Add to Upcoming List
+            run.fixture_rows.append(Fixture(m['id'], league, m['utcDate'], home, away, comp))
+            logos['leagues'][league] = m['competition']['emblem']
+
+            if home in state['team_history'] and away in state['team_history']:
+                run.candidates.append((m['id'], comp, home, away, m['utcDate'][:10]))
+    run.metrics.count('fixtures_scheduled', len(run.fixture_rows))
+
+# ==========================================
+# 📈 RATE: Elo replay over the new results
+# ==========================================
+def rate(run):
+    from pipeline.ratings import elo_diff, update_elo
+    state = run.state
+    diffs = []
+    for _, _, utc_date, home, away, hg, ag in run.match_rows:
+        # The pre-match Elo difference (a model input), then the Elo update
+        diffs.append(elo_diff(state, home, away))
+        update_elo(state, home, away, hg, ag, utc_date)
+    # Form, rest and head-to-head for the new matches, in one vectorized pass
+    with run.metrics.span('feature_store.append', matches=len(diffs)):
+        state['features'].append(run.match_rows, diffs)
+
+# ==========================================
+# 💰 SETTLE: the bet resolver
+# ==========================================
+def settle(run):
+    ledger = _ledger(run)
+    for fixture_id, _, _, home, away, hg, ag in run.match_rows:
+        # Settle the pending bet on this match, if we have one
+        bet = ledger.settle(fixture_id, home, away, hg, ag)
+        if bet:
+            print(f"💰 Resolved Bet: {bet['match']} -> {bet['result']}")
+            run.metrics.count('bets_resolved')
+
+# ==========================================
+# 🧠 TRAIN: the logistic model and the Dixon-Coles team strengths
+# ==========================================
+def train(run):
+    import joblib
+    from feature_store import FEATURES
+    from model_registry import ModelRegistry
+    from pipeline import training
+    store = run.state['features']
+    registry = ModelRegistry(publisher=_publisher(run))
+    latest = registry.latest()
+    if len(store):
+        # Yesterday's model learns just the rows it hasn't seen; a rebuilt history,
+        # a changed feature set or changed training settings get a fit from scratch
+        model, start = None, 0
+        if (latest and latest['file'] and not run.full_rebuild
+                and latest['features'] == list(FEATURES) and latest['rows'] <= len(store)):
+            model, start = registry.load(), latest['rows']
+            if not training.compatible(model): model, start = None, 0
+        X, y = store.training_set(start)
+        if model is None or len(y):
+            # Scored before the update: how the model did on matches it hadn't seen
+            score = training.log_loss(model, X, y) if model is not None else None
+            with run.metrics.span('logistic_fit', rows=len(y), warm=model is not None):
+                model = training.fit(X, y, model)
+            entry = registry.register(model, rows=len(store), features=list(FEATURES), trained=run.today,
+                                      fit='update' if start else 'full', new_rows=len(y), log_loss=score)
+            print(f"🧠 Logistic model v{entry['version']} ({'updated on' if start else 'fitted on'} {len(y)} matches"
+                  + (f", log loss {score:.3f} before the update)" if score is not None else ")"))
+        _publisher(run).write_pickle(MODEL_FILE, model) # The current version, where the apps load it
+        run.model = model
+
+    # Team strengths: one Dixon-Coles fit per league over every stored match,
+    # warm-started from the last run's parameters
+    import dixon_coles
+    try: strengths = joblib.load(dixon_coles.MODEL_FILE)
+    except Exception: strengths = {}
+    all_matches = _all_matches(run)
+    if all_matches:
+        with run.metrics.span('dixon_coles_fit', matches=len(all_matches)):
+            strengths = dixon_coles.fit_leagues([r[1:] for r in all_matches], strengths,
+                                                as_of=run.today or datetime.now().strftime('%Y-%m-%d'),
+                                                changed={row[1] for row in run.match_rows})
+        _publisher(run).write_pickle(dixon_coles.MODEL_FILE, strengths)
+        print(f"📐 Team strengths fitted ({', '.join(f'{c}: {s.n_iter} it' for c, s in strengths.items())})")
+    run.strengths = strengths
+
+# ==========================================
+# 💎 PREDICT: price the slate and paper-trade the confident picks
+# ==========================================
+def get_poisson_probs(run, comp, home, away):
+    from model import ScorelineEngine
+    from pipeline.pricing import match_xg
+    store = _history_store(run)
+    if home not in store or away not in store: return 0,0,0
+    probs = ScorelineEngine(*match_xg(run.strengths, store, comp, home, away)).run_simulation()
+    return probs['Home Win'], probs['Draw'], probs['Away Win']
+
+def _load_models(run):
+    # A re-run predict picks up what train wrote
+    import joblib
+    import dixon_coles
+    if run.model is None:
+        run.model = joblib.load(MODEL_FILE)
+    if run.strengths is None:
+        try: run.strengths = joblib.load(dixon_coles.MODEL_FILE)
+        except Exception: run.strengths = {}
+
+def predict(run):
+    print("📅 Generating Predictions & Diamond Picks...")
+    candidates = run.candidates
+    run.metrics.count('fixtures_priced', len(candidates))
+    if not candidates: return
+
+    from prediction_cache import PredictionCache
+    from pipeline.pricing import cached_price_slate, model_version
+    _load_models(run)
+    ledger = _ledger(run)
+
+    # Price the whole slate at once: one Poisson pass and one predict_proba call,
+    # combined with Elo/Logistic. Fixtures whose teams haven't played since the
+    # last run (and an unchanged model) come out of the shared prediction cache.
+    cache = PredictionCache()
+    cache.invalidate_teams([team for row in run.match_rows for team in row[3:5]])
+    with run.metrics.span('price_slate', fixtures=len(candidates)):
+        prices = cached_price_slate(cache, [c[0] for c in candidates],
+                                    [(comp, home, away) for _, comp, home, away, _ in candidates],
+                                    run.state['elo_ratings'], _history_store(run), run.strengths, run.model,
+                                    model_version(), run.state['features'], [c[4] for c in candidates])
+    run.metrics.count('prediction_cache_hits', cache.hits)
+    cache.close()
+    final_h, final_a = prices['home_win'], prices['away_win']
+
+    for (fixture_id, _, home, away, match_date), f_h, f_a in zip(candidates, final_h, final_a):
+        # DIAMOND TIER THRESHOLD (>70%)
+        pick = None
+        if f_h > BET_THRESHOLD: pick = 'Home'
+        elif f_a > BET_THRESHOLD: pick = 'Away'
+
+        if pick:
+            match_id = f"{home} vs {away}"
+            # Avoid duplicates (O(1) lookup on the fixture id)
+            if ledger.place(fixture_id, {
+                'date': match_date,
+                'match': match_id,
+                'pick': pick,
+                'confidence': float(max(f_h, f_a))
+            }):
+                print(f"💎 New Bet Placed: {match_id} ({pick})")
+                run.metrics.count('bets_placed')
+
+# ==========================================
+# 🎲 SIMULATE: the rest of every season, SEASON_SIMS times
+# ==========================================
+def simulate(run):
+    import season
+    from pipeline.pricing import match_xg
+    _load_models(run)
+    store, strengths = _history_store(run), run.strengths
+    fixtures = [(row[5], row[3], row[4]) for row in run.fixture_rows]
+    today = run.today or datetime.now().strftime('%Y-%m-%d')
+    with run.metrics.span('season_simulation', sims=SEASON_SIMS):
+        # One process per competition
+        run.standings, run.projections = season.project(
+            _all_matches(run), fixtures, lambda comp: lambda home, away: match_xg(strengths, store, comp, home, away),
+            COMPETITIONS, today, SEASON_SIMS, SEASON_SEED)
+    for comp, df in run.projections.items():
+        outcome = 'winner' if comp == season.CL else 'title'
+        favourite = df.loc[df[outcome].idxmax()]
+        print(f"🎲 {comp}: {favourite['team']} favourites ({favourite[outcome]:.0%} over {SEASON_SIMS} seasons)")
+
+# ==========================================
+# 💾 PERSIST: state, team_history/ and football.db
+# ==========================================
+def persist(run):
+    state = run.state
+    publisher = _publisher(run)
+    with run.metrics.span('joblib.dump', file=STATE_FILE):
+        publisher.write_pickle(STATE_FILE, state)
+    with run.metrics.span('history_store.save'):
+        _history_store(run).save(publisher=publisher) # team_history/ (memory-mappable .npy columns)
+    state['features'].save(publisher=publisher) # features/: the match table the apps price fixtures from
+
+    ledger = _ledger(run)
+    conn = db.connect()
+    before = db.content_hash(conn)
+    # One transaction: the dashboards never see a half-written update
+    with run.metrics.span('db.commit'), conn:
+        if run.full_rebuild:
+            db.reset_ratings(conn)
+        # The Elo series of every team that played, as the bounded history now holds it
+        history = state['elo_history']
+        db.replace_elo_history(conn, [row for team in sorted({t for m in run.match_rows for t in m[3:5]})
+                                      for row in history.rows(team)])
+        db.upsert_matches(conn, run.match_rows)
+        db.replace_fixtures(conn, run.fixture_rows)
+        db.upsert_elo(conn, state['elo_ratings'])
+        db.upsert_logos(conn, state['logos'])
+        db.replace_standings(conn, [(comp, row.team, int(row.position), int(row.points))
+                                    for comp, table in run.standings.items() for row in table.itertuples()])
+        db.replace_projections(conn, [(comp, team, outcome, float(value)) for comp, df in run.projections.items()
+                                      for team, outcome, value in df.melt('team').itertuples(index=False)])
+        ledger.save(conn) # SAVING THE PROFIT TRACKER
+        # Nothing new: roll back, so football.db (and its git history) isn't rewritten
+        run.db_changed = db.content_hash(conn) != before
+        if not run.db_changed: conn.rollback()
+    conn.close()
+
+# ==========================================
+# 📦 PUBLISH: manifest.json, the last file the job writes
+# ==========================================
+def publish(run):
+    import dixon_coles
+    from feature_store import FEATURE_DIR
+    from history_store import HISTORY_DIR
+    from model_registry import REGISTRY_DIR
+    from prediction_cache import CACHE_FILE
+    publisher = _publisher(run)
+    # football.db is updated in place, so it's hashed as it is on disk, and only
+    # when persist changed it. Artifacts this run didn't write (a stage re-run on
+    # its own, no new data to train on) are checked against their last published
+    # hash the same way. The prediction cache is rebuilt by the apps, not published.
+    publisher.artifacts.pop(CACHE_FILE, None)
+    if run.db_changed and not publisher.seen(db.DB_FILE): publisher.record(db.DB_FILE)
+    for path in (STATE_FILE, MODEL_FILE, dixon_coles.MODEL_FILE):
+        if not publisher.seen(path): publisher.record(path)
+    for path in list(publisher.artifacts):
+        if path.split(os.sep)[0] in (HISTORY_DIR, FEATURE_DIR, REGISTRY_DIR) and not publisher.seen(path):
+            publisher.record(path)
+    publisher.save()
+    run.metrics.count('artifacts_written', len(publisher.written))
+    run.metrics.count('artifacts_unchanged', len(publisher.unchanged))
+    print(f"📦 Published {len(publisher.written)} changed artifacts ({len(publisher.unchanged)} unchanged)")
+    print("\n✅ DONE. Database & Bankroll Updated.")
+
+# Run order; settle comes before predict so a finished match's bet is off the books first
+STAGES = {
+    'fetch': fetch,
+    'ingest': ingest,
+    'rate': rate,
+    'settle': settle,
+    'train': train,
+    'predict': predict,
+    'simulate': simulate,
+    'persist': persist,
+    'publish': publish,
+}
@@ -0,0 +1,134 @@
+import os
+import pickle
+from pipeline.config import STATE_FILE, CHECKPOINT_DIR, HTTP_CACHE, HTTP_CACHE_DIR
+import metrics as job_metrics
+from rating_history import RatingHistory
+from feature_store import FeatureStore
+from records import Interner, compact_state
+
+# --- STORAGE ---
+def empty_state():
+    return {
+        'names': Interner(), # One shared string (and a small id) per team / competition name
+        'team_history': {}, # team -> venue -> RecordBuffer of (scored, conceded, day)
+        'elo_ratings': {},
+        'elo_history': RatingHistory(), # Dated ratings per team, bounded in size
+        'features': FeatureStore(), # Every finished match with its pre-match model inputs
+        'logos': {'leagues': {}, 'teams': {}},
+        'watermarks': {} # comp -> {'utcDate', 'id'} of the last processed match
+    }
+
+def load_state(path=STATE_FILE):
+    """The saved pipeline state, or None if there is none (or it can't be read)"""
+    import joblib
+    try: state = joblib.load(path)
+    except Exception:
+        print("ℹ️ No saved state found, running a full rebuild.")
+        return None
+    if not isinstance(state['elo_history'], RatingHistory):
+        # Saved before the bounded history: the dates of its points are in football.db
+        import db
+        conn = db.connect(readonly=True) if os.path.exists(db.DB_FILE) else None
+        try:
+            rows = db.all_elo_history(conn) if conn else []
+        finally:
+            if conn: conn.close()
+        state['elo_history'] = RatingHistory.from_legacy(state['elo_history'], rows)
+    compact_state(state) # States saved before the compact records
+    if 'features' not in state:
+        # Saved with just the (elo_diff, result) training rows: rebuild from football.db
+        state.pop('training_data', None)
+        state['features'] = rebuild_features()
+    return state
+
+def rebuild_features():
+    """A FeatureStore of every match in football.db, its Elo differences from a fresh replay"""
+    import db
+    from pipeline.ratings import elo_diff, update_elo
+    from records import Match
+    if not os.path.exists(db.DB_FILE): return FeatureStore()
+    conn = db.connect(readonly=True)
+    try:
+        matches = sorted((Match(*row) for row in db.matches(conn)), key=lambda m: (m.utc_date, m.id))
+    finally:
+        conn.close()
+    scratch = {'elo_ratings': {}, 'elo_history': RatingHistory()}
+    diffs = []
+    for m in matches:
+        diffs.append(elo_diff(scratch, m.home, m.away))
+        update_elo(scratch, m.home, m.away, m.home_goals, m.away_goals, m.utc_date)
+    store = FeatureStore()
+    store.append(matches, diffs)
+    print(f"ℹ️ Feature store rebuilt from {len(store)} stored matches.")
+    return store
+
+class Run:
+    """Everything one run of the job carries from stage to stage.
+
+    state is the persisted pipeline state (pipeline_state.pkl); the rest is
+    this run's working set: the API responses, the new matches and Elo
+    points, the fixtures and the bet ledger. Stages read and extend it in
+    order, and a checkpoint after each stage lets any of them be re-run.
+    """
+    # Heavy objects that are rebuilt or reloaded from their own files instead of checkpointed
+    TRANSIENT = ('metrics', 'history_store', 'model', 'strengths', 'publisher')
+
+    def __init__(self, state, full_rebuild=False, metrics=None):
+        self.state = state
+        self.full_rebuild = full_rebuild
+        self.metrics = metrics or job_metrics.DISABLED
+        self.today = None # Run date, fixed by fetch so re-run stages agree with it
+        self.http_cache = (HTTP_CACHE, HTTP_CACHE_DIR) # (mode, directory) of the fetcher's response cache
+        self.finished_data = []
+        self.scheduled_data = []
+        self.match_rows = [] # New rows for the matches table, in processing order
+        self.fixture_rows = []
+        self.candidates = [] # Fixtures we can price: (id, comp, home, away, date)
+        self.standings = {} # comp -> current table (DataFrame)
+        self.projections = {} # comp -> simulated season probabilities (DataFrame)
+        self.db_changed = False # Whether persist wrote anything new to football.db
+        self.ledger = None # Checkpointed with its unsaved bets: persist re-saving them is a no-op
+        self.history_store = None
+        self.model = None
+        self.strengths = None
+        self.publisher = None
+
+    @classmethod
+    def start(cls, full_rebuild=False, metrics=None):
+        state = None if full_rebuild else load_state()
+        # Without a saved state every match is replayed: the stored ratings and the
+        # registry's model are from some other history, so it's a full rebuild too
+        return cls(state or empty_state(), full_rebuild or state is None, metrics)
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self.TRANSIENT}
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        for k in self.TRANSIENT:
+            self.__dict__.setdefault(k, None)
+        self.metrics = job_metrics.DISABLED
+
+    # --- CHECKPOINTS ---
+    @staticmethod
+    def checkpoint_path(stage, directory=CHECKPOINT_DIR):
+        return os.path.join(directory, f'{stage}.pkl')
+
+    def checkpoint(self, stage, directory=CHECKPOINT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = self.checkpoint_path(stage, directory)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def resume(cls, stage, metrics=None, directory=CHECKPOINT_DIR):
+        """The run as it was after stage, e.g. to re-run the stage that follows it"""
+        path = cls.checkpoint_path(stage, directory)
+        try:
+            with open(path, 'rb') as f:
+                run = pickle.load(f)
+        except FileNotFoundError:
+            raise SystemExit(f"❌ No checkpoint for '{stage}' in {directory}/, run the earlier stages first.")
+        run.metrics = metrics or job_metrics.DISABLED
+        return run
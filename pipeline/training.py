@@ -0,0 +1,39 @@
+import numpy as np
+from feature_store import CLASSES
+
+# The 1X2 logistic model on the feature store's inputs, trained with SGD so a
+# day's new matches update yesterday's model instead of refitting on everything
+
+ALPHA = 1e-3 # L2 penalty; matches a full LogisticRegression fit on held-out log loss
+# Constant step size: sklearn's default 'optimal' schedule starts with steps of
+# 1 / alpha and a model fitted on a short history never recovers from them
+ETA0 = 0.01
+FIT_EPOCHS = 10 # Shuffled passes for a fit from scratch
+UPDATE_EPOCHS = 1 # Passes over the new rows for a daily update
+SEED = 0 # Fixed, so the same inputs always give the same model (and the same published bytes)
+
+def new_model():
+    from sklearn.linear_model import SGDClassifier
+    # average=True: the averaged weights are far steadier from one small update to the next
+    return SGDClassifier(loss='log_loss', alpha=ALPHA, learning_rate='constant', eta0=ETA0, average=True,
+                         random_state=SEED)
+
+def compatible(model):
+    # Whether model can be updated rather than refitted: trained with today's settings
+    return model.get_params() == new_model().get_params()
+
+def fit(X, y, model=None):
+    """A new model fitted on (X, y), or model updated with them in place (warm start)"""
+    epochs = UPDATE_EPOCHS if model is not None else FIT_EPOCHS
+    model = model if model is not None else new_model()
+    rng = np.random.default_rng(SEED)
+    for _ in range(epochs):
+        order = rng.permutation(len(y)) if epochs > 1 else np.arange(len(y))
+        model.partial_fit(X[order], y[order], classes=CLASSES)
+    return model
+
+def log_loss(model, X, y):
+    # The model's log loss on rows it hasn't been trained on yet (None without rows)
+    if not len(y): return None
+    probs = np.clip(model.predict_proba(X)[np.arange(len(y)), np.searchsorted(model.classes_, y)], 1e-15, 1)
+    return float(-np.log(probs).mean())
@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+import time
+import numpy as np
+from model import MARKETS_DTYPE
+
+# Persistent, size-bounded cache of fixture prices, shared by the daily job,
+# the prediction server and the dashboard (they all price the same slate).
+# An entry is keyed on (fixture, model version, input state): a refit model
+# or a team that has played since gives a new key, so stale prices are never
+# read, only left behind for the LRU eviction (or dropped by invalidate_teams).
+# Each checkout keeps its own; the file isn't committed or published.
+CACHE_FILE = 'prediction_cache.db'
+MAX_ENTRIES = 20000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    fixture TEXT NOT NULL,           -- API fixture id, or 'competition|home|away'
+    version TEXT NOT NULL,           -- model version (hash of the model artifacts)
+    state TEXT NOT NULL,             -- hash of both teams' Elo and form
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    prices BLOB NOT NULL,            -- one MARKETS_DTYPE row
+    last_used REAL NOT NULL,
+    PRIMARY KEY (fixture, version, state)
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_used ON predictions (last_used);
+CREATE INDEX IF NOT EXISTS idx_predictions_home ON predictions (home);
+CREATE INDEX IF NOT EXISTS idx_predictions_away ON predictions (away);
+"""
+
+class PredictionCache:
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self.lock = threading.Lock() # One connection, shared by the server's / Streamlit's threads
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL") # The apps read while the job writes
+        self.conn.execute("PRAGMA synchronous=NORMAL") # A lost entry after a power cut only costs a re-price
+        self.conn.executescript(SCHEMA)
+
+    def get_many(self, keys):
+        """{(fixture, version, state): MARKETS_DTYPE row} for the keys that are cached"""
+        wanted = set(keys)
+        found = {}
+        with self.lock:
+            # One query per model version and chunk of fixtures, the states are matched here
+            by_version = {}
+            for fixture, version, _ in wanted:
+                by_version.setdefault(version, set()).add(fixture)
+            for version, fixtures in by_version.items():
+                fixtures = list(fixtures)
+                for i in range(0, len(fixtures), 500):
+                    chunk = fixtures[i:i + 500]
+                    rows = self.conn.execute(f"SELECT fixture, state, prices FROM predictions WHERE version = ? "
+                                             f"AND fixture IN ({', '.join('?' * len(chunk))})", [version] + chunk)
+                    for fixture, state, prices in rows:
+                        key = (fixture, version, state)
+                        if key in wanted: found[key] = np.frombuffer(prices, dtype=MARKETS_DTYPE)[0]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            if found:
+                try:
+                    with self.conn:
+                        self.conn.executemany("UPDATE predictions SET last_used = ? WHERE fixture = ? AND version = ? AND state = ?",
+                                              [(time.time(),) + key for key in found])
+                except sqlite3.OperationalError:
+                    pass # Busy or read-only: the recency update can wait
+        return found
+
+    def put_many(self, entries):
+        """entries: ((fixture, version, state), home, away, MARKETS_DTYPE row); evicts the least recently used beyond max_entries"""
+        now = time.time()
+        rows = [key + (home, away, np.asarray(prices, dtype=MARKETS_DTYPE).tobytes(), now) for key, home, away, prices in entries]
+        with self.lock:
+            try:
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                    excess = self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_entries
+                    if excess > 0:
+                        self.conn.execute("DELETE FROM predictions WHERE rowid IN "
+                                          "(SELECT rowid FROM predictions ORDER BY last_used LIMIT ?)", (excess,))
+            except sqlite3.OperationalError:
+                pass # Busy or read-only: the prices were still computed, just not kept
+
+    def invalidate_teams(self, teams):
+        """Drops every entry involving these teams (their state changed, those keys can't be hit again)"""
+        teams = list(set(teams))
+        with self.lock, self.conn:
+            for i in range(0, len(teams), 500):
+                chunk = teams[i:i + 500]
+                marks = ', '.join('?' * len(chunk))
+                self.conn.execute(f"DELETE FROM predictions WHERE home IN ({marks}) OR away IN ({marks})", chunk + chunk)
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def stats(self):
+        return {'entries': len(self), 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,115 @@
+import hashlib
+import io
+import json
+import os
+import joblib
+
+# Change-only publishing of the daily job's artifacts. Every artifact is
+# serialized to bytes first and content-hashed; a file whose hash matches
+# the manifest isn't touched (no new mtime, no git diff, no reload in the
+# apps), a changed one is written next to its target and renamed into place.
+# manifest.json lists each artifact's sha256, size and version and is
+# written last, so a consumer that sees a new manifest sees the new files.
+MANIFEST_FILE = 'manifest.json'
+PICKLE_PROTOCOL = 4 # Fixed, so the bytes don't depend on the Python that wrote them
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def dumps(obj):
+    """joblib bytes of obj: the same object always gives the same bytes"""
+    buf = io.BytesIO()
+    joblib.dump(obj, buf, protocol=PICKLE_PROTOCOL)
+    return buf.getvalue()
+
+def write_atomic(path, data):
+    # Readers (and memory-mapped .npy files) never see a half-written file
+    directory = os.path.dirname(path)
+    if directory: os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+def read_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'artifacts': {}}
+
+class Publisher:
+    """Writes artifacts only when their content changed, and keeps the manifest.
+
+    Paths are stored as given (relative to the repo root, like the job writes them).
+    """
+    def __init__(self, manifest_path=MANIFEST_FILE, today=None):
+        self.manifest_path = manifest_path
+        self.manifest = read_manifest(manifest_path)
+        self.today = today
+        self.written = []
+        self.unchanged = []
+
+    @property
+    def artifacts(self):
+        return self.manifest['artifacts']
+
+    def seen(self, path):
+        return path in self.written or path in self.unchanged
+
+    def _record(self, path, digest, size):
+        entry = self.artifacts.get(path)
+        if entry and entry['sha256'] == digest:
+            self.unchanged.append(path)
+            return False
+        self.artifacts[path] = {'sha256': digest, 'size': size,
+                                'version': entry['version'] + 1 if entry else 1, 'updated': self.today}
+        self.written.append(path)
+        return True
+
+    def write(self, path, data):
+        """Publishes bytes at path; False (and no write) if the file already holds them"""
+        entry = self.artifacts.get(path)
+        digest = sha256(data)
+        on_disk = os.path.exists(path) and os.path.getsize(path) == len(data)
+        if on_disk and entry and entry['sha256'] == digest:
+            self.unchanged.append(path)
+            return False
+        if on_disk and not entry and file_hash(path) == digest:
+            # Identical but not listed yet (the first run with a manifest): list it, don't rewrite it
+            self.artifacts[path] = {'sha256': digest, 'size': len(data), 'version': 1, 'updated': self.today}
+            self.unchanged.append(path)
+            return False
+        write_atomic(path, data)
+        if entry and entry['sha256'] == digest:
+            self.written.append(path) # Restored a missing or damaged file: same content, same version
+            return True
+        return self._record(path, digest, len(data))
+
+    def write_pickle(self, path, obj):
+        return self.write(path, dumps(obj))
+
+    def remove(self, path):
+        # A retired artifact: off the disk and out of the manifest
+        if os.path.exists(path): os.remove(path)
+        if self.artifacts.pop(path, None) is not None:
+            self.written.append(path)
+
+    def record(self, path):
+        """For files written in place (the SQLite databases): hash what's on disk"""
+        if not os.path.exists(path): return False
+        return self._record(path, file_hash(path), os.path.getsize(path))
+
+    def save(self):
+        # Sorted, stable JSON: an unchanged manifest is byte-for-byte the same file
+        data = (json.dumps(self.manifest, indent=1, sort_keys=True) + '\n').encode()
+        if os.path.exists(self.manifest_path) and file_hash(self.manifest_path) == sha256(data):
+            return False
+        write_atomic(self.manifest_path, data)
+        return True
@@ -0,0 +1,134 @@
+import numpy as np
+from elo import INITIAL_RATING
+from history_store import EPOCH, _to_days, cached_days
+
+# Per-team Elo history with bounded size: the last RECENT_POINTS ratings at full
+# resolution, older ones downsampled to the last rating of each week and capped
+# at ARCHIVE_WEEKS, so the state pickle stops growing with every season.
+RECENT_POINTS = 100 # ~2 seasons of league + cup games
+ARCHIVE_WEEKS = 520 # ~10 years of weekly points before that
+# day: history_store's uint16 days since EPOCH (0 = unknown date); float32 is plenty for a chart
+POINT_DTYPE = np.dtype([('day', 'u2'), ('rating', 'f4')])
+
+def _week(days):
+    # EPOCH (2000-01-01) is a Saturday: weeks run Monday to Sunday
+    return (days.astype(np.int32) + 5) // 7
+
+class TeamRatings:
+    __slots__ = ('points', 'pending', 'count', 'trimmed')
+
+    def __init__(self, points=None, count=0, trimmed=False):
+        self.points = points if points is not None else np.empty(0, POINT_DTYPE) # Chronological
+        self.pending = [] # New (day, rating) points, merged in batches by compact()
+        self.count = count # Ratings ever recorded, i.e. matches played
+        self.trimmed = trimmed # Weeks were dropped off the front of the archive
+
+    def compact(self):
+        if not self.pending: return
+        new = np.array(self.pending, dtype=POINT_DTYPE)
+        self.pending = []
+        points = np.concatenate([self.points, new])
+        # A run rates one competition after another, so a team's cup points can arrive after later league ones
+        points = points[np.argsort(points['day'], kind='stable')]
+        if len(points) > RECENT_POINTS:
+            older, recent = points[:-RECENT_POINTS], points[-RECENT_POINTS:]
+            week = _week(older['day'])
+            older = older[np.append(week[1:] != week[:-1], True)] # Last rating of each week
+            if len(older) > ARCHIVE_WEEKS:
+                older, self.trimmed = older[-ARCHIVE_WEEKS:], True
+            points = np.concatenate([older, recent])
+        self.points = points
+
+class RatingHistory:
+    """Dated Elo ratings per team, bounded in size (see RECENT_POINTS / ARCHIVE_WEEKS).
+
+    record() is O(1): points queue up per team and are merged and downsampled
+    every COMPACT_EVERY points, or before they are read or pickled.
+    """
+    COMPACT_EVERY = 256
+
+    def __init__(self):
+        self.teams = {}
+
+    def record(self, team, day, rating):
+        # day: days since EPOCH (history_store.cached_days(match date)), 0 if unknown
+        series = self.teams.get(team)
+        if series is None:
+            series = self.teams[team] = TeamRatings()
+        pending = series.pending
+        pending.append((day, rating))
+        series.count += 1
+        if len(pending) >= self.COMPACT_EVERY:
+            series.compact()
+
+    def count(self, team):
+        """Ratings recorded for the team so far, i.e. its matches played"""
+        series = self.teams.get(team)
+        return series.count if series else 0
+
+    def points(self, team):
+        """(dates, ratings) the history still holds for the team, oldest first"""
+        series = self.teams.get(team)
+        if series is None:
+            return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.float32)
+        series.compact()
+        days = series.points['day']
+        dates = np.where(days > 0, EPOCH + days.astype('timedelta64[D]'), np.datetime64('NaT'))
+        return dates, series.points['rating']
+
+    def rows(self, team):
+        """The team's football.db elo_history rows (team, seq, utc_date, rating), numbered in order:
+        the starting INITIAL_RATING (unless the archive was trimmed past it), then every point kept"""
+        dates, ratings = self.points(team)
+        start = [] if team in self.teams and self.teams[team].trimmed else [(team, 0, None, INITIAL_RATING)]
+        return start + [(team, seq, None if np.isnat(d) else str(d), float(r))
+                        for seq, (d, r) in enumerate(zip(dates, ratings), 1)]
+
+    def rating_at(self, team, match_date):
+        """The team's rating going into match_date (before that day's matches), by binary search.
+
+        Before the first stored point it is INITIAL_RATING, or the oldest rating
+        kept once the archive has been trimmed.
+        """
+        series = self.teams.get(team)
+        if series is None: return INITIAL_RATING
+        series.compact()
+        i = np.searchsorted(series.points['day'], _to_days(match_date), side='left') - 1
+        if i < 0:
+            return float(series.points['rating'][0]) if series.trimmed else INITIAL_RATING
+        return float(series.points['rating'][i])
+
+    def ratings_at(self, teams, dates):
+        # rating_at for (team, date) pairs, e.g. every fixture of a backtest
+        return np.array([self.rating_at(t, d) for t, d in zip(teams, dates)])
+
+    def __contains__(self, team):
+        return team in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __getstate__(self):
+        for series in self.teams.values():
+            series.compact()
+        return {t: (s.points, s.count, s.trimmed) for t, s in self.teams.items()}
+
+    def __setstate__(self, d):
+        self.teams = {t: TeamRatings(*v) for t, v in d.items()}
+
+    @classmethod
+    def from_legacy(cls, elo_history, dated_rows=()):
+        """From the old {team: [1500, rating after match 1, ...]} history.
+
+        dated_rows: football.db elo_history rows (team, seq, utc_date, rating),
+        which have the dates the old lists lack; teams without them get undated points.
+        """
+        history = cls()
+        dated = {}
+        for team, seq, utc_date, rating in dated_rows:
+            if seq > 0: dated.setdefault(team, []).append((utc_date, rating))
+        for team, ratings in elo_history.items():
+            points = dated.get(team) or [(None, r) for r in list(ratings)[1:]]
+            for utc_date, rating in points:
+                history.record(team, cached_days(utc_date), rating)
+        return history
@@ -0,0 +1,136 @@
+from collections import namedtuple
+import numpy as np
+from history_store import _to_days
+
+# Compact records for the pipeline state: one shared string per team / competition
+# name, and per-match data in typed NumPy buffers instead of lists of Python objects.
+
+# Rows the stages pass around and write to football.db (tuples, so executemany takes them as they are)
+Match = namedtuple('Match', 'id competition utc_date home away home_goals away_goals')
+Fixture = namedtuple('Fixture', 'id league utc_date home away competition')
+
+# One team_history row; day is history_store's uint16 days since EPOCH (0 = unknown date)
+HISTORY_DTYPE = np.dtype([('scored', 'i1'), ('conceded', 'i1'), ('day', 'u2')])
+
+class Interner:
+    """Team / competition names <-> small ints.
+
+    intern() hands back one shared string per name, so the thousands of
+    match rows decoded from the API or read from the database don't each
+    carry their own copy; ids are stable for the life of the state.
+    """
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.id(name)
+
+    def id(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def intern(self, name):
+        return self.names[self.id(name)]
+
+    def name(self, i):
+        return self.names[i]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __getstate__(self):
+        return self.names # The id table is rebuilt on load
+
+    def __setstate__(self, names):
+        self.__init__(names)
+
+class RecordBuffer:
+    """Append-only structured array with preallocated, doubling capacity.
+
+    append() only queues the row in a short list, which is copied into the
+    array FLUSH rows at a time (NumPy writes one row at a time are slower than
+    the Python objects they replace); .array is a view of the filled rows.
+    Pickles as just those rows.
+    """
+    FLUSH = 64
+
+    def __init__(self, dtype, capacity=16, rows=None):
+        self.dtype = np.dtype(dtype)
+        rows = np.asarray(rows, dtype=self.dtype) if rows is not None else np.empty(0, self.dtype)
+        self.data = np.empty(max(capacity, len(rows)), self.dtype)
+        self.data[:len(rows)] = rows
+        self.size = len(rows)
+        self.pending = []
+
+    def _reserve(self, n):
+        if self.size + n > len(self.data):
+            data = np.empty(max(2 * len(self.data), self.size + n), self.dtype)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+
+    def _flush(self):
+        if not self.pending: return
+        rows, self.pending = self.pending, []
+        self._reserve(len(rows))
+        self.data[self.size:self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    def append(self, row):
+        # row: a tuple of the fields, or a scalar for a plain dtype
+        pending = self.pending
+        pending.append(row)
+        if len(pending) >= self.FLUSH:
+            self._flush()
+
+    def extend(self, rows):
+        self._flush()
+        rows = np.asarray(rows, dtype=self.dtype)
+        self._reserve(len(rows))
+        self.data[self.size:self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    @property
+    def array(self):
+        self._flush()
+        return self.data[:self.size]
+
+    def __len__(self):
+        return self.size + len(self.pending)
+
+    def __getitem__(self, i):
+        return self.array[i]
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __getstate__(self):
+        return {'dtype': self.dtype, 'rows': self.array.copy()}
+
+    def __setstate__(self, d):
+        self.__init__(d['dtype'], rows=d['rows'])
+
+# --- STATE MIGRATION ---
+def history_buffer(venue):
+    """A team_history venue split: {'scored', 'conceded', 'dates'} lists -> RecordBuffer"""
+    if isinstance(venue, RecordBuffer): return venue
+    n = len(venue['scored'])
+    dates = venue.get('dates', [])
+    rows = np.zeros(n, HISTORY_DTYPE)
+    rows['scored'] = venue['scored']
+    rows['conceded'] = venue['conceded']
+    # Matches ingested before dates were tracked have no date: padded at the front
+    rows['day'][n - len(dates):] = [_to_days(d) for d in dates]
+    return RecordBuffer(HISTORY_DTYPE, rows=rows)
+
+def compact_state(state):
+    """Converts a state saved with plain lists / dicts to the compact records, in place"""
+    names = state.setdefault('names', Interner())
+    for team, venues in list(state['team_history'].items()):
+        state['team_history'][names.intern(team)] = {v: history_buffer(split) for v, split in venues.items()}
+    return state
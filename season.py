@@ -0,0 +1,362 @@
+"""Season simulator: the rest of every league (and the Champions League) played out N times.
+
+    python season.py [--competition PL] [--sims 100000] [--workers 4]
+
+Every remaining fixture is drawn from the same Poisson xG the pricing uses
+(Dixon-Coles strengths, recent form as the fallback), vectorized along the
+simulation axis: points, goal difference and goals scored are matrix
+products, and the tiebreakers one sort per simulation. The competitions run
+in parallel in a process pool.
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+N_SIMS = 100_000
+CHUNK = 10_000 # Simulations per array pass, bounds memory at ~CHUNK x fixtures
+TOP_SPOTS = 4
+# Direct relegation places (the play-off places aren't counted)
+RELEGATION_SPOTS = {'PL': 3, 'SA': 3, 'PD': 3, 'BL1': 2, 'FL1': 2, 'DED': 2, 'PPL': 2}
+CL = 'CL'
+# Champions League format since 2024/25: 8 league phase games each, the top 8
+# go straight to the last 16, 9th-24th play a two-legged knockout play-off
+CL_LEAGUE_GAMES = 8
+CL_BYES = 8
+CL_PLAYOFF = 24
+KNOCKOUT_ROUNDS = ('last_16', 'quarter_final', 'semi_final', 'final', 'winner')
+
+def season_of(utc_date):
+    # European seasons run August to May: "2025/26"
+    year, month = int(utc_date[:4]), int(utc_date[5:7])
+    start = year if month >= 7 else year - 1
+    return f"{start}/{str(start + 1)[-2:]}"
+
+# ==========================================
+# 📊 CURRENT TABLE
+# ==========================================
+def standings(rows, teams=None):
+    """League table from finished (home, away, home_goals, away_goals) rows.
+
+    Ordered by points, goal difference and goals scored; teams (optional) adds
+    the ones that haven't played yet.
+    """
+    df = pd.DataFrame(rows, columns=['home', 'away', 'hg', 'ag'])
+    home = pd.DataFrame({'team': df['home'], 'gf': df['hg'], 'ga': df['ag']})
+    away = pd.DataFrame({'team': df['away'], 'gf': df['ag'], 'ga': df['hg']})
+    games = pd.concat([home, away], ignore_index=True)
+    games['won'] = games['gf'] > games['ga']
+    games['drawn'] = games['gf'] == games['ga']
+    games['lost'] = games['gf'] < games['ga']
+    table = games.groupby('team').agg(played=('gf', 'size'), won=('won', 'sum'), drawn=('drawn', 'sum'),
+                                      lost=('lost', 'sum'), gf=('gf', 'sum'), ga=('ga', 'sum'))
+    if teams is not None:
+        table = table.reindex(sorted(set(table.index) | set(teams)), fill_value=0)
+    table['gd'] = table['gf'] - table['ga']
+    table['points'] = 3 * table['won'] + table['drawn']
+    table = table.reset_index().sort_values(['points', 'gd', 'gf', 'team'], ascending=[False, False, False, True])
+    table['position'] = np.arange(1, len(table) + 1)
+    return table.reset_index(drop=True)
+
+def remaining_round_robin(rows, teams):
+    # Domestic leagues are double round-robins: every pairing not played yet is still to come
+    played = {(home, away) for home, away, _, _ in rows}
+    return [(home, away) for home in teams for away in teams if home != away and (home, away) not in played]
+
+# ==========================================
+# 🎲 SIMULATION
+# ==========================================
+def _one_hot(idx, n):
+    m = np.zeros((len(idx), n), dtype=np.float32)
+    m[np.arange(len(idx)), idx] = 1
+    return m
+
+def rank(points, gd, gf, rng):
+    """Positions (0 = top) per simulation row: points, goal difference, goals scored, then a coin toss"""
+    key = (points * 1000.0 + gd + 500) * 1000.0 + gf + rng.random(points.shape)
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(points.shape[1]), axis=1)
+    return positions
+
+def simulate_table(table, home_idx, away_idx, lam, mu, n_sims, rng, slots=None, home_xg=None, away_xg=None):
+    """Plays out the remaining fixtures n_sims times.
+
+    table: current points / gd / gf arrays (one per team); home_idx / away_idx / lam / mu:
+    the fixtures and their expected goals. slots optionally adds games whose opponent
+    isn't known yet (team ids, one per game), each against a random other team at a
+    random venue, priced from the home_xg / away_xg pair matrices.
+    Returns (positions (n_sims, n_teams), mean final points per team).
+    """
+    n = len(table['points'])
+    home_idx, away_idx = np.asarray(home_idx, dtype=int), np.asarray(away_idx, dtype=int)
+    H, A = _one_hot(home_idx, n), _one_hot(away_idx, n)
+    slots = np.asarray(slots if slots is not None else [], dtype=int)
+    S = _one_hot(slots, n)
+    positions = np.empty((n_sims, n), dtype=np.int16)
+    total_points = np.zeros(n)
+    for start in range(0, n_sims, CHUNK):
+        m = min(CHUNK, n_sims - start)
+        hg = rng.poisson(lam, (m, len(lam))).astype(np.float32)
+        ag = rng.poisson(mu, (m, len(mu))).astype(np.float32)
+        draw = (hg == ag).astype(np.float32)
+        h_pts = 3 * (hg > ag).astype(np.float32) + draw
+        a_pts = 3 * (ag > hg).astype(np.float32) + draw
+        points = table['points'] + h_pts @ H + a_pts @ A
+        gd = table['gd'] + (hg - ag) @ (H - A)
+        gf = table['gf'] + hg @ H + ag @ A
+        if len(slots):
+            # Opponent drawn from the other teams, home or away with equal odds
+            opp = rng.integers(0, n - 1, (m, len(slots)))
+            opp += opp >= slots
+            at_home = rng.random((m, len(slots))) < 0.5
+            scored = rng.poisson(np.where(at_home, home_xg[slots, opp], away_xg[opp, slots])).astype(np.float32)
+            conceded = rng.poisson(np.where(at_home, away_xg[slots, opp], home_xg[opp, slots])).astype(np.float32)
+            points += (3 * (scored > conceded).astype(np.float32) + (scored == conceded)) @ S
+            gd += (scored - conceded) @ S
+            gf += scored @ S
+        positions[start:start + m] = rank(points, gd, gf, rng)
+        total_points += points.sum(axis=0)
+    return positions, total_points / n_sims
+
+def play_ties(a, b, home_xg, away_xg, rng, legs=2, eliminated=None):
+    """Winners of the ties a vs b (arrays of team ids, one per simulation and tie).
+
+    Two legs: a at home first, b hosts the second leg and any extra time. One leg:
+    neutral ground. Extra time is a third of a match, then penalties are a coin
+    toss. A team in eliminated (bool per team) already lost this tie for real.
+    """
+    if legs == 2:
+        rate_a = home_xg[a, b] + away_xg[b, a]
+        rate_b = away_xg[a, b] + home_xg[b, a]
+        et_a, et_b = away_xg[b, a] / 3, home_xg[b, a] / 3
+    else:
+        rate_a = (home_xg[a, b] + away_xg[b, a]) / 2
+        rate_b = (away_xg[a, b] + home_xg[b, a]) / 2
+        et_a, et_b = rate_a / 3, rate_b / 3
+    goals_a, goals_b = rng.poisson(rate_a), rng.poisson(rate_b)
+    extra_a, extra_b = rng.poisson(et_a), rng.poisson(et_b)
+    a_wins = (goals_a > goals_b) | ((goals_a == goals_b) & ((extra_a > extra_b) |
+                                                           ((extra_a == extra_b) & (rng.random(a.shape) < 0.5))))
+    if eliminated is not None:
+        a_wins = np.where(eliminated[a] & ~eliminated[b], False, np.where(eliminated[b] & ~eliminated[a], True, a_wins))
+    return np.where(a_wins, a, b)
+
+def simulate_knockout(seeds, home_xg, away_xg, rng, eliminated=None):
+    """Plays the bracket from the final league phase tables.
+
+    seeds: team ids by league phase position, one row per simulation. With 24+ teams
+    the 9th-24th play off for the last 16 (9th v 24th, ...), then the top 8 meet the
+    play-off winners (1st v the 16th/17th winner, ...); smaller fields go straight
+    to a bracket of their top 16 / 8 / ... Two legs up to the semi-finals, the final
+    on neutral ground. Returns {round: (n_teams,) count of simulations reaching it}.
+    """
+    n_sims, n = seeds.shape
+    reached = {}
+    if n >= CL_PLAYOFF:
+        # Lower seed at home first, the higher seed hosts the second leg
+        playoff = play_ties(seeds[:, CL_PLAYOFF - 1:CL_BYES - 1:-1][:, :CL_BYES], seeds[:, CL_BYES:2 * CL_BYES],
+                            home_xg, away_xg, rng, eliminated=eliminated)
+        # playoff[:, k] is the winner of (9 + k) v (24 - k); the 1st seed meets k = 7 (16th v 17th)
+        field = np.empty((n_sims, 2 * CL_BYES), dtype=seeds.dtype)
+        field[:, 0::2] = seeds[:, :CL_BYES]
+        field[:, 1::2] = playoff[:, ::-1]
+    else:
+        size = 1 << int(np.log2(max(n, 2)))
+        size = min(size, 2 * CL_BYES)
+        top = seeds[:, :size]
+        field = np.empty_like(top)
+        field[:, 0::2] = top[:, :size // 2]
+        field[:, 1::2] = top[:, size // 2:][:, ::-1]
+    # Standard bracket order, so the top two seeds can only meet in the final
+    order = _bracket_order(field.shape[1] // 2)
+    field = field.reshape(n_sims, -1, 2)[:, order].reshape(n_sims, -1)
+    rounds = KNOCKOUT_ROUNDS[-int(np.log2(field.shape[1])) - 1:]
+    for name in rounds[:-1]:
+        reached[name] = np.bincount(field.ravel(), minlength=n)
+        legs = 1 if field.shape[1] == 2 else 2
+        # Lower bracket slot at home first
+        field = play_ties(field[:, 1::2], field[:, 0::2], home_xg, away_xg, rng, legs, eliminated)
+    reached[rounds[-1]] = np.bincount(field.ravel(), minlength=n)
+    return reached
+
+def _bracket_order(n_ties):
+    # Seeded tie order for a bracket: 1 v 16 and 2 v 15 sit in opposite halves
+    order = [0]
+    while len(order) < n_ties:
+        m = 2 * len(order)
+        order = [x for i in order for x in (i, m - 1 - i)]
+    return order
+
+# ==========================================
+# ⚽ PER COMPETITION
+# ==========================================
+def pair_xg(teams, xg):
+    """(home xG, away xG) matrices for every ordered pairing of teams: [i, j] = i at home to j"""
+    n = len(teams)
+    home_xg, away_xg = np.zeros((n, n)), np.zeros((n, n))
+    for i, home in enumerate(teams):
+        for j, away in enumerate(teams):
+            if i != j: home_xg[i, j], away_xg[i, j] = xg(home, away)
+    return home_xg, away_xg
+
+def knockout_losers(rows):
+    """Teams knocked out in two-legged ties already played: the pairs that met twice,
+    lost on aggregate (level aggregates, decided by extra time or penalties, are skipped)"""
+    ties = {}
+    for home, away, hg, ag in rows:
+        goals = ties.setdefault(frozenset((home, away)), {home: 0, away: 0, 'legs': 0})
+        goals[home] += hg
+        goals[away] += ag
+        goals['legs'] += 1
+    losers = set()
+    for pair, goals in ties.items():
+        a, b = sorted(pair)
+        if goals['legs'] == 2 and goals[a] != goals[b]:
+            losers.add(a if goals[a] < goals[b] else b)
+    return losers
+
+def competition_inputs(comp, rows, fixtures, xg):
+    """Everything simulate_competition needs for one competition's current season.
+
+    rows: the season's finished (utc_date, home, away, home_goals, away_goals), oldest first;
+    fixtures: its scheduled (home, away) pairings; xg(home, away): expected goals.
+    """
+    teams = sorted({t for r in rows for t in r[1:3]} | {t for f in fixtures for t in f})
+    ids = {t: i for i, t in enumerate(teams)}
+    results = [r[1:] for r in rows]
+    eliminated = []
+    if comp == CL:
+        # League phase: each team's first CL_LEAGUE_GAMES games of the season, the rest are knockouts
+        games = dict.fromkeys(teams, 0)
+        league, knockout = [], []
+        for home, away, hg, ag in results:
+            is_league = games[home] < CL_LEAGUE_GAMES and games[away] < CL_LEAGUE_GAMES
+            (league if is_league else knockout).append((home, away, hg, ag))
+            games[home] += 1
+            games[away] += 1
+        results = league
+        played = standings(results, teams).set_index('team')['played']
+        fixtures = [(h, a) for h, a in fixtures if played[h] < CL_LEAGUE_GAMES and played[a] < CL_LEAGUE_GAMES]
+        # League phase games still to be played that aren't in the fixture list yet
+        missing = dict(played.rsub(CL_LEAGUE_GAMES).clip(lower=0))
+        for h, a in fixtures:
+            missing[h] -= 1
+            missing[a] -= 1
+        slots = [ids[t] for t in teams for _ in range(max(missing[t], 0))]
+        eliminated = sorted(knockout_losers(knockout))
+    else:
+        fixtures = remaining_round_robin(results, teams)
+        slots = []
+    table = standings(results, teams)
+    home_xg, away_xg = pair_xg(teams, xg)
+    current = table.set_index('team').loc[teams]
+    return {
+        'competition': comp,
+        'teams': teams,
+        'table': table,
+        'current': {k: current[k].to_numpy(dtype=float) for k in ('points', 'gd', 'gf')},
+        'home_idx': [ids[h] for h, _ in fixtures],
+        'away_idx': [ids[a] for _, a in fixtures],
+        'slots': slots,
+        'home_xg': home_xg,
+        'away_xg': away_xg,
+        'eliminated': [ids[t] for t in eliminated],
+    }
+
+def simulate_competition(inputs, n_sims=N_SIMS, seed=None):
+    """Projection table for one competition: a row per team with the current points,
+    expected points and the title / top-4 / relegation (league) or knockout round
+    (CL) probabilities, plus the finishing position distribution"""
+    rng = np.random.default_rng(seed)
+    comp, teams = inputs['competition'], inputs['teams']
+    n = len(teams)
+    home_xg, away_xg = inputs['home_xg'], inputs['away_xg']
+    home_idx, away_idx = np.asarray(inputs['home_idx'], dtype=int), np.asarray(inputs['away_idx'], dtype=int)
+    positions, expected = simulate_table(inputs['current'], home_idx, away_idx, home_xg[home_idx, away_idx],
+                                         away_xg[home_idx, away_idx], n_sims, rng, inputs['slots'], home_xg, away_xg)
+    dist = np.bincount((np.arange(n) * n + positions).ravel(), minlength=n * n).reshape(n, n) / n_sims
+
+    out = pd.DataFrame({'team': teams, 'points': inputs['current']['points'].astype(int), 'expected_points': expected})
+    if comp == CL:
+        out['top_8'] = dist[:, :CL_BYES].sum(axis=1)
+        out['knockouts'] = dist[:, :CL_PLAYOFF].sum(axis=1)
+        eliminated = np.zeros(n, dtype=bool)
+        eliminated[inputs['eliminated']] = True
+        seeds = np.argsort(positions, axis=1)
+        for name, count in simulate_knockout(seeds, home_xg, away_xg, rng, eliminated).items():
+            out[name] = count / n_sims
+    else:
+        relegation = RELEGATION_SPOTS.get(comp, 3)
+        out['title'] = dist[:, 0]
+        out[f'top_{TOP_SPOTS}'] = dist[:, :TOP_SPOTS].sum(axis=1)
+        out['relegation'] = dist[:, n - relegation:].sum(axis=1)
+    for p in range(n):
+        out[f'pos_{p + 1}'] = dist[:, p]
+    return out.sort_values('expected_points', ascending=False).reset_index(drop=True)
+
+def _simulate_job(job):
+    inputs, n_sims, seed = job
+    return simulate_competition(inputs, n_sims, seed)
+
+def simulate_all(inputs, n_sims=N_SIMS, seed=None, workers=None):
+    """{competition: projection table}, one process per competition"""
+    seeds = np.random.SeedSequence(seed).spawn(len(inputs))
+    jobs = [(i, n_sims, s) for i, s in zip(inputs, seeds)]
+    if workers == 1 or len(jobs) <= 1:
+        results = map(_simulate_job, jobs)
+        return {i['competition']: r for i, r in zip(inputs, results)}
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(_simulate_job, jobs))
+    return {i['competition']: r for i, r in zip(inputs, results)}
+
+def project(matches, fixtures, xg_for, competitions, today, n_sims=N_SIMS, seed=None, workers=None):
+    """Current tables and season projections for every competition with games this season.
+
+    matches: (id, competition, utc_date, home, away, home_goals, away_goals) rows, oldest first;
+    fixtures: scheduled (competition, home, away); xg_for(comp): an xg(home, away) function.
+    Returns ({competition: current table}, {competition: projection table}).
+    """
+    season = season_of(today)
+    inputs = []
+    for comp in competitions:
+        rows = [m[2:] for m in matches if m[1] == comp and season_of(m[2]) == season]
+        if not rows: continue
+        inputs.append(competition_inputs(comp, rows, [(h, a) for c, h, a in fixtures if c == comp], xg_for(comp)))
+    tables = {i['competition']: i['table'] for i in inputs}
+    return tables, simulate_all(inputs, n_sims, seed, workers)
+
+if __name__ == "__main__":
+    import os
+    import joblib
+    import db
+    import dixon_coles
+    from history_store import TeamHistoryStore
+    from pipeline.config import COMPETITIONS
+    from pipeline.pricing import match_xg
+
+    parser = argparse.ArgumentParser(description="Simulate the rest of the season from football.db")
+    parser.add_argument('--competition', choices=COMPETITIONS, action='append',
+                        help="Only this competition (repeatable; default: all of them)")
+    parser.add_argument('--sims', type=int, default=N_SIMS)
+    parser.add_argument('--workers', type=int, help="Processes (default: one per core)")
+    parser.add_argument('--date', default=time.strftime('%Y-%m-%d'), help="Simulate the season this date falls in")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    conn = db.connect(readonly=True)
+    matches = db.matches(conn)
+    fixtures = [(f['competition'], f['home'], f['away']) for f in db.fixtures_with_elo(conn)]
+    conn.close()
+    strengths = joblib.load(dixon_coles.MODEL_FILE) if os.path.exists(dixon_coles.MODEL_FILE) else {}
+    store = TeamHistoryStore.load()
+
+    start = time.perf_counter()
+    tables, projections = project(matches, fixtures, lambda comp: lambda h, a: match_xg(strengths, store, comp, h, a),
+                                  args.competition or COMPETITIONS, args.date, args.sims, args.seed, args.workers)
+    print(f"🎲 {len(projections)} competitions x {args.sims} seasons in {time.perf_counter() - start:.2f} s")
+    pd.set_option('display.width', 200)
+    for comp, df in projections.items():
+        print(f"\n🏆 {comp} {season_of(args.date)}")
+        print(df[[c for c in df.columns if not c.startswith('pos_')]].round(3).to_string(index=False))
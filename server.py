@@ -0,0 +1,222 @@
+"""Local prediction server: models resident in memory, requests micro-batched.
+
+    python server.py [--port 8765]
+
+    GET  /predict?home=Arsenal&away=Chelsea&competition=PL[&date=2026-10-24]
+    POST /predict   {"fixtures": [{"home": ..., "away": ..., "competition": ..., "id": ..., "date": ...}, ...]}
+    GET  /health    model version and when it was loaded
+    GET  /stats     batches, batch sizes and latency percentiles
+
+Concurrent requests are queued and priced together: one price_slate call
+(one Poisson pass + one predict_proba) per batch, through the prediction cache
+the daily job and the dashboard share. The artifacts are reloaded when the job
+rewrites them, without dropping requests.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import data_loader
+import db
+import dixon_coles
+from feature_store import FEATURE_DIR, FeatureStore
+from history_store import HISTORY_DIR, TeamHistoryStore
+from pipeline.config import MODEL_FILE
+from pipeline.pricing import cached_price_slate, model_version
+from prediction_cache import PredictionCache
+
+DEFAULT_PORT = 8765
+MAX_BATCH = 256
+MAX_WAIT = 0.002 # Seconds a request waits for company before its batch is priced
+RELOAD_CHECK = 1.0 # Seconds between artifact change checks
+ARTIFACTS = (db.DB_FILE, MODEL_FILE, dixon_coles.MODEL_FILE, HISTORY_DIR, FEATURE_DIR)
+MARKETS = ('home_xg', 'away_xg', 'home_win', 'draw', 'away_win', 'over_2_5', 'btts')
+
+def load_artifacts():
+    import joblib
+    conn = db.connect(readonly=True)
+    try: elo_ratings = db.elo_ratings(conn)
+    finally: conn.close()
+    try: strengths = joblib.load(dixon_coles.MODEL_FILE)
+    except FileNotFoundError: strengths = {}
+    return {
+        'elo_ratings': elo_ratings,
+        'history': TeamHistoryStore.load(HISTORY_DIR, mmap=False), # Resident, not paged in per request
+        'features': FeatureStore.load(FEATURE_DIR) if os.path.isdir(FEATURE_DIR) else None,
+        'model': joblib.load(MODEL_FILE),
+        'strengths': strengths,
+        'version': model_version(),
+        'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+class Predictor:
+    """The resident artifacts plus a batching worker that prices queued fixtures"""
+    def __init__(self, max_batch=MAX_BATCH, max_wait=MAX_WAIT, reload_check=RELOAD_CHECK, cache=True):
+        self.cache = PredictionCache() if cache else None
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.reload_check = reload_check
+        self.queue = queue.Queue()
+        self.batch_sizes = deque(maxlen=10000)
+        self.latencies = deque(maxlen=10000) # Seconds from submit to result, per request
+        self.reloads = 0
+        self.artifacts = None
+        self.version = None
+        self._checked = 0.0
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        # Cheap stat() check; a full reload only when the job published new files
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_check: return
+        self._checked = now
+        paths = tuple(p for p in ARTIFACTS if os.path.exists(p))
+        artifacts = data_loader.cached(('server', ARTIFACTS), paths, load_artifacts)
+        if artifacts is not self.artifacts:
+            self.artifacts = artifacts # Swapped in one assignment: a batch sees old or new, never a mix
+            self.version = artifacts['version']
+            self.reloads += 1
+
+    def start(self):
+        threading.Thread(target=self._worker, daemon=True).start()
+        return self
+
+    def predict(self, fixtures):
+        """Blocks until the batch holding these (key, (competition, home, away)[, date]) fixtures is priced"""
+        job = {'fixtures': fixtures, 'done': threading.Event(), 'submitted': time.perf_counter()}
+        self.queue.put(job)
+        job['done'].wait()
+        if 'error' in job: raise job['error']
+        return job['result']
+
+    def _worker(self):
+        while True:
+            batch = [self.queue.get()]
+            size = len(batch[0]['fixtures'])
+            deadline = time.perf_counter() + self.max_wait
+            # Collect whatever else arrives within max_wait (or until the batch is full)
+            while size < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0: break
+                try: job = self.queue.get(timeout=timeout)
+                except queue.Empty: break
+                batch.append(job)
+                size += len(job['fixtures'])
+            self._price(batch)
+
+    def _price(self, batch):
+        try:
+            self.refresh()
+            a = self.artifacts
+            items = [f for job in batch for f in job['fixtures']]
+            # Kickoff dates set the rest days; undated fixtures are priced as if played today
+            today = date.today().isoformat()
+            dates = [(f[2] if len(f) > 2 else None) or today for f in items]
+            prices = cached_price_slate(self.cache, [f[0] for f in items], [f[1] for f in items], a['elo_ratings'],
+                                        a['history'], a['strengths'], a['model'], self.version, a['features'], dates)
+            rows = [dict(zip(MARKETS, map(float, p)), model_version=self.version) for p in prices[list(MARKETS)].tolist()]
+            i = 0
+            for job in batch:
+                job['result'] = rows[i:i + len(job['fixtures'])]
+                i += len(job['fixtures'])
+        except Exception as e:
+            for job in batch: job['error'] = e
+        now = time.perf_counter()
+        self.batch_sizes.append(len(batch))
+        for job in batch:
+            self.latencies.append(now - job['submitted'])
+            job['done'].set()
+
+    def stats(self):
+        lat = np.array(self.latencies) * 1000
+        sizes = np.array(self.batch_sizes)
+        return {
+            'model_version': self.version,
+            'loaded_at': self.artifacts['loaded_at'],
+            'reloads': self.reloads,
+            'cache': self.cache.stats() if self.cache else None,
+            'batches': len(sizes),
+            'mean_batch_requests': round(float(sizes.mean()), 2) if len(sizes) else 0,
+            'latency_ms': {f'p{q}': round(float(np.percentile(lat, q)), 3) for q in (50, 90, 99)} if len(lat) else {},
+        }
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, so clients don't pay a connect per request
+    disable_nagle_algorithm = True # Headers and body go out as two writes; don't hold the body for an ACK
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _predict(self, fixtures):
+        try:
+            # Keyed by the API fixture id when the caller has it, so the job's cached prices are found
+            fixtures = [(f.get('id') or f"{f.get('competition')}|{f['home']}|{f['away']}",
+                         (f.get('competition'), f['home'], f['away']), f.get('date')) for f in fixtures]
+        except (KeyError, TypeError, AttributeError):
+            return self._send(400, {'error': "each fixture needs 'home' and 'away'"})
+        try:
+            results = self.server.predictor.predict(fixtures)
+        except Exception as e:
+            return self._send(500, {'error': str(e)})
+        self._send(200, {'predictions': results})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            p = self.server.predictor
+            return self._send(200, {'status': 'ok', 'model_version': p.version, 'loaded_at': p.artifacts['loaded_at']})
+        if url.path == '/stats':
+            return self._send(200, self.server.predictor.stats())
+        if url.path == '/predict':
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            return self._predict([query])
+        self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/predict':
+            return self._send(404, {'error': 'not found'})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            fixtures = payload['fixtures']
+        except (ValueError, KeyError, TypeError):
+            return self._send(400, {'error': 'expected {"fixtures": [...]}'})
+        self._predict(fixtures)
+
+    def log_message(self, *args):
+        pass
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, predictor, port=DEFAULT_PORT, host='127.0.0.1'):
+        super().__init__((host, port), PredictionHandler)
+        self.predictor = predictor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve predictions from the resident models")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000)
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the shared prediction cache")
+    args = parser.parse_args()
+
+    predictor = Predictor(args.max_batch, args.max_wait_ms / 1000, cache=not args.no_cache).start()
+    server = PredictionServer(predictor, args.port, args.host)
+    print(f"🔮 Serving model {predictor.version} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+import backtest
+from benchmarks.synthetic import generate
+
+@pytest.fixture(scope='module')
+def rows():
+    # Oldest first across both leagues, like db.matches
+    return sorted(generate(n_leagues=2, n_seasons=1, teams_per_league=10, seed=0)['matches'], key=lambda r: (r[2], r[0]))
+
+def test_refit_blocks_cover_every_row_once(rows):
+    dates = [r[2] for r in rows]
+    for days in (1, 7, 30):
+        blocks = list(backtest.refit_blocks(dates, days))
+        covered = np.concatenate([np.arange(start, end) for start, end in blocks])
+        assert covered.tolist() == list(range(len(rows)))
+        for start, end in blocks: # Each block spans less than `days` from its first kickoff day
+            first = pd.Timestamp(dates[start]).floor('D')
+            assert pd.Timestamp(dates[end - 1]) < first + pd.Timedelta(days=days)
+
+def test_predictions_only_use_earlier_results(rows):
+    # The last kickoff day of a refit block two thirds of the way in turns into 5-0 away wins
+    end = next(end for start, end in backtest.refit_blocks([r[2] for r in rows], 7) if start >= len(rows) * 2 // 3)
+    day = rows[end - 1][2][:10]
+    changed = [r[:5] + (0, 5) if r[2][:10] == day else r for r in rows]
+    before = backtest.run_backtest(rows, min_train=60)
+    after = backtest.run_backtest(changed, min_train=60)
+    columns = ['p_away', 'p_draw', 'p_home', 'bet']
+    # Nothing up to that day's own matches (no team plays twice a day) saw those results ...
+    pd.testing.assert_frame_equal(before[columns][:end], after[columns][:end])
+    assert not np.allclose(before['p_home'][end:], after['p_home'][end:]) # ... while later ones do
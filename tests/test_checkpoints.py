@@ -0,0 +1,64 @@
+import joblib
+import pytest
+from pipeline.state import Run, empty_state
+from records import Match
+
+def test_resume_gives_back_the_run_after_a_stage(tmp_path):
+    run = Run(empty_state())
+    run.today = '2026-10-17'
+    run.match_rows.append(Match(1, 'PL', '2026-10-16T15:00:00Z', 'Arsenal', 'Chelsea', 2, 1))
+    run.model = object() # Transient: reloaded from its own file, not checkpointed
+    run.checkpoint('ingest', str(tmp_path))
+
+    resumed = Run.resume('ingest', directory=str(tmp_path))
+    assert resumed.today == run.today
+    assert resumed.match_rows == run.match_rows
+    assert resumed.state.keys() == run.state.keys()
+    for name in Run.TRANSIENT:
+        assert name == 'metrics' or getattr(resumed, name) is None
+
+def test_resume_without_a_checkpoint_says_so(tmp_path):
+    with pytest.raises(SystemExit, match="No checkpoint for 'rate'"):
+        Run.resume('rate', directory=str(tmp_path))
+
+def test_persist_can_be_rerun_from_its_checkpoint(tmp_path, monkeypatch):
+    from ledger import BetLedger
+    from pipeline import stages
+    import db
+    monkeypatch.chdir(tmp_path)
+    run = Run(empty_state())
+    run.today = '2026-10-17'
+    run.ledger = BetLedger()
+    for fixture_id in (11, 12):
+        run.ledger.place(fixture_id, {'date': '2026-10-18', 'match': f'A{fixture_id} vs B', 'pick': 'Home',
+                                      'confidence': 0.8})
+    run.checkpoint('simulate', str(tmp_path / '.pipeline')) # Bets placed, not saved yet
+    for _ in range(2):
+        stages.persist(Run.resume('simulate', directory=str(tmp_path / '.pipeline')))
+    conn = db.connect()
+    assert sorted(b['fixture_id'] for b in db.all_bets(conn)) == [11, 12]
+    conn.close()
+
+def test_a_missing_state_file_means_a_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # No pipeline_state.pkl here
+    run = Run.start()
+    assert run.full_rebuild and run.state.keys() == empty_state().keys()
+    joblib.dump(run.state, 'pipeline_state.pkl')
+    assert not Run.start().full_rebuild
+
+def test_an_unchanged_persist_leaves_football_db_alone(tmp_path, monkeypatch):
+    from pipeline import stages
+    monkeypatch.chdir(tmp_path)
+    run = Run(empty_state())
+    run.today = '2026-10-17'
+    run.state['elo_ratings'] = {'Arsenal': 1510.0, 'Chelsea': 1490.0}
+    run.checkpoint('simulate', str(tmp_path / '.pipeline'))
+    first = Run.resume('simulate', directory=str(tmp_path / '.pipeline'))
+    stages.persist(first)
+    data = open('football.db', 'rb').read()
+    again = Run.resume('simulate', directory=str(tmp_path / '.pipeline'))
+    stages.persist(again)
+    assert first.db_changed and not again.db_changed
+    assert open('football.db', 'rb').read() == data # Not even SQLite's change counter moved
+    stages.publish(again)
+    assert not again.publisher.seen('football.db') # Not recorded in the manifest either
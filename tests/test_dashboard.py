@@ -0,0 +1,16 @@
+import os
+import shutil
+import pytest
+
+AppTest = pytest.importorskip('streamlit.testing.v1').AppTest
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_renders_before_the_feature_store_exists(tmp_path, monkeypatch):
+    # The artifacts a checkout has before the first training run that builds features/
+    shutil.copy(os.path.join(ROOT, 'football.db'), tmp_path)
+    shutil.copy(os.path.join(ROOT, 'logistic_model.pkl'), tmp_path)
+    shutil.copytree(os.path.join(ROOT, 'team_history'), tmp_path / 'team_history')
+    monkeypatch.chdir(tmp_path)
+    at = AppTest.from_file(os.path.join(ROOT, 'dashboard.py'), default_timeout=60).run()
+    assert not at.exception and not at.error, [e.value for e in list(at.exception) + list(at.error)]
+    assert len(at.markdown) > 10 # The match list, not just the header
@@ -0,0 +1,87 @@
+import os
+import pytest
+import data_loader
+import db
+
+@pytest.fixture(autouse=True)
+def no_manifest(tmp_path, monkeypatch):
+    # Away from the checkout's manifest.json, so every change check hashes the files
+    monkeypatch.chdir(tmp_path)
+
+def write(path, text):
+    # New content with a later mtime, as the daily job's rename leaves it
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    path.write_text(text)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+def touch(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+def load(path, calls):
+    def loader():
+        calls.append(path.read_text())
+        return path.read_text()
+    return data_loader.cached(('test', str(path)), str(path), loader)
+
+def test_unchanged_file_is_loaded_once(tmp_path):
+    path, calls = tmp_path / 'a.txt', []
+    write(path, 'one')
+    assert load(path, calls) == 'one'
+    assert load(path, calls) == 'one'
+    assert calls == ['one']
+    m = data_loader.stats()[('test', str(path))]
+    assert (m['loads'], m['hits']) == (1, 1)
+
+def test_changed_content_is_reloaded(tmp_path):
+    path, calls = tmp_path / 'a.txt', []
+    write(path, 'one')
+    load(path, calls)
+    write(path, 'two')
+    assert load(path, calls) == 'two'
+    assert calls == ['one', 'two']
+
+def test_touched_file_keeps_the_loaded_copy(tmp_path):
+    path, calls = tmp_path / 'a.txt', []
+    write(path, 'one')
+    first = load(path, calls)
+    touch(path) # A new mtime (e.g. a git checkout), the same bytes
+    assert load(path, calls) is first
+    assert calls == ['one']
+
+def test_directory_changes_when_a_file_is_added(tmp_path):
+    directory, calls = tmp_path / 'store', []
+    directory.mkdir()
+    write(directory / 'a.txt', 'one')
+    loader = lambda: calls.append(sorted(os.listdir(directory))) or len(calls)
+    assert data_loader.cached(('test', str(directory)), str(directory), loader) == 1
+    (directory / 'b.txt.tmp').write_text('half written') # Ignored until it's renamed into place
+    assert data_loader.cached(('test', str(directory)), str(directory), loader) == 1
+    os.replace(directory / 'b.txt.tmp', directory / 'b.txt')
+    assert data_loader.cached(('test', str(directory)), str(directory), loader) == 2
+
+QUERIES = []
+
+def count_matches(conn):
+    QUERIES.append(1)
+    return conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+def test_query_is_invalidated_by_the_database_and_its_dependencies(tmp_path):
+    path, model = str(tmp_path / 'football.db'), tmp_path / 'model.pkl'
+    QUERIES.clear()
+    db.connect(path).close()
+    write(model, 'v1')
+    run = lambda: data_loader.query(count_matches, path=path, depends_on=(str(model),))
+    assert run() == 0 and run() == 0
+    assert len(QUERIES) == 1
+
+    conn = db.connect(path)
+    with conn:
+        db.upsert_matches(conn, [(1, 'PL', '2026-10-11T14:00:00Z', 'Arsenal', 'Chelsea', 2, 1)])
+    conn.close()
+    assert run() == 1
+    assert len(QUERIES) == 2
+
+    write(model, 'v2') # Only the dependency changed
+    assert run() == 1
+    assert len(QUERIES) == 3
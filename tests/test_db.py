@@ -0,0 +1,78 @@
+import sqlite3
+import pytest
+import db
+
+TABLES = {'matches', 'fixtures', 'elo_ratings', 'elo_history', 'bets', 'logos', 'standings', 'season_projections'}
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db.connect(str(tmp_path / 'football.db'))
+    yield conn
+    conn.close()
+
+def tables(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def test_connect_creates_the_schema(conn):
+    assert TABLES <= tables(conn)
+
+def test_connect_migrates_an_old_fixtures_table(tmp_path):
+    path = str(tmp_path / 'football.db')
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE fixtures (id INTEGER PRIMARY KEY, league TEXT NOT NULL, utc_date TEXT NOT NULL, "
+                "home TEXT NOT NULL, away TEXT NOT NULL)")
+    old.execute("INSERT INTO fixtures VALUES (1, 'Premier League', '2026-10-18T14:00:00Z', 'Arsenal', 'Chelsea')")
+    old.commit()
+    old.close()
+    conn = db.connect(path)
+    assert db.fixtures_with_elo(conn)[0]['competition'] is None
+    conn.close()
+
+def test_readonly_needs_an_existing_database(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        db.connect(str(tmp_path / 'missing.db'), readonly=True)
+
+def test_upsert_matches_replaces_by_id(conn):
+    with conn:
+        db.upsert_matches(conn, [(2, 'PL', '2026-10-18T14:00:00Z', 'Leeds', 'Fulham', 0, 0),
+                                 (1, 'PL', '2026-10-11T14:00:00Z', 'Arsenal', 'Chelsea', 1, 1)])
+        db.upsert_matches(conn, [(1, 'PL', '2026-10-11T14:00:00Z', 'Arsenal', 'Chelsea', 2, 1)])
+    # Oldest first, the corrected score in place of the first one
+    assert db.matches(conn) == [(1, 'PL', '2026-10-11T14:00:00Z', 'Arsenal', 'Chelsea', 2, 1),
+                                (2, 'PL', '2026-10-18T14:00:00Z', 'Leeds', 'Fulham', 0, 0)]
+
+def test_replace_fixtures_keeps_only_the_new_window(conn):
+    with conn:
+        db.replace_fixtures(conn, [(1, 'Premier League', '2026-10-11T14:00:00Z', 'Arsenal', 'Chelsea', 'PL')])
+        db.replace_fixtures(conn, [(2, 'Premier League', '2026-10-18T14:00:00Z', 'Leeds', 'Fulham', 'PL')])
+        db.upsert_elo(conn, {'Leeds': 1520.0})
+    rows = db.fixtures_with_elo(conn)
+    assert [(r['id'], r['competition'], r['home_elo'], r['away_elo']) for r in rows] == [(2, 'PL', 1520.0, 1500)]
+    assert db.fixtures_with_elo(conn, date_to='2026-10-18') == []
+
+def test_upsert_elo_overwrites_ratings(conn):
+    with conn:
+        db.upsert_elo(conn, {'Arsenal': 1510.0, 'Chelsea': 1490.0})
+        db.upsert_elo(conn, {'Arsenal': 1525.0})
+    assert db.elo_ratings(conn) == {'Arsenal': 1525.0, 'Chelsea': 1490.0}
+
+def test_replace_standings_per_competition(conn):
+    with conn:
+        db.replace_standings(conn, [('PL', 'Arsenal', 1, 20), ('PL', 'Chelsea', 2, 18), ('SA', 'Inter', 1, 21)])
+        db.replace_standings(conn, [('PL', 'Chelsea', 1, 21), ('PL', 'Arsenal', 2, 20)])
+    assert [r['team'] for r in db.standings(conn, 'PL')] == ['Chelsea', 'Arsenal']
+    # Other competitions' tables are left alone
+    assert db.standings(conn, 'SA') == [{'team': 'Inter', 'position': 1, 'points': 21}]
+
+def test_content_hash_follows_the_data_not_the_writes(conn):
+    before = db.content_hash(conn)
+    with conn:
+        db.upsert_elo(conn, {'Arsenal': 1510.0})
+    changed = db.content_hash(conn)
+    assert changed != before
+    # Writing the same rows again (in another order) leaves the hash alone
+    with conn:
+        db.upsert_elo(conn, {'Chelsea': 1500.0})
+        conn.execute("DELETE FROM elo_ratings")
+        db.upsert_elo(conn, {'Arsenal': 1510.0})
+    assert db.content_hash(conn) == changed
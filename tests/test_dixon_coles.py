@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from scipy.optimize import check_grad
+import dixon_coles
+from dixon_coles import DixonColes
+
+def league(seed=0, teams=8, rounds=150):
+    # (utc_date, home, away, home_goals, away_goals) from known strengths
+    rng = np.random.default_rng(seed)
+    attack = rng.normal(0, 0.5, teams)
+    attack -= attack.mean()
+    rows = []
+    for r in range(rounds):
+        day = np.datetime64('2024-08-01') + r * 3
+        for h in range(teams):
+            a = (h + 1 + r % (teams - 1)) % teams
+            lam, mu = np.exp(0.2 + 0.25 + attack[h]), np.exp(0.2 + attack[a])
+            rows.append((str(day), f'T{h}', f'T{a}', int(rng.poisson(lam)), int(rng.poisson(mu))))
+    return rows, attack
+
+def test_gradient_matches_finite_differences():
+    rng = np.random.default_rng(1)
+    n, m = 5, 40
+    home_idx, away_idx = rng.integers(0, n, m), rng.integers(0, n, m)
+    hg, ag = rng.integers(0, 4, m).astype(float), rng.integers(0, 4, m).astype(float)
+    weights = rng.uniform(0.2, 1, m)
+    args = (home_idx, away_idx, hg, ag, weights, n)
+    params = np.concatenate([rng.normal(0, 0.2, 2 * n), [0.2, 0.25, -0.05]])
+    value = lambda p: dixon_coles.neg_log_likelihood(p, *args)[0]
+    grad = lambda p: dixon_coles.neg_log_likelihood(p, *args)[1]
+    assert check_grad(value, grad, params) < 1e-5
+
+def test_fit_recovers_the_strengths():
+    rows, attack = league()
+    model = DixonColes.fit(rows, xi=0)
+    fitted = model.attack[[model.team_ids[f'T{i}'] for i in range(len(attack))]]
+    assert np.corrcoef(fitted, attack)[0, 1] > 0.9
+    assert model.home == pytest.approx(0.25, abs=0.1)
+
+def test_warm_start_lands_on_the_cold_fit():
+    rows, _ = league()
+    previous = DixonColes.fit(rows[:-8])
+    cold, warm = DixonColes.fit(rows), DixonColes.fit(rows, init=previous)
+    assert warm.attack == pytest.approx(cold.attack, abs=1e-3)
+    assert warm.rho == pytest.approx(cold.rho, abs=1e-3)
+
+def test_moving_as_of_alone_keeps_the_fit():
+    # Time decay scales every weight by the same factor, and the likelihood is per unit weight
+    rows, _ = league()
+    fit = DixonColes.fit(rows)
+    later = DixonColes.fit(rows, as_of='2026-01-01', init=fit)
+    assert later.attack == pytest.approx(fit.attack, abs=1e-4)
+    assert later.n_iter <= 2
+
+def test_unchanged_leagues_keep_their_fit():
+    rows, _ = league()
+    previous = dixon_coles.fit_leagues([('PL',) + r for r in rows] + [('BL1',) + r for r in rows[:-8]])
+    refit = dixon_coles.fit_leagues([('PL',) + r for r in rows] + [('BL1',) + r for r in rows], previous, changed={'BL1'})
+    assert refit['PL'] is previous['PL'] and refit['BL1'] is not previous['BL1']
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import db
+import elo
+from pipeline.ratings import update_elo
+from rating_history import RatingHistory
+
+# Two leagues plus a CL game between them, with the CL game dated before the leagues' last round
+MATCHES = [
+    (1, 'PL', '2025-08-01T15:00:00Z', 'Arsenal', 'Chelsea', 2, 0),
+    (2, 'BL1', '2025-08-01T15:00:00Z', 'Bayern', 'Dortmund', 1, 1),
+    (3, 'CL', '2025-08-05T20:00:00Z', 'Arsenal', 'Bayern', 0, 3),
+    (4, 'PL', '2025-08-08T15:00:00Z', 'Chelsea', 'Arsenal', 1, 2),
+    (5, 'BL1', '2025-08-08T15:00:00Z', 'Dortmund', 'Bayern', 0, 1),
+]
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db.connect(str(tmp_path / 'football.db'))
+    with conn: db.upsert_matches(conn, MATCHES)
+    yield conn
+    conn.close()
+
+def live_ratings(matches):
+    state = {'elo_ratings': {}, 'elo_history': RatingHistory()}
+    for _, _, utc_date, home, away, hg, ag in matches:
+        update_elo(state, home, away, hg, ag, utc_date)
+    return state['elo_ratings']
+
+def sweep_ratings(rows):
+    teams, home_idx, away_idx, hg, ag = elo.encode_matches(rows)
+    _, ratings = elo.sweep(home_idx, away_idx, hg, ag, len(teams))
+    return dict(zip(teams, ratings[0]))
+
+def test_live_order_is_one_competition_at_a_time(conn):
+    # What a full rebuild does: PL, BL1, ..., CL (COMPETITIONS order), each oldest first
+    by_competition = [m for comp in ('PL', 'BL1', 'CL') for m in MATCHES if m[1] == comp]
+    expected = live_ratings(by_competition)
+    got = sweep_ratings(elo.load_matches(conn, live_order=True))
+    assert got == pytest.approx(expected, abs=1e-9)
+    # Oldest first rates Arsenal's PL game after the CL one: not the stored ratings
+    assert sweep_ratings(elo.load_matches(conn)) != pytest.approx(expected, abs=1e-9)
+
+def test_sweep_scores_every_setting():
+    rows = [m[3:] for m in MATCHES]
+    teams, home_idx, away_idx, hg, ag = elo.encode_matches(rows)
+    results, ratings = elo.sweep(home_idx, away_idx, hg, ag, len(teams), k=(20, 30), hfa=(0, 100), mov=(0, 1))
+    assert len(results) == ratings.shape[0] == 8
+    assert np.all(results['brier'] > 0) and np.all(results['log_loss'] > 0)
+    # Elo only moves points between the two sides
+    assert ratings.sum(axis=1) == pytest.approx(len(teams) * elo.INITIAL_RATING)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+import feature_store as fs
+from feature_store import FeatureStore
+from history_store import EPOCH, _to_days
+from records import Match
+
+def random_rows(n=400, teams=8, seed=1):
+    rng = np.random.default_rng(seed)
+    rows = np.zeros(n, fs.MATCH_DTYPE)
+    rows['id'] = rng.permutation(n) + 1
+    rows['day'] = rng.integers(1, 200, n)
+    rows['day'][:5] = 0 # Undated
+    rows['home'] = rng.integers(0, teams, n)
+    rows['away'] = (rows['home'] + rng.integers(1, teams, n)) % teams
+    rows['home_goals'], rows['away_goals'] = rng.integers(0, 5, n), rng.integers(0, 5, n)
+    rows['elo_diff'] = rng.normal(0, 100, n)
+    return rows
+
+def reference(rows, played, i):
+    # One row's features the slow way, from the played rows before it in (day, id) order
+    order = list(np.lexsort((rows['id'], rows['day'])))
+    r = rows[i]
+    prior = [j for j in order[:order.index(i)] if played[j]]
+    gd = lambda j: int(rows[j]['home_goals']) - int(rows[j]['away_goals'])
+    out = {'elo_diff': r['elo_diff']}
+    for w in fs.FORM_WINDOWS:
+        home = [j for j in prior if rows[j]['home'] == r['home']][-w:]
+        away = [j for j in prior if rows[j]['away'] == r['away']][-w:]
+        out[f'home_gd_{w}'] = np.mean([gd(j) for j in home]) if home else 0
+        out[f'away_gd_{w}'] = np.mean([-gd(j) for j in away]) if away else 0
+    for side in ('home', 'away'):
+        games = [j for j in prior if r[side] in (rows[j]['home'], rows[j]['away'])]
+        last = rows[games[-1]]['day'] if games else 0
+        out[f'{side}_rest'] = min(r['day'] - last, fs.REST_CAP) if last and r['day'] else fs.REST_CAP
+    h2h = [j for j in prior if {rows[j]['home'], rows[j]['away']} == {r['home'], r['away']}][-fs.H2H_WINDOW:]
+    out['h2h_games'] = len(h2h)
+    out['h2h_gd'] = np.mean([gd(j) * (1 if rows[j]['home'] == r['home'] else -1) for j in h2h]) if h2h else 0
+    return out
+
+def test_compute_matches_the_slow_reference():
+    rows = random_rows()
+    played = np.random.default_rng(2).random(len(rows)) < 0.9
+    features = fs.compute(rows, played)
+    for i in range(0, len(rows), 7):
+        for name, value in reference(rows, played, i).items():
+            assert features[name][i] == pytest.approx(value, abs=1e-5), (i, name)
+
+def matches(rows):
+    # records.Match rows (and their Elo differences) for rows, in time order, the way the job appends them
+    rows = rows[np.lexsort((rows['id'], rows['day']))]
+    day = lambda d: str(EPOCH + np.timedelta64(int(d), 'D')) + 'T15:00:00Z' if d else None
+    return ([Match(int(r['id']), 'PL', day(r['day']), f"T{r['home']}", f"T{r['away']}", int(r['home_goals']),
+                   int(r['away_goals'])) for r in rows], rows['elo_diff'])
+
+def test_daily_appends_equal_one_pass_over_the_history():
+    rows = random_rows(n=300, teams=12)
+    new, diffs = matches(rows)
+    store = FeatureStore()
+    for start in range(0, len(new), 17): # A round at a time: features from the trimmed context only
+        store.append(new[start:start + 17], diffs[start:start + 17])
+    whole = fs.compute(store.matches.array)
+    for name in fs.FEATURES:
+        assert store.features.array[name] == pytest.approx(whole[name], abs=1e-5), name
+
+def test_fixture_features_are_the_same_from_the_apps_copy(tmp_path):
+    rows = random_rows(n=300, teams=12)
+    store = FeatureStore()
+    store.append(*matches(rows))
+    store.save(str(tmp_path))
+    loaded = FeatureStore.load(str(tmp_path))
+    assert len(loaded) < len(store) # Only the recent rows
+    fixtures = [('T1', 'T2'), ('T3', 'T0'), ('T5', 'Newcomers')]
+    dates, diffs = ['2000-08-01', '2000-08-02', None], [25.0, -40.0, 0.0]
+    expected = store.fixture_features(fixtures, diffs, dates)
+    assert loaded.fixture_features(fixtures, diffs, dates).tolist() == expected.tolist()
+    # ... and the same as computing them alongside the whole table
+    upcoming = store._rows(*zip(*fixtures), [_to_days(d) or fs.UPCOMING_DAY for d in dates], diffs)
+    upcoming['id'] = np.iinfo(np.int64).max - np.arange(len(fixtures))[::-1]
+    table = np.concatenate([store.matches.array, upcoming])
+    whole = fs.compute(table, np.arange(len(table)) < len(store))[len(store):]
+    for name in fs.FEATURES:
+        assert expected[name] == pytest.approx(whole[name], abs=1e-5), name
+
+def test_remembered_fixture_features_follow_new_results():
+    store = FeatureStore()
+    store.append([Match(1, 'PL', '2025-08-01T15:00:00Z', 'A', 'B', 3, 0)], [0.0])
+    before = store.fixture_features([('A', 'B')], [0.0], ['2025-08-10'])
+    store.append([Match(2, 'PL', '2025-08-05T15:00:00Z', 'A', 'C', 0, 4)], [0.0])
+    after = store.fixture_features([('A', 'B')], [0.0], ['2025-08-10'])
+    assert before['home_gd_5'][0] == 3 and after['home_gd_5'][0] == pytest.approx(-0.5)
+    assert after['home_rest'][0] == 5
+
+def test_undated_fixtures_come_after_every_result():
+    store = FeatureStore()
+    store.append([Match(1, 'PL', '2025-08-01T15:00:00Z', 'A', 'B', 3, 0), Match(2, 'PL', None, 'A', 'C', 1, 0)], [0.0, 0.0])
+    undated = store.fixture_features([('A', 'B')], [0.0], [None])
+    assert undated['home_gd_5'][0] == 2 and undated['h2h_games'][0] == 1
+    assert undated['home_rest'][0] == fs.REST_CAP
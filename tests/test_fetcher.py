@@ -0,0 +1,79 @@
+import pytest
+import requests
+import fetcher
+from fetcher import FootballClient, TokenBucket
+
+class Response:
+    def __init__(self, status, headers=None, body=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.content = b'{}'
+        self.body = body
+
+    def json(self):
+        return self.body
+
+def client(responses, max_retries=3):
+    # A client whose session answers from responses (a status, a Response or an exception) in order
+    c = FootballClient(rate_per_minute=6000, max_retries=max_retries)
+    c.slept = []
+    c._sleep = lambda seconds: c.slept.append(seconds) or seconds
+    answers = iter(responses)
+    def get(*args, **kwargs):
+        answer = next(answers)
+        if isinstance(answer, Exception): raise answer
+        return answer if isinstance(answer, Response) else Response(answer, body={'ok': True})
+    c.session.get = get
+    return c
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Fake time for the bucket: sleeping just moves the clock on
+    now = [0.0]
+    monkeypatch.setattr(fetcher.time, 'monotonic', lambda: now[0])
+    def sleep(seconds): now[0] += seconds
+    monkeypatch.setattr(fetcher.time, 'sleep', sleep)
+    return now
+
+# --- TOKEN BUCKET ---
+def test_bucket_spends_its_capacity_then_waits(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1.0) # One token a second
+
+def test_bucket_never_trusts_more_than_the_server_reports(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    bucket.sync(3)
+    assert bucket.tokens == 3
+    bucket.sync(0, reset_seconds=10)
+    assert bucket.tokens == pytest.approx(1 - 10) # Empty until the window resets in 10 s
+
+# --- RETRIES ---
+def test_returns_the_body_after_a_server_error():
+    c = client([500, 200])
+    assert c.get('x') == {'ok': True}
+    assert len(c.slept) == 1
+
+@pytest.mark.parametrize('failure', [500, 503, requests.ConnectionError()])
+def test_no_backoff_after_the_last_attempt(failure):
+    c = client([failure] * 3)
+    assert c.get('x') is None
+    assert len(c.slept) == 2 # Between the three attempts, not after them
+
+def test_client_errors_are_not_retried():
+    c = client([404, 200])
+    assert c.get('x') is None
+    assert c.slept == []
+
+def test_quota_exhausted_waits_for_the_servers_window(clock):
+    c = client([Response(429, {'Retry-After': '30'}), 200])
+    assert c.get('x') == {'ok': True}
+    assert clock[0] >= 30
+    c = client([Response(429, {'Retry-After': '30'})], max_retries=1)
+    assert c.get('x') is None
+    assert c.bucket.tokens < 0 # The server's window holds for every caller
+
+def test_no_made_up_wait_after_a_final_429(clock):
+    c = client([Response(429)], max_retries=1)
+    assert c.get('x') is None
+    assert c.bucket.tokens >= 1
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from history_store import VENUES, TeamHistoryStore
+
+def random_history(seed=0, teams=6):
+    # {team: {venue: {'scored', 'conceded', 'dates'}}}, the split lists old states hold
+    rng = np.random.default_rng(seed)
+    history = {}
+    for t in range(teams):
+        splits = {}
+        for venue in VENUES:
+            n = int(rng.integers(0, 30))
+            splits[venue] = {'scored': rng.integers(0, 5, n).tolist(), 'conceded': rng.integers(0, 5, n).tolist(),
+                             'dates': [f'2025-{1 + i // 28:02d}-{1 + i % 28:02d}' for i in range(n)]}
+        history[f'Team {t}'] = splits
+    return history
+
+def brute_streak(scored, conceded):
+    streak = 0
+    for s, c in zip(scored, conceded):
+        streak = streak + 1 if s > c else 0
+    return streak
+
+@pytest.fixture(scope='module')
+def history():
+    return random_history()
+
+def test_queries_match_the_raw_lists(history):
+    store = TeamHistoryStore.from_dict(history)
+    for team, splits in history.items():
+        for venue, rows in splits.items():
+            scored, conceded = rows['scored'], rows['conceded']
+            assert store.games(team, venue) == len(scored)
+            assert store.win_streak(team, venue) == brute_streak(scored, conceded)
+            for n in (None, 1, 5, 50):
+                tail = slice(-n if n else None, None)
+                assert store.form(team, venue, n) == (len(scored[tail]), sum(scored[tail]), sum(conceded[tail]))
+
+def test_prefix_sums_stay_int32(history):
+    store = TeamHistoryStore.from_dict(history)
+    for venue in VENUES:
+        assert store.arrays[f'{venue}_cum_scored'].dtype == np.int32
+        assert store.arrays[f'{venue}_cum_conceded'].dtype == np.int32
+
+def test_saved_store_answers_the_same(history, tmp_path):
+    store = TeamHistoryStore.from_dict(history)
+    store.save(str(tmp_path))
+    loaded = TeamHistoryStore.load(str(tmp_path))
+    for team in history:
+        for venue in VENUES:
+            assert loaded.form(team, venue, 5) == store.form(team, venue, 5)
+            assert loaded.win_streak(team, venue) == store.win_streak(team, venue)
+            assert loaded.last_date(team, venue) == store.last_date(team, venue)
+
+def test_unknown_team_has_no_history(history):
+    store = TeamHistoryStore.from_dict(history)
+    assert store.form('Nobody', 'home', 5) == (0, 0, 0)
+    assert store.win_streak('Nobody') == 0 and store.last_date('Nobody') is None
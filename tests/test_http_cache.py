@@ -0,0 +1,85 @@
+import pytest
+from fetcher import FootballClient
+from http_cache import ResponseCache
+from metrics import Metrics
+
+URL = 'https://api.example/v4/competitions/PL/matches?status=FINISHED'
+
+class Response:
+    def __init__(self, status, headers=None, body=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body
+        self.content = b'{}' if body is not None else b''
+
+    def json(self):
+        return self.body
+
+def client(cache, responses):
+    # A client on cache whose session answers from responses in order, keeping the headers it was sent
+    c = FootballClient(rate_per_minute=6000, cache=cache, metrics=Metrics())
+    c.sent = []
+    answers = iter(responses)
+    def get(url, params=None, headers=None, timeout=None):
+        c.sent.append(headers)
+        return next(answers)
+    c.session.get = get
+    return c
+
+def test_params_and_query_string_share_an_entry():
+    assert ResponseCache.url('https://api.example/v4/m', {'status': 'FINISHED'}) == ResponseCache.url(
+        'https://api.example/v4/m?status=FINISHED')
+
+def test_entries_are_fresh_for_their_ttl(tmp_path):
+    now = [1000.0]
+    cache = ResponseCache(str(tmp_path), clock=lambda: now[0])
+    entry = cache.store(URL, {'ETag': '"a"'}, {'matches': []})
+    assert cache.lookup(URL) == entry and cache.fresh(entry)
+    now[0] += 3601 # FINISHED results are served for an hour
+    assert not cache.fresh(entry)
+    assert ResponseCache.validators(entry) == {'If-None-Match': '"a"'}
+
+def test_stale_entry_is_revalidated_and_reused(tmp_path):
+    now = [1000.0]
+    cache = ResponseCache(str(tmp_path), clock=lambda: now[0])
+    c = client(cache, [Response(200, {'ETag': '"a"'}, {'matches': [1]}), Response(304)])
+    assert c.get(URL) == {'matches': [1]}
+    assert c.get(URL) == {'matches': [1]} and len(c.sent) == 1 # Fresh: answered from disk
+    now[0] += 3601
+    assert c.get(URL) == {'matches': [1]} # Stale: a conditional request, answered 304
+    assert c.sent[-1] == {'If-None-Match': '"a"'}
+    assert c.metrics.counters['http_cache_hits'] == 1 and c.metrics.counters['http_not_modified'] == 1
+    now[0] += 60
+    assert cache.fresh(cache.lookup(URL)) # The 304 restarted the TTL
+
+def test_replay_never_goes_to_the_network(tmp_path):
+    ResponseCache(str(tmp_path), mode='record').store(URL, {}, {'matches': [1]})
+    c = client(ResponseCache(str(tmp_path), mode='replay'), [])
+    assert c.get(URL) == {'matches': [1]}
+    assert c.get(URL + '&season=2020') is None
+    assert c.sent == []
+
+def test_replay_needs_a_cassette(tmp_path):
+    with pytest.raises(SystemExit, match='No cassette'):
+        ResponseCache(str(tmp_path), mode='replay')
+
+def test_the_daily_date_range_is_not_part_of_the_key(tmp_path):
+    now = [1000.0]
+    cache = ResponseCache(str(tmp_path), clock=lambda: now[0])
+    yesterday = URL + '&dateFrom=2026-10-10&dateTo=2026-10-16'
+    c = client(cache, [Response(200, {'ETag': '"a"'}, {'matches': [1]}), Response(304)])
+    c.get(yesterday)
+    now[0] += 86400
+    assert c.get(URL + '&dateFrom=2026-10-10&dateTo=2026-10-17') == {'matches': [1]}
+    assert c.sent[-1] == {'If-None-Match': '"a"'} # Revalidated across days, not downloaded again
+
+def test_prune_drops_only_entries_no_request_used(tmp_path):
+    now = [1000.0]
+    cache = ResponseCache(str(tmp_path), clock=lambda: now[0])
+    cache.store(URL + '&season=2020', {}, {'matches': []}) # Nothing asks for this one any more
+    used = cache.store(URL, {}, {'matches': []})
+    now[0] += 86400
+    cache.touch(used) # Revalidated by today's run
+    assert cache.prune() == 1
+    assert cache.lookup(URL) is not None and cache.lookup(URL + '&season=2020') is None
+    assert ResponseCache(str(tmp_path), mode='record').prune() == 0 # Cassettes are kept whole
@@ -0,0 +1,79 @@
+import joblib
+import pytest
+import db
+from ledger import STAKE, SIM_ODDS, BetLedger
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db.connect(str(tmp_path / 'football.db'))
+    yield conn
+    conn.close()
+
+def bet(match='Arsenal vs Chelsea', pick='Home'):
+    return {'date': '2026-10-18', 'match': match, 'pick': pick, 'confidence': 0.8}
+
+def reload(conn, ledger):
+    with conn:
+        ledger.save(conn)
+    return BetLedger.load(conn)
+
+def test_one_bet_per_fixture(conn):
+    ledger = BetLedger()
+    assert ledger.place(11, bet())
+    assert not ledger.place(11, bet(pick='Away'))
+    ledger = reload(conn, ledger)
+    assert ledger.has_bet(11) and ledger.pending[11]['pick'] == 'Home'
+    assert not ledger.place(11, bet())
+
+def test_settle_pays_the_simulated_odds(conn):
+    ledger = BetLedger()
+    ledger.place(11, bet(pick='Home'))
+    ledger.place(12, bet('Leeds vs Fulham', pick='Away'))
+    ledger = reload(conn, ledger)
+    won = ledger.settle(11, 'Arsenal', 'Chelsea', 2, 0)
+    lost = ledger.settle(12, 'Leeds', 'Fulham', 1, 1)
+    assert (won['result'], won['profit']) == ('Won', STAKE * SIM_ODDS - STAKE)
+    assert (lost['result'], lost['profit']) == ('Lost', -STAKE)
+    ledger = reload(conn, ledger)
+    assert ledger.pending == {} and ledger.settled_ids == {11, 12}
+    assert sorted((b['fixture_id'], b['status']) for b in db.all_bets(conn)) == [(11, 'Settled'), (12, 'Settled')]
+
+def test_a_settled_match_is_not_settled_again(conn):
+    ledger = BetLedger()
+    ledger.place(11, bet())
+    assert ledger.settle(11, 'Arsenal', 'Chelsea', 2, 0)
+    assert ledger.settle(11, 'Arsenal', 'Chelsea', 2, 0) is None
+    assert ledger.settle(99, 'Nobody', 'Else', 1, 0) is None # No bet on it
+    ledger = reload(conn, ledger)
+    assert ledger.settle(11, 'Arsenal', 'Chelsea', 0, 3) is None
+    assert not ledger.place(11, bet()) # Settled fixtures take no new bet
+    assert len(db.all_bets(conn)) == 1
+
+def test_old_home_vs_away_bets_are_rekeyed_by_fixture_id(conn, tmp_path):
+    joblib.dump([dict(bet(), status='Pending', result='-', profit=0)], tmp_path / 'bet_log.pkl')
+    ledger = BetLedger()
+    ledger.import_pickles(str(tmp_path / 'bet_log.pkl'), str(tmp_path / 'missing.pkl'))
+    ledger = reload(conn, ledger)
+    assert list(ledger.pending) == ['Arsenal vs Chelsea'] # Loaded without a fixture id
+    assert not ledger.place(11, bet()) # The same match: re-keyed, not placed twice
+    assert list(ledger.pending) == [11]
+    ledger = reload(conn, ledger)
+    assert list(ledger.pending) == [11] and len(db.all_bets(conn)) == 1
+
+def test_old_bets_settle_by_their_match_name(conn, tmp_path):
+    joblib.dump({'Arsenal vs Chelsea': dict(bet(), status='Pending', result='-', profit=0)}, tmp_path / 'bet_log.pkl')
+    ledger = BetLedger()
+    ledger.import_pickles(str(tmp_path / 'bet_log.pkl'), str(tmp_path / 'missing.pkl'))
+    settled = ledger.settle(11, 'Arsenal', 'Chelsea', 3, 1)
+    assert settled['fixture_id'] == 11 and settled['result'] == 'Won'
+    ledger = reload(conn, ledger)
+    assert ledger.settled_ids == {11} and ledger.pending == {}
+
+def test_saving_the_same_bets_twice_is_a_no_op(conn):
+    ledger = BetLedger()
+    ledger.place(11, bet())
+    placed = [dict(b) for b in ledger.changed] # What a checkpoint holds: the bets before save gives them ids
+    reload(conn, ledger)
+    with conn:
+        db.save_bets(conn, placed)
+    assert [b['fixture_id'] for b in db.all_bets(conn)] == [11]
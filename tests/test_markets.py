@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import markets
+from model import price_fixtures, score_matrices
+
+def test_quarter_and_whole_lines_settle_like_a_bookmaker():
+    margin = np.array([2.0, 1.0, 0.0, -1.0])
+    # Whole line: winning by exactly the line is a push
+    win, loss = markets._settle(margin, -1)
+    assert win.tolist() == [1, 0, 0, 0] and loss.tolist() == [0, 0, 1, 1]
+    # -0.25 = half on 0 (push at a draw) and half on -0.5 (lost at a draw)
+    win, loss = markets._settle(margin, -0.25)
+    assert win.tolist() == [1, 1, 0, 0] and loss.tolist() == [0, 0, 0.5, 1]
+    # -0.75 = half on -0.5 and half on -1: a one-goal win is half won, half pushed
+    win, loss = markets._settle(margin, -0.75)
+    assert win.tolist() == [1, 0.5, 0, 0] and loss.tolist() == [0, 0, 1, 1]
+    # Half lines never push
+    win, loss = markets._settle(margin, -1.5)
+    assert (win + loss).tolist() == [1, 1, 1, 1]
+
+def returns(margin, line, odds):
+    # Profit per unit stake, settled the long way: quarter lines are two half stakes
+    halves = (line - 0.25, line + 0.25) if (line * 4) % 2 == 1 else (line,)
+    out = 0.0
+    for h in halves:
+        x = margin + h
+        out += (odds - 1 if x > 0 else -1 if x < 0 else 0) / len(halves)
+    return out
+
+@pytest.mark.parametrize('home_xg, away_xg, rho', [(1.5, 1.1, None), (2.4, 0.7, -0.1), (0.9, 1.3, 0.05)])
+def test_fair_odds_have_zero_expected_value(home_xg, away_xg, rho):
+    book = markets.price_markets([home_xg], [away_xg], rho=None if rho is None else [rho])
+    grid = score_matrices(np.array([home_xg]), np.array([away_xg]), rho=rho, min_goals=markets.CORRECT_SCORE_MAX + 1)[0]
+    i, j = np.indices(grid.shape)
+    for name, sign, margin in (('Asian Handicap', 1, i - j), ('Total Goals', None, i + j)):
+        for row in markets.market(book, name).itertuples():
+            if sign is None: # Over x.5 wins on total - line > 0, Under on line - total > 0
+                m, line = (margin, -row.line) if row.selection == 'Over' else (-margin, row.line)
+            else:
+                m, line = (margin, row.line) if row.selection == 'Home' else (-margin, row.line)
+            ev = (grid * np.vectorize(returns)(m, line, row.fair_odds)).sum()
+            assert ev == pytest.approx(0, abs=1e-9), (name, row.selection, row.line)
+
+@pytest.mark.parametrize('rho', [None, -0.15, 0.1])
+def test_every_grid_holds_all_the_probability(rho):
+    home_xg, away_xg = np.array([0.4, 1.5, 3.2]), np.array([0.3, 1.2, 0.8])
+    grids = score_matrices(home_xg, away_xg, rho=rho)
+    # The low-score correction moves mass between 0-0 / 1-0 / 0-1 / 1-1, it doesn't add any
+    assert grids.sum(axis=(1, 2)) == pytest.approx(np.ones(3), abs=1e-8)
+
+def test_market_probabilities_add_up():
+    book = markets.price_markets([1.5, 2.2], [1.1, 0.6], rho=[-0.1, 0.0])
+    for fixture in (0, 1):
+        one_x_two = markets.market(book, '1X2', fixture)
+        assert one_x_two['probability'].sum() == pytest.approx(1, abs=1e-8)
+        totals = markets.market(book, 'Total Goals', fixture)
+        for line, pair in totals.groupby('line'):
+            # Over and Under share a line: between them every scoreline is won once, or pushed on both
+            assert (pair['probability'].sum() + pair['push'].iloc[0]) == pytest.approx(1, abs=1e-8)
+        assert markets.market(book, 'Correct Score', fixture)['probability'].sum() == pytest.approx(1, abs=1e-8)
+
+def test_1x2_matches_the_plain_pricer_without_the_correction():
+    book = markets.price_markets([1.5], [1.1])
+    plain = price_fixtures([1.5], [1.1])[0]
+    assert markets.market(book, '1X2')['probability'].tolist() == pytest.approx(
+        [plain['home_win'], plain['draw'], plain['away_win']], abs=1e-8)
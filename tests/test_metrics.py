@@ -0,0 +1,28 @@
+from metrics import Metrics
+
+def samples(path):
+    # {metric: value} of the unlabelled samples in a Prometheus text file; each family declared once
+    out, families = {}, set()
+    with open(path) as f:
+        for line in f:
+            if line.startswith('# TYPE'):
+                name = line.split()[2]
+                assert name not in families, f"{name} exported twice"
+                families.add(name)
+            if line.startswith('#') or '{' in line: continue
+            name, value = line.split()
+            out[name] = float(value)
+    return out
+
+def test_every_counter_is_exported_once(tmp_path):
+    m = Metrics()
+    m.record_http('competitions/PL/matches', status=200, latency=0.1, size=100, retries=1, sleep=0.5)
+    for name in ('http_cache_hits', 'http_not_modified', 'matches_processed'):
+        m.count(name, 3)
+    path = tmp_path / 'job.prom'
+    m.write_prometheus(str(path))
+    got = samples(path)
+    assert got['football_job_http_retries_total'] == 1
+    assert got['football_job_http_cache_hits_total'] == 3
+    assert got['football_job_http_not_modified_total'] == 3
+    assert got['football_job_matches_processed_total'] == 3
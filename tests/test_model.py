@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from model import DEFAULT_TOL, MonteCarloEngine, ScorelineEngine, max_goals_for, price_fixtures, score_matrix
+
+XGS = [(0.3, 0.2), (1.4, 1.1), (2.8, 0.6), (4.5, 3.9)]
+
+@pytest.mark.parametrize('home_xg, away_xg', XGS)
+def test_grid_misses_at_most_the_tolerance(home_xg, away_xg):
+    matrix = score_matrix(home_xg, away_xg)
+    assert matrix.shape == (max_goals_for(home_xg, away_xg) + 1,) * 2
+    assert 1 - 2 * DEFAULT_TOL <= matrix.sum() <= 1 + 1e-12
+
+@pytest.mark.parametrize('home_xg, away_xg', XGS)
+def test_result_markets_add_up(home_xg, away_xg):
+    m = ScorelineEngine(home_xg, away_xg).run_simulation()
+    assert m['Home Win'] + m['Draw'] + m['Away Win'] == pytest.approx(1, abs=1e-8)
+    # No goals for a side has probability exp(-xG)
+    assert m['BTTS'] == pytest.approx((1 - np.exp(-home_xg)) * (1 - np.exp(-away_xg)), abs=1e-8)
+
+def test_sampling_agrees_with_the_exact_grid():
+    exact = ScorelineEngine(1.6, 1.2).run_simulation()
+    sampled = MonteCarloEngine(1.6, 1.2, rng=np.random.default_rng(0)).run_simulation(200000)
+    for market, p in exact.items():
+        assert sampled[market] == pytest.approx(p, abs=0.005)
+
+def test_batch_prices_match_one_fixture_at_a_time():
+    home_xg, away_xg = np.array(XGS).T
+    prices = price_fixtures(home_xg, away_xg)
+    for row, (h, a) in zip(prices, XGS):
+        m = ScorelineEngine(h, a).run_simulation()
+        assert (row['home_win'], row['draw'], row['away_win'], row['over_2_5'], row['btts']) == pytest.approx(
+            (m['Home Win'], m['Draw'], m['Away Win'], m['Over 2.5'], m['BTTS']), abs=1e-8)
+    assert len(price_fixtures([], [])) == 0
@@ -0,0 +1,25 @@
+import os
+import pytest
+import model_registry
+from model_registry import ModelRegistry
+
+def test_only_changed_models_get_a_version(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    first = registry.register({'coef': [1.0]}, rows=10)
+    assert registry.register({'coef': [1.0]}, rows=11) is first # Unchanged: no new version
+    second = registry.register({'coef': [2.0]}, rows=12)
+    assert (first['version'], second['version']) == (1, 2)
+    reopened = ModelRegistry(str(tmp_path))
+    assert reopened.load() == {'coef': [2.0]} and reopened.load(1) == {'coef': [1.0]}
+    assert reopened.get(2)['rows'] == 12
+
+def test_old_files_go_their_metadata_stays(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, 'KEEP_VERSIONS', 3)
+    registry = ModelRegistry(str(tmp_path))
+    for i in range(5):
+        registry.register({'coef': [float(i)]})
+    assert [e['file'] is not None for e in registry.versions] == [False, False, True, True, True]
+    assert sorted(os.listdir(tmp_path)) == ['logistic_v0003.pkl', 'logistic_v0004.pkl', 'logistic_v0005.pkl',
+                                             'registry.json']
+    with pytest.raises(FileNotFoundError):
+        registry.load(1)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from model import price_fixtures
+from prediction_cache import PredictionCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PredictionCache(str(tmp_path / 'cache.db'), max_entries=3)
+    yield cache
+    cache.close()
+
+def entry(fixture, home='Arsenal', away='Chelsea', state='s1', version='v1'):
+    return (fixture, version, state), home, away, price_fixtures([1.5], [1.1])[0]
+
+def test_prices_come_back_as_stored(cache):
+    cache.put_many([entry('1')])
+    found = cache.get_many([('1', 'v1', 's1')])
+    assert found[('1', 'v1', 's1')].tobytes() == entry('1')[3].tobytes()
+
+def test_a_new_model_or_state_is_a_miss(cache):
+    cache.put_many([entry('1')])
+    assert cache.get_many([('1', 'v2', 's1'), ('1', 'v1', 's2')]) == {}
+    assert cache.stats()['misses'] == 2
+
+def test_least_recently_used_entries_go_first(cache, monkeypatch):
+    now = iter(np.arange(100.0))
+    monkeypatch.setattr('prediction_cache.time.time', lambda: next(now))
+    cache.put_many([entry('1'), entry('2'), entry('3')])
+    cache.get_many([('1', 'v1', 's1')]) # 1 is used again, 2 is now the oldest
+    cache.put_many([entry('4')])
+    assert len(cache) == 3
+    assert set(cache.get_many([(f, 'v1', 's1') for f in '1234'])) == {('1', 'v1', 's1'), ('3', 'v1', 's1'), ('4', 'v1', 's1')}
+
+def test_invalidating_a_team_drops_its_fixtures(cache):
+    cache.put_many([entry('1'), entry('2', home='Bayern', away='Dortmund')])
+    cache.invalidate_teams(['Chelsea'])
+    assert list(cache.get_many([('1', 'v1', 's1'), ('2', 'v1', 's1')])) == [('2', 'v1', 's1')]
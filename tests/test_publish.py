@@ -0,0 +1,57 @@
+import os
+import pytest
+from publish import Publisher, sha256
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # The publisher stores paths relative to the repo root
+    return tmp_path
+
+def publish(data, path='model.pkl', today='2026-10-17'):
+    publisher = Publisher(today=today)
+    written = publisher.write(path, data)
+    publisher.save()
+    return publisher, written
+
+def test_unchanged_content_is_not_rewritten(workdir):
+    publish(b'v1')
+    mtime = os.stat('model.pkl').st_mtime_ns
+    manifest = open('manifest.json', 'rb').read()
+    publisher, written = publish(b'v1', today='2026-10-18')
+    assert not written and publisher.unchanged == ['model.pkl']
+    assert os.stat('model.pkl').st_mtime_ns == mtime
+    assert open('manifest.json', 'rb').read() == manifest # Not even the date moves
+
+def test_changed_content_gets_a_new_version(workdir):
+    publish(b'v1')
+    publisher, written = publish(b'v2', today='2026-10-18')
+    assert written and open('model.pkl', 'rb').read() == b'v2'
+    entry = publisher.artifacts['model.pkl']
+    assert entry == {'sha256': sha256(b'v2'), 'size': 2, 'version': 2, 'updated': '2026-10-18'}
+
+def test_files_from_before_the_manifest_are_listed_not_rewritten(workdir):
+    with open('model.pkl', 'wb') as f:
+        f.write(b'v1')
+    mtime = os.stat('model.pkl').st_mtime_ns
+    publisher, written = publish(b'v1')
+    assert not written and publisher.artifacts['model.pkl']['version'] == 1
+    assert os.stat('model.pkl').st_mtime_ns == mtime
+
+def test_a_missing_file_is_restored_without_a_new_version(workdir):
+    publish(b'v1')
+    os.remove('model.pkl')
+    publisher, written = publish(b'v1')
+    assert written and publisher.artifacts['model.pkl']['version'] == 1
+
+def test_removed_artifacts_leave_the_manifest(workdir):
+    publisher, _ = publish(b'v1', path=os.path.join('models', 'old.pkl'))
+    publisher.remove(os.path.join('models', 'old.pkl'))
+    assert not os.path.exists(os.path.join('models', 'old.pkl'))
+    assert publisher.artifacts == {}
+
+def test_record_hashes_files_written_in_place(workdir):
+    with open('football.db', 'wb') as f:
+        f.write(b'rows')
+    publisher = Publisher()
+    assert publisher.record('football.db') and not Publisher().record('missing.db')
+    assert publisher.artifacts['football.db']['sha256'] == sha256(b'rows')
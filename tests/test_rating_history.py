@@ -0,0 +1,90 @@
+import pickle
+import numpy as np
+import db
+import rating_history
+from elo import INITIAL_RATING
+from history_store import EPOCH, _to_days
+from rating_history import ARCHIVE_WEEKS, RECENT_POINTS, RatingHistory
+
+def date(day):
+    return str(EPOCH + np.timedelta64(int(day), 'D'))
+
+def played(n, every=3, start=10):
+    # A team's (day, rating) after each of n matches, one every `every` days
+    return [(start + i * every, 1500.0 + i) for i in range(n)]
+
+def test_recent_points_stay_whole_older_ones_go_weekly():
+    history = RatingHistory()
+    points = played(RECENT_POINTS + 300)
+    for day, rating in points:
+        history.record('A', day, rating)
+    dates, ratings = history.points('A')
+    assert history.count('A') == len(points)
+    assert ratings[-RECENT_POINTS:].tolist() == [r for _, r in points[-RECENT_POINTS:]]
+    older = (dates[:-RECENT_POINTS] - EPOCH).astype(int)
+    weeks = (older + 5) // 7
+    assert len(set(weeks)) == len(weeks) # One point per week
+    # ... the last rating of each week
+    expected = {}
+    for day, rating in points[:-RECENT_POINTS]:
+        expected[(day + 5) // 7] = rating
+    assert ratings[:-RECENT_POINTS].tolist() == [expected[w] for w in weeks]
+
+def test_the_archive_is_capped(monkeypatch):
+    monkeypatch.setattr(rating_history, 'ARCHIVE_WEEKS', 10)
+    history = RatingHistory()
+    for day, rating in played(RECENT_POINTS + 200, every=7):
+        history.record('A', day, rating)
+    assert len(history.points('A')[1]) == RECENT_POINTS + 10
+
+def test_rating_at_reads_across_the_archive_boundary():
+    history = RatingHistory()
+    points = played(RECENT_POINTS + 60, every=7) # Weekly games: the archive keeps every one
+    for day, rating in points:
+        history.record('A', day, rating)
+    for i in (0, 30, 59, 60, 61, len(points) - 1):
+        day, _ = points[i]
+        before = points[i - 1][1] if i else INITIAL_RATING
+        assert history.rating_at('A', date(day)) == before # Going into that day's match
+        assert history.rating_at('A', date(day + 1)) == points[i][1]
+    assert history.rating_at('Nobody', date(100)) == INITIAL_RATING
+
+def test_a_trimmed_archive_starts_from_its_oldest_rating(monkeypatch):
+    monkeypatch.setattr(rating_history, 'ARCHIVE_WEEKS', 5)
+    history = RatingHistory()
+    for day, rating in played(RECENT_POINTS + 50, every=7):
+        history.record('A', day, rating)
+    oldest = float(history.points('A')[1][0])
+    assert history.rating_at('A', date(1)) == oldest != INITIAL_RATING
+    assert history.rows('A')[0][1] == 1 # No starting 1500 row before a trimmed archive
+
+def test_pickles_compactly_and_back():
+    history = RatingHistory()
+    for day, rating in played(300):
+        history.record('A', day, rating)
+    copy = pickle.loads(pickle.dumps(history))
+    assert copy.count('A') == 300
+    assert copy.points('A')[1].tolist() == history.points('A')[1].tolist()
+
+def test_from_legacy_takes_the_dates_from_football_db():
+    legacy = {'A': [1500, 1510, 1505], 'B': [1500, 1490]}
+    rows = [('A', 0, None, 1500), ('A', 1, '2024-08-10T15:00:00Z', 1510), ('A', 2, '2024-08-17T15:00:00Z', 1505)]
+    history = RatingHistory.from_legacy(legacy, rows)
+    dates, ratings = history.points('A')
+    assert [str(d) for d in dates] == ['2024-08-10', '2024-08-17'] and ratings.tolist() == [1510, 1505]
+    assert history.count('B') == 1 and np.isnat(history.points('B')[0][0]) # No dated rows: undated points
+    assert history.rating_at('A', '2024-08-17') == 1510
+
+def test_football_db_keeps_what_the_history_keeps(tmp_path):
+    history = RatingHistory()
+    for day, rating in played(RECENT_POINTS + 300):
+        history.record('A', day, rating)
+    conn = db.connect(str(tmp_path / 'football.db'))
+    with conn:
+        db.replace_elo_history(conn, [('A', seq, None, 1500.0) for seq in range(1000)]) # The old unbounded series
+        db.replace_elo_history(conn, history.rows('A'))
+    stored = db.elo_history(conn, 'A')
+    conn.close()
+    assert len(stored) == 1 + len(history.points('A')[1]) < 1000
+    assert stored[0]['rating'] == INITIAL_RATING and stored[-1]['utc_date'] == date(played(RECENT_POINTS + 300)[-1][0])
+    assert _to_days(stored[1]['utc_date']) > 0
@@ -0,0 +1,33 @@
+import pickle
+import numpy as np
+from records import HISTORY_DTYPE, Interner, RecordBuffer, history_buffer
+
+def test_buffer_keeps_every_row_in_order():
+    buf = RecordBuffer(HISTORY_DTYPE, capacity=4)
+    rows = [(i % 5, i % 3, i) for i in range(200)] # Past FLUSH and several capacity doublings
+    for row in rows[:150]:
+        buf.append(row)
+    buf.extend(rows[150:])
+    assert len(buf) == 200
+    assert buf.array.tolist() == rows
+
+def test_buffer_pickles_as_its_rows():
+    buf = RecordBuffer(HISTORY_DTYPE)
+    for row in [(1, 0, 10), (2, 2, 11)]:
+        buf.append(row) # Still pending, not flushed
+    copy = pickle.loads(pickle.dumps(buf))
+    assert copy.array.tolist() == [(1, 0, 10), (2, 2, 11)]
+
+def test_interned_names_are_shared_and_stable():
+    names = Interner()
+    first = names.intern(''.join(['Arse', 'nal'])) # A fresh string object
+    assert names.intern('Arsenal') is first
+    assert names.id('Chelsea') == 1 and names.name(1) == 'Chelsea'
+    copy = pickle.loads(pickle.dumps(names))
+    assert copy.id('Arsenal') == 0 and 'Chelsea' in copy and len(copy) == 2
+
+def test_old_split_lists_convert_with_their_dates_at_the_end():
+    buf = history_buffer({'scored': [1, 2, 3], 'conceded': [0, 0, 1], 'dates': ['2000-01-02']})
+    assert buf.array['scored'].tolist() == [1, 2, 3]
+    assert buf.array['day'].tolist() == [0, 0, 1] # Undated older matches pad the front
+    assert history_buffer(buf) is buf
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+import season
+
+XG = lambda home, away: (1.5, 1.1)
+
+def league_rows(teams, rng, share=0.5):
+    # Finished (utc_date, home, away, hg, ag) rows for a share of a double round-robin
+    pairs = [(h, a) for h in teams for a in teams if h != a]
+    played = [pairs[i] for i in sorted(rng.choice(len(pairs), int(share * len(pairs)), replace=False))]
+    return [('2025-09-01T15:00:00Z', h, a, int(rng.integers(0, 4)), int(rng.integers(0, 4))) for h, a in played]
+
+def test_remaining_round_robin_is_every_unplayed_pairing():
+    teams = ['A', 'B', 'C', 'D']
+    rows = [('A', 'B', 1, 0), ('C', 'A', 2, 2)]
+    left = season.remaining_round_robin(rows, teams)
+    assert len(left) == 12 - 2 and ('A', 'B') not in left and ('B', 'A') in left
+    assert sorted(left + [r[:2] for r in rows]) == sorted((h, a) for h in teams for a in teams if h != a)
+
+def test_position_probabilities_sum_to_one():
+    teams = [f'T{i}' for i in range(8)]
+    inputs = season.competition_inputs('PL', league_rows(teams, np.random.default_rng(0)), [], XG)
+    out = season.simulate_competition(inputs, n_sims=2000, seed=1)
+    positions = out[[f'pos_{p + 1}' for p in range(len(teams))]].to_numpy()
+    assert positions.sum(axis=1) == pytest.approx(1) # Every team finishes somewhere
+    assert positions.sum(axis=0) == pytest.approx(1) # Every place is taken by someone
+    assert out['title'].sum() == pytest.approx(1) and out['relegation'].sum() == pytest.approx(3)
+    assert (out['expected_points'] >= out['points']).all()
+
+def test_a_finished_season_is_settled():
+    teams = ['A', 'B', 'C', 'D']
+    # Every pairing played: the earlier team in the list wins, by a margin that breaks no ties
+    rows = [('2025-09-01T15:00:00Z', h, a, *((2, 0) if teams.index(h) < teams.index(a) else (0, 1)))
+            for h in teams for a in teams if h != a]
+    inputs = season.competition_inputs('PL', rows, [], XG)
+    assert inputs['home_idx'] == []
+    out = season.simulate_competition(inputs, n_sims=500, seed=0).set_index('team')
+    for pos, team in enumerate(teams, 1):
+        assert out.loc[team, f'pos_{pos}'] == 1
+    assert out.loc['A', 'title'] == 1 and out.loc['D', 'relegation'] == 1
+    assert (out['expected_points'] == out['points']).all()
+
+def cl_inputs(n_teams=36, seed=0, eliminate=()):
+    teams = [f'C{i:02d}' for i in range(n_teams)]
+    rng = np.random.default_rng(seed)
+    # Two of the eight league phase rounds played
+    order = rng.permutation(teams)
+    rows = [('2025-09-17T20:00:00Z', order[i], order[i + 1], int(rng.integers(0, 4)), int(rng.integers(0, 4)))
+            for i in range(0, n_teams, 2)]
+    order = rng.permutation(teams)
+    rows += [('2025-10-01T20:00:00Z', order[i], order[i + 1], int(rng.integers(0, 4)), int(rng.integers(0, 4)))
+             for i in range(0, n_teams, 2)]
+    inputs = season.competition_inputs(season.CL, rows, [], XG)
+    inputs['eliminated'] = [inputs['teams'].index(t) for t in eliminate]
+    return inputs
+
+def test_the_champions_league_bracket_has_one_winner():
+    out = season.simulate_competition(cl_inputs(), n_sims=2000, seed=3)
+    assert out['winner'].sum() == pytest.approx(1)
+    assert out['final'].sum() == pytest.approx(2)
+    assert out['semi_final'].sum() == pytest.approx(4)
+    assert out['last_16'].sum() == pytest.approx(16)
+    assert out['top_8'].sum() == pytest.approx(8) and out['knockouts'].sum() == pytest.approx(24)
+    assert (out['winner'] <= out['final']).all() and (out['final'] <= out['last_16']).all()
+
+def test_a_small_field_goes_straight_to_a_bracket():
+    seeds = np.tile(np.arange(6), (100, 1))
+    home_xg = away_xg = np.full((6, 6), 1.2)
+    reached = season.simulate_knockout(seeds, home_xg, away_xg, np.random.default_rng(0))
+    assert list(reached) == ['semi_final', 'final', 'winner'] # The top 4 of 6
+    assert reached['winner'].sum() == 100 and reached['semi_final'][4:].sum() == 0
+
+def test_simulations_are_reproducible_across_processes():
+    inputs = [season.competition_inputs('PL', league_rows([f'T{i}' for i in range(6)], np.random.default_rng(s)), [], XG)
+              for s in range(2)]
+    inputs[1]['competition'] = 'SA'
+    serial = season.simulate_all(inputs, n_sims=500, seed=7, workers=1)
+    pooled = season.simulate_all(inputs, n_sims=500, seed=7, workers=2)
+    for comp in ('PL', 'SA'):
+        pd.testing.assert_frame_equal(serial[comp], pooled[comp])
+
+def test_a_team_already_knocked_out_goes_no_further():
+    out = season.simulate_competition(cl_inputs(eliminate=('C00',)), n_sims=1000, seed=3).set_index('team')
+    assert out.loc['C00', 'quarter_final'] == 0 and out.loc['C00', 'winner'] == 0
+    assert out['winner'].sum() == pytest.approx(1)
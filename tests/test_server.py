@@ -0,0 +1,45 @@
+import json
+import os
+import shutil
+import threading
+from urllib.parse import urlencode
+from urllib.request import urlopen, Request
+import pytest
+from server import MARKETS, Predictor, PredictionServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # The checkout's artifacts, read from the working directory like the job leaves them
+    shutil.copy(os.path.join(ROOT, 'football.db'), tmp_path)
+    shutil.copy(os.path.join(ROOT, 'logistic_model.pkl'), tmp_path)
+    shutil.copytree(os.path.join(ROOT, 'team_history'), tmp_path / 'team_history')
+    monkeypatch.chdir(tmp_path)
+    server = PredictionServer(Predictor(cache=False).start(), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def get(url):
+    with urlopen(url, timeout=30) as res:
+        return res.status, json.loads(res.read())
+
+def test_predict_round_trip(server):
+    query = urlencode({'home': 'Brighton & Hove Albion FC', 'away': 'Everton FC', 'competition': 'PL'})
+    status, body = get(f"{server}/predict?{query}")
+    assert status == 200
+    [p] = body['predictions']
+    assert set(MARKETS) <= set(p) and p['model_version']
+    assert p['home_win'] + p['draw'] + p['away_win'] == pytest.approx(1, abs=1e-6)
+
+    # The same fixture POSTed prices the same
+    fixture = {'home': 'Brighton & Hove Albion FC', 'away': 'Everton FC', 'competition': 'PL'}
+    request = Request(f"{server}/predict", data=json.dumps({'fixtures': [fixture]}).encode(),
+                      headers={'Content-Type': 'application/json'})
+    with urlopen(request, timeout=30) as res:
+        assert json.loads(res.read())['predictions'] == [p]
+
+    status, health = get(f"{server}/health")
+    assert (status, health['status'], health['model_version']) == (200, 'ok', p['model_version'])
@@ -0,0 +1,36 @@
+import numpy as np
+from feature_store import FEATURES
+from pipeline import training
+
+def data(n=3000, seed=0):
+    # Feature rows and 1X2 results drawn from a known multinomial logit
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 1, (n, len(FEATURES)))
+    coef = np.zeros((3, len(FEATURES)))
+    coef[2, 0], coef[0, 0], coef[2, 1] = 0.8, -0.8, 0.3
+    z = X @ coef.T + [0.1, 0.0, 0.3]
+    p = np.exp(z) / np.exp(z).sum(axis=1, keepdims=True)
+    y = (rng.random(n)[:, None] > p.cumsum(axis=1)).sum(axis=1)
+    return X, y, p
+
+def log_loss(p, y):
+    return -np.log(p[np.arange(len(y)), y]).mean()
+
+def test_daily_updates_from_a_short_history_stay_close_to_a_full_fit():
+    X, y, p = data()
+    model = training.fit(X[:100], y[:100])
+    for start in range(100, 2000, 20): # A week's matches at a time
+        assert training.fit(X[start:start + 20], y[start:start + 20], model) is model # Updated in place
+    held_out = slice(2000, None)
+    full = log_loss(training.fit(X[:2000], y[:2000]).predict_proba(X[held_out]), y[held_out])
+    assert full < log_loss(p[held_out], y[held_out]) + 0.03
+    assert log_loss(model.predict_proba(X[held_out]), y[held_out]) < full + 0.05
+
+def test_same_rows_same_model():
+    X, y, _ = data(500)
+    assert np.array_equal(training.fit(X, y).coef_, training.fit(X, y).coef_)
+
+def test_models_with_other_settings_are_refitted():
+    from sklearn.linear_model import SGDClassifier
+    assert training.compatible(training.new_model())
+    assert not training.compatible(SGDClassifier(loss='log_loss', average=True))